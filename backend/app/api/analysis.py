@@ -1,12 +1,12 @@
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from fastapi import Query
 
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session
 from app.schemas.analysis import (
     AnalyzeRequest, 
     AnalysisRunResponse, 
@@ -14,7 +14,7 @@ from app.schemas.analysis import (
     AnalysisRunListResponse
 )
 from app.services.analysis_service import AnalysisService
-from app.models.entities import AnalysisRun
+from app.services.progress import load_progress, progress_bus
 
 router = APIRouter(prefix="/api/analyze", tags=["analysis"])
 
@@ -22,161 +22,98 @@ router = APIRouter(prefix="/api/analyze", tags=["analysis"])
 @router.post("", response_model=AnalysisRunResponse, status_code=201)
 async def analyze_tickets(
     request: AnalyzeRequest,
-    background_tasks: BackgroundTasks,
     db: Annotated[AsyncSession, Depends(get_session)],
 ) -> AnalysisRunResponse:
-    """Start analysis of tickets. If ticketIds provided, analyze only those; otherwise analyze all ready to analyze tickets.
-    Returns immediately with analysis_run_id. Processing happens in background."""
+    """Start analysis of tickets. Pending tickets matching the filters (ticketIds, createdAfter, createdBefore, query,
+    limit) are analyzed; without filters, all ready to analyze tickets.
+    Returns immediately with analysis_run_id. Processing is queued for a worker."""
     try:
-        return await AnalysisService.analyze_tickets(db, background_tasks, request.ticketIds)
+        return await AnalysisService.analyze_tickets(
+            db,
+            request.ticketIds,
+            created_after=request.createdAfter,
+            created_before=request.createdBefore,
+            query=request.query,
+            limit=request.limit,
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{analysis_run_id}/status", response_model=AnalysisStatusResponse)
 async def get_analysis_status(
+    analysis_run_id: int,
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    include_ticket_ids: Annotated[bool, Query(description="Also list the run's ticket ids")] = False,
+) -> AnalysisStatusResponse:
+    """Get the current status of an analysis run from its ticket counters."""
+    try:
+        return await AnalysisService.get_analysis_status(db, analysis_run_id, include_ticket_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/{analysis_run_id}/cancel", response_model=AnalysisStatusResponse)
+async def cancel_analysis(
     analysis_run_id: int,
     db: Annotated[AsyncSession, Depends(get_session)],
 ) -> AnalysisStatusResponse:
-    """Get the current status of an analysis run by checking ticket statuses."""
-    from sqlalchemy.orm import joinedload
-    from app.models.entities import Ticket, TicketStatus
-    
-    result = await db.execute(
-        select(AnalysisRun)
-        .where(AnalysisRun.id == analysis_run_id)
-        .options(joinedload(AnalysisRun.ticket_analyses))
-    )
-    analysis_run = result.unique().scalar_one_or_none()
-    
-    if not analysis_run:
-        raise HTTPException(status_code=404, detail="Analysis run not found")
-    
-    # Get ticket IDs from ticket_analyses if they exist
-    ticket_ids = [ta.ticket_id for ta in analysis_run.ticket_analyses] if analysis_run.ticket_analyses else []
-    
-    # If no ticket_analyses yet, try to find tickets with PROCESSING status
-    # that might belong to this run (we can't be 100% sure, but it's a best guess)
-    if not ticket_ids:
-        # This is a limitation - we don't store which tickets belong to which run
-        # But we can check for PROCESSING tickets
-        tickets_result = await db.execute(
-            select(Ticket).where(Ticket.status == TicketStatus.PROCESSING.value)
-        )
-        processing_tickets = tickets_result.scalars().all()
-        ticket_ids = [t.id for t in processing_tickets]
-    
-    # Determine overall status based on ticket statuses
-    if ticket_ids:
-        tickets_result = await db.execute(
-            select(Ticket).where(Ticket.id.in_(ticket_ids))
-        )
-        tickets = tickets_result.scalars().all()
-        
-        # Check if all tickets are analyzed
-        if all(t.status == TicketStatus.ANALYZED.value for t in tickets):
-            status = "completed"
-        # Check if any tickets failed
-        elif any(t.status == TicketStatus.FAILED.value for t in tickets):
-            status = "failed"
-        # Check if any tickets are still processing
-        elif any(t.status == TicketStatus.PROCESSING.value for t in tickets):
-            status = "processing"
-        else:
-            status = "pending"
-    else:
-        status = "pending"
-    
-    return AnalysisStatusResponse(
-        analysis_run_id=analysis_run.id,
-        status=status,
-        ticket_ids=ticket_ids
+    """Cancel an analysis run. Tickets not yet analyzed go back to pending; results already written are kept.
+    A running run stops within a second, reported as "cancelling" until its worker has released it."""
+    try:
+        return await AnalysisService.cancel_analysis(db, analysis_run_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/{analysis_run_id}/events")
+async def stream_analysis_events(
+    analysis_run_id: int,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+) -> StreamingResponse:
+    """Stream progress of an analysis run as Server-Sent Events until it finishes."""
+    try:
+        await load_progress(db, analysis_run_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(
+        progress_bus.stream(analysis_run_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.get("/active", response_model=list[AnalysisStatusResponse])
 async def get_active_analysis_runs(
-    db: Annotated[AsyncSession, Depends(get_session)],
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    include_ticket_ids: Annotated[bool, Query(description="Also list each run's ticket ids")] = False,
 ) -> list[AnalysisStatusResponse]:
-    """Get all active analysis runs (with processing or pending tickets)."""
-    from sqlalchemy.orm import joinedload
-    from app.models.entities import Ticket, TicketStatus
-    
-    # Get all analysis runs that might be active
-    # We'll check recent runs (last hour) or runs with processing tickets
-    from datetime import datetime, timedelta
-    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-    
-    result = await db.execute(
-        select(AnalysisRun)
-        .where(AnalysisRun.created_at >= one_hour_ago)
-        .options(joinedload(AnalysisRun.ticket_analyses))
-        .order_by(AnalysisRun.created_at.desc())
-    )
-    recent_runs = result.unique().scalars().all()
-    
-    active_runs = []
-    for run in recent_runs:
-        # Get ticket IDs from ticket_analyses if they exist
-        ticket_ids = [ta.ticket_id for ta in run.ticket_analyses] if run.ticket_analyses else []
-        
-        # If no ticket_analyses yet, check if there are processing tickets
-        # that might belong to this run
-        if not ticket_ids:
-            # Check for processing tickets created around the same time as the run
-            tickets_result = await db.execute(
-                select(Ticket).where(
-                    Ticket.status == TicketStatus.PROCESSING.value,
-                    Ticket.created_at <= run.created_at + timedelta(minutes=5)
-                )
-            )
-            processing_tickets = tickets_result.scalars().all()
-            if processing_tickets:
-                ticket_ids = [t.id for t in processing_tickets]
-        
-        # Check if any of these tickets are still processing
-        if ticket_ids:
-            tickets_result = await db.execute(
-                select(Ticket).where(Ticket.id.in_(ticket_ids))
-            )
-            tickets = tickets_result.scalars().all()
-            
-            # Only include runs that have processing tickets
-            if any(t.status == TicketStatus.PROCESSING.value for t in tickets):
-                # Determine status
-                if all(t.status == TicketStatus.ANALYZED.value for t in tickets):
-                    status = "completed"
-                elif any(t.status == TicketStatus.FAILED.value for t in tickets):
-                    status = "failed"
-                elif any(t.status == TicketStatus.PROCESSING.value for t in tickets):
-                    status = "processing"
-                else:
-                    status = "pending"
-                
-                active_runs.append(AnalysisStatusResponse(
-                    analysis_run_id=run.id,
-                    status=status,
-                    ticket_ids=ticket_ids
-                ))
-    
-    return active_runs
+    """Get all active analysis runs (with processing tickets)."""
+    return await AnalysisService.get_active_analysis_runs(db, include_ticket_ids)
 
 
 @router.get("/runs", response_model=AnalysisRunListResponse)
 async def list_analysis_runs(
-    db: Annotated[AsyncSession, Depends(get_session)],
+    db: Annotated[AsyncSession, Depends(get_read_session)],
     page: Annotated[int, Query(ge=1, description="Page number (1-indexed)")] = 1,
     page_size: Annotated[int, Query(ge=1, le=100, description="Items per page")] = 10,
+    cursor: Annotated[str | None, Query(description="next_cursor from the previous page; overrides page")] = None,
 ) -> AnalysisRunListResponse:
     """List all analysis runs with pagination."""
-    result = await AnalysisService.list_analysis_runs(db, page=page, page_size=page_size)
+    try:
+        result = await AnalysisService.list_analysis_runs(db, page=page, page_size=page_size, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return AnalysisRunListResponse(**result)
 
 
 @router.get("/{analysis_run_id}", response_model=AnalysisRunResponse)
 async def get_analysis_run(
     analysis_run_id: int,
-    db: Annotated[AsyncSession, Depends(get_session)],
+    db: Annotated[AsyncSession, Depends(get_read_session)],
 ) -> AnalysisRunResponse:
     """Get detailed information about a specific analysis run including all tickets."""
     try:
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_session
+from app.schemas.analytics import BreakdownResponse
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+@router.get("/breakdown", response_model=BreakdownResponse)
+async def get_breakdown(
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    start: Annotated[datetime | None, Query(alias="from", description="Start of the range (inclusive)")] = None,
+    end: Annotated[datetime | None, Query(alias="to", description="End of the range (exclusive)")] = None,
+    bucket: Annotated[str, Query(pattern="^(hour|day)$", description="Bucket size")] = "day",
+) -> BreakdownResponse:
+    """Analyzed tickets per time bucket, category and priority."""
+    try:
+        return await AnalyticsService.breakdown(db, start=start, end=end, bucket=bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
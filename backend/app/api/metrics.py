@@ -0,0 +1,45 @@
+import time
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.db.session import get_session
+from app.services.job_queue import JobQueue
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(db: Annotated[AsyncSession, Depends(get_session)]) -> Response:
+    """Prometheus metrics in the text exposition format."""
+    # Sampled on scrape so the queue is never counted on a request path
+    metrics.ANALYSIS_QUEUE_DEPTH.set(await JobQueue.queue_depth(db))
+    return Response(generate_latest(metrics.registry), media_type=CONTENT_TYPE_LATEST)
+
+
+class HTTPMetricsMiddleware:
+    """ASGI middleware timing each request until its response starts, labelled by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                # Unmatched paths share one label to keep cardinality bounded
+                route = getattr(scope.get("route"), "path", "unmatched")
+                metrics.HTTP_REQUEST_SECONDS.labels(
+                    method=scope["method"], route=route, status=str(message["status"])
+                ).observe(time.perf_counter() - started_at)
+            await send(message)
+
+        await self.app(scope, receive, send_with_metrics)
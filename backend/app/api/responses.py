@@ -0,0 +1,20 @@
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+
+class RawJSONResponse(Response):
+    """
+    JSON response for payloads that are already plain dicts, lists and scalars.
+
+    pydantic-core encodes the whole payload in one pass, with datetimes and
+    enums written exactly as Pydantic models write them. Returning it from an
+    endpoint skips FastAPI's validation and re-serialization through
+    ``response_model``, which stays declared for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
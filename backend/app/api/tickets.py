@@ -1,15 +1,25 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_session
+from app.api.responses import RawJSONResponse
+from app.db.session import get_read_session, get_session
+from app.models.entities import TicketCategory, TicketStatus
 from app.schemas.ticket import (
     AnalyzedTicketListResponse,
+    SimilarTicketsResponse,
     TicketCreateRequest,
+    TicketImportResponse,
     TicketListResponse,
     TicketResponse,
+    TicketSearchResponse,
 )
+from app.services.similar_tickets import SimilarTicketService
+from app.services.ticket_export import EXPORT_MEDIA_TYPES, TicketExportService
+from app.services.ticket_import import iter_csv_rows, iter_lines, iter_ndjson_rows
 from app.services.ticket_service import TicketService
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
@@ -24,24 +34,120 @@ async def create_tickets(
     return await TicketService.create_tickets(db, tickets)
 
 
+@router.post("/import", response_model=TicketImportResponse)
+async def import_tickets(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_session)],
+    format: Annotated[str | None, Query(pattern="^(csv|ndjson)$", description="Body format; defaults to the Content-Type")] = None,
+) -> TicketImportResponse:
+    """Bulk import tickets from a streamed CSV (title,description header) or NDJSON body."""
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type in ("text/csv", "application/csv"):
+            format = "csv"
+        elif content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+            format = "ndjson"
+        else:
+            raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson")
+
+    parse = iter_csv_rows if format == "csv" else iter_ndjson_rows
+    try:
+        return await TicketService.import_tickets(db, parse(iter_lines(request.stream())))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be UTF-8 encoded")
+
+
+@router.get("/export")
+async def export_tickets(
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    format: Annotated[str, Query(pattern="^(ndjson|csv|parquet)$", description="Output format")] = "ndjson",
+    since: Annotated[datetime | None, Query(description="Tickets created at or after this time")] = None,
+    until: Annotated[datetime | None, Query(description="Tickets created before this time")] = None,
+    status: Annotated[TicketStatus | None, Query(description="Filter by ticket status")] = None,
+) -> StreamingResponse:
+    """Stream every matching ticket with its latest analysis, oldest first."""
+    try:
+        chunks = TicketExportService.export(
+            db, format, since=since, until=until, status=status.value if status else None
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tickets.{format}"'},
+    )
+
+
+@router.get("/search", response_model=TicketSearchResponse)
+async def search_tickets(
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    q: Annotated[str, Query(min_length=1, max_length=500, description="Words to search for in title and description")],
+    page_size: Annotated[int, Query(ge=1, le=100, description="Items per page")] = 10,
+    cursor: Annotated[str | None, Query(description="next_cursor from the previous page")] = None,
+    status: Annotated[TicketStatus | None, Query(description="Filter by ticket status")] = None,
+    category: Annotated[TicketCategory | None, Query(description="Filter by analyzed category")] = None,
+    priority: Annotated[Literal["low", "medium", "high"] | None, Query(description="Filter by analyzed priority")] = None,
+) -> TicketSearchResponse:
+    """Search tickets by text, best matches first."""
+    try:
+        return await TicketService.search_tickets(
+            db, q, page_size=page_size, cursor=cursor,
+            status=status.value if status else None,
+            category=category.value if category else None,
+            priority=priority,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{ticket_id}/similar", response_model=SimilarTicketsResponse)
+async def get_similar_tickets(
+    ticket_id: int,
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    limit: Annotated[int, Query(ge=1, le=100, description="Number of similar tickets")] = 10,
+) -> SimilarTicketsResponse:
+    """Nearest historical tickets by text, with their latest classification."""
+    try:
+        return await SimilarTicketService.find_similar(db, ticket_id, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
 @router.get("/analyzed", response_model=AnalyzedTicketListResponse)
 async def list_analyzed_tickets(
-    db: Annotated[AsyncSession, Depends(get_session)],
+    db: Annotated[AsyncSession, Depends(get_read_session)],
     page: Annotated[int, Query(ge=1, description="Page number (1-indexed)")] = 1,
     page_size: Annotated[int, Query(ge=1, le=100, description="Items per page")] = 10,
+    cursor: Annotated[str | None, Query(description="next_cursor from the previous page; overrides page")] = None,
 ) -> AnalyzedTicketListResponse:
     """List analyzed tickets with pagination."""
-    return await TicketService.list_analyzed_tickets(db, page=page, page_size=page_size)
+    try:
+        page_data = await TicketService.list_analyzed_tickets(db, page=page, page_size=page_size, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RawJSONResponse(page_data)
 
 
 @router.get("", response_model=TicketListResponse)
 async def list_tickets(
-    db: Annotated[AsyncSession, Depends(get_session)],
+    db: Annotated[AsyncSession, Depends(get_read_session)],
     page: Annotated[int, Query(ge=1, description="Page number (1-indexed)")] = 1,
     page_size: Annotated[int, Query(ge=1, le=1000, description="Items per page")] = 10,
     status: Annotated[str | None, Query(description="Filter by status")] = None,
+    cursor: Annotated[str | None, Query(description="next_cursor from the previous page; overrides page")] = None,
 ) -> TicketListResponse:
     """List tickets with pagination. Optionally filter by status."""
-    if status:
-        return await TicketService.list_tickets_by_status(db, status, page=page, page_size=page_size)
-    return await TicketService.list_tickets(db, page=page, page_size=page_size)
+    try:
+        if status:
+            page_data = await TicketService.list_tickets_by_status(
+                db, status, page=page, page_size=page_size, cursor=cursor
+            )
+        else:
+            page_data = await TicketService.list_tickets(db, page=page, page_size=page_size, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Rows are encoded as they come from the database, without per-row models
+    return RawJSONResponse(page_data)
@@ -0,0 +1,84 @@
+"""Maintenance commands. Run with ``python -m app.cli <command>``."""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from app.db.session import async_session_factory, create_all_tables, dispose_engines, read_session_factory
+from app.models.entities import TicketStatus
+from app.services.analytics_service import AnalyticsService
+from app.services.local_classifier import LocalClassifierService
+from app.services.ticket_export import EXPORT_MEDIA_TYPES, TicketExportService
+
+
+async def _backfill_analytics(args: argparse.Namespace) -> None:
+    await create_all_tables()
+    try:
+        async with async_session_factory() as db:
+            analyzed = await AnalyticsService.backfill(db)
+        print(f"Rebuilt analytics rollups from {analyzed} analyses")
+    finally:
+        await dispose_engines()
+
+
+async def _train_classifier(args: argparse.Namespace) -> None:
+    await create_all_tables()
+    try:
+        async with async_session_factory() as db:
+            model = await LocalClassifierService.train(db)
+        print(f"Trained local classifier {model.id} on {model.samples} analyses: {model.metrics}")
+    except ValueError as e:
+        raise SystemExit(str(e))
+    finally:
+        await dispose_engines()
+
+
+async def _export_tickets(args: argparse.Namespace) -> None:
+    await create_all_tables()
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        # Exports are the heaviest reads of all: served by the replica when there is one
+        async with read_session_factory() as db:
+            chunks = TicketExportService.export(
+                db, args.format, since=args.since, until=args.until, status=args.status
+            )
+            async for chunk in chunks:
+                output.write(chunk)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        await dispose_engines()
+
+
+def _export_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--format", choices=list(EXPORT_MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--output", default="-", help="File to write (default: stdout)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Tickets created at or after this ISO time")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Tickets created before this ISO time")
+    parser.add_argument("--status", choices=[status.value for status in TicketStatus])
+
+
+COMMANDS = {
+    "backfill-analytics": (_backfill_analytics, "Rebuild analytics rollups from all stored analyses", None),
+    "train-classifier": (_train_classifier, "Train the local pre-classifier on stored LLM analyses", None),
+    "export-tickets": (_export_tickets, "Stream tickets with their latest analysis to a file", _export_arguments),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Support ticket analyst maintenance commands.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text, add_arguments) in COMMANDS.items():
+        subparser = subcommands.add_parser(name, help=help_text)
+        if add_arguments is not None:
+            add_arguments(subparser)
+    args = parser.parse_args()
+
+    asyncio.run(COMMANDS[args.command][0](args))
+
+
+if __name__ == "__main__":
+    main()
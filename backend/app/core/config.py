@@ -15,6 +15,99 @@ class Settings(BaseSettings):
     database_url: Annotated[str, PostgresDsn] = "postgresql+asyncpg://postgres:postgres@db:5432/support_tickets"
     openai_api_key: str = ""
 
+    # Optional read replica for read-only routes (listings, run details, search, status,
+    # analytics, export); empty sends everything to database_url. Replicas may lag the primary.
+    database_read_url: str = ""
+    # Connection pool of each PostgreSQL engine (primary and replica get one each)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0  # Wait for a free connection before failing
+    db_pool_recycle_seconds: int = 1800  # Reopen connections older than this; -1 never
+    db_pool_pre_ping: bool = False
+    # asyncpg prepared statement cache per connection; 0 behind PgBouncer in transaction mode
+    db_statement_cache_size: int = 100
+
+    # "openai", or "fake" for an offline model with deterministic answers (development, benchmarks).
+    # The fake's latency is log-normal around fake_llm_latency_seconds; the rates inject failures.
+    llm_backend: str = "openai"
+    fake_llm_latency_seconds: float = 0.5
+    fake_llm_latency_sigma: float = 0.5
+    fake_llm_error_rate: float = 0.0
+    fake_llm_rate_limit_rate: float = 0.0
+    fake_llm_seed: int = 0
+
+    # Adaptive concurrency for LLM calls within a run
+    llm_initial_concurrency: int = 5
+    llm_min_concurrency: int = 1
+    llm_max_concurrency: int = 50
+    llm_latency_target_seconds: float = 5.0
+    # In-flight LLM calls of all runs in this process, shared between runs by fair queuing
+    llm_scheduler_concurrency: int = 50
+    # Transient LLM failures (429, 5xx, timeouts) are retried per call with jittered exponential
+    # backoff, never sooner than a Retry-After header asks; tickets still failing are dead-lettered
+    llm_retry_max_attempts: int = 4
+    llm_retry_base_delay_seconds: float = 1.0
+    llm_retry_max_delay_seconds: float = 30.0
+
+    # Provider quota shared by every LLM call of every run and worker; 0 disables a limit.
+    # Set slightly below the real quota. "database" coordinates all processes through
+    # a row in llm_rate_limits, "local" limits this process only.
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+    llm_rate_limit_backend: str = "database"
+    llm_rate_limit_burst_seconds: float = 5.0  # Bucket capacity, in seconds of quota
+
+    # Batched classification: tickets per call are chosen by a token budget
+    llm_batch_classification: bool = True
+    llm_batch_token_budget: int = 3000
+    llm_batch_max_tickets: int = 25
+
+    # Ticket descriptions are compacted before they go into any prompt: quoted replies, signatures,
+    # long stack traces and repeated log lines are dropped, then anything over the per-ticket
+    # budget is cut from the middle (keeping head and tail)
+    ticket_compaction_enabled: bool = True
+    ticket_token_budget: int = 600
+
+    # Hierarchical summary: token budget per chunk of tickets and per merge of partial summaries
+    summary_chunk_token_budget: int = 8000
+    summary_combine_token_budget: int = 4000
+
+    # Classification results are written in micro-batches of this size (or age)
+    result_flush_batch_size: int = 50
+    result_flush_interval_seconds: float = 1.0
+
+    # Analysis job queue and workers
+    worker_concurrency: int = 2
+    embedded_worker_concurrency: int = 1  # Workers inside the API process; 0 to disable
+    worker_poll_interval_seconds: float = 1.0
+    worker_heartbeat_interval_seconds: float = 10.0
+    worker_stale_after_seconds: float = 60.0
+    worker_metrics_port: int = 9100  # Prometheus metrics of standalone workers; 0 to disable
+    job_max_attempts: int = 3
+    # A failed attempt is retried after this delay, doubled on every further attempt;
+    # the retry resumes the run and skips tickets that were already classified
+    job_retry_delay_seconds: float = 10.0
+    # How often a running job checks whether its run was cancelled
+    worker_cancel_poll_interval_seconds: float = 0.5
+
+    # Local pre-classifier (train with `python -m app.cli train-classifier`): tickets it is at
+    # least this confident about skip the LLM; a sample of them is still sent to the LLM to
+    # measure agreement. Does nothing until a model has been trained.
+    local_classifier_enabled: bool = True
+    local_classifier_threshold: float = 0.9
+    local_classifier_audit_rate: float = 0.05
+    local_classifier_min_samples: int = 200
+
+    # Similar-ticket index: memory-mapped files on local disk (one index per host); the
+    # default lives under backend/data whatever the working directory
+    similar_index_enabled: bool = True
+    similar_index_path: str = str(Path(__file__).resolve().parents[2] / "data" / "similar_index")
+    similar_index_dimensions: int = 256
+
+    # Classification cache (in-process LRU in front of the classification_cache table)
+    classification_cache_enabled: bool = True
+    classification_cache_size: int = 10000
+
     @property
     def sync_database_url(self) -> str:
         return self.database_url.replace("+asyncpg", "")
@@ -0,0 +1,100 @@
+"""
+Prometheus metrics, exposed at ``/metrics``.
+
+All metrics live in ``registry`` rather than the global default registry, so
+tests can read values with ``registry.get_sample_value(...)``.
+"""
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+registry = CollectorRegistry()
+
+# LLM calls; ``node`` is the LangGraph node making the call
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds",
+    "Latency of LLM calls, including time waiting for a concurrency slot",
+    ["node"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+    registry=registry,
+)
+LLM_CALLS = Counter(
+    "llm_calls_total",
+    "LLM calls by outcome (ok, overloaded, error)",
+    ["node", "outcome"],
+    registry=registry,
+)
+LLM_RATE_LIMITED = Counter(
+    "llm_rate_limited_total",
+    "LLM calls rejected with HTTP 429",
+    ["node"],
+    registry=registry,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported by the provider, by direction (input, output)",
+    ["node", "direction"],
+    registry=registry,
+)
+LLM_RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "llm_rate_limit_wait_seconds",
+    "Time LLM calls waited for the shared requests/tokens-per-minute quota",
+    buckets=(0, 0.1, 0.5, 1, 2, 5, 10, 30, 60),
+    registry=registry,
+)
+LLM_RETRIES = Counter(
+    "llm_retries_total",
+    "Tickets sent to the model again because a batched response left them out",
+    registry=registry,
+)
+LLM_CALL_RETRIES = Counter(
+    "llm_call_retries_total",
+    "LLM calls repeated after a transient failure (429, 5xx, timeout)",
+    ["node"],
+    registry=registry,
+)
+
+TICKET_COMPACTION_TOKENS_SAVED = Counter(
+    "ticket_compaction_tokens_saved_total",
+    "Estimated tokens removed from ticket descriptions before they were put into prompts",
+    registry=registry,
+)
+
+# Analysis pipeline
+ANALYSIS_TICKETS = Counter(
+    "analysis_tickets_total",
+    "Tickets finished by the analysis pipeline, by outcome (analyzed, failed)",
+    ["outcome"],
+    registry=registry,
+)
+ANALYSIS_RUN_TICKETS_PER_SECOND = Histogram(
+    "analysis_run_tickets_per_second",
+    "Throughput of each finished analysis run",
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250),
+    registry=registry,
+)
+ANALYSIS_QUEUE_DEPTH = Gauge(
+    "analysis_queue_depth",
+    "Analysis jobs waiting for a worker (sampled when metrics are scraped)",
+    registry=registry,
+)
+
+# HTTP
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response starts, by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    registry=registry,
+)
+
+# Database connection pools: "primary", and "replica" when a read replica is configured
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+    registry=registry,
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size", ["pool"], registry=registry)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently in use", ["pool"], registry=registry)
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond the pool size", ["pool"], registry=registry)
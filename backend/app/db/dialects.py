@@ -0,0 +1,39 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_name(db: AsyncSession) -> str:
+    """Name of the database dialect the session is bound to."""
+    return db.get_bind().dialect.name
+
+
+def upsert_insert(db: AsyncSession, table):
+    """INSERT construct supporting ON CONFLICT clauses for the session's dialect."""
+    if dialect_name(db) == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+# Below this many rows an exact COUNT(*) is cheap enough to use instead of the estimate
+_EXACT_COUNT_THRESHOLD = 10_000
+
+
+async def estimated_row_count(db: AsyncSession, table) -> int:
+    """
+    Row count of a table without scanning it where the database allows.
+
+    PostgreSQL answers from planner statistics (``pg_class.reltuples``); small
+    or never-analyzed tables, and other dialects, fall back to an exact count.
+    """
+    if dialect_name(db) == "postgresql":
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+            {"name": table.name},
+        )
+        estimate = result.scalar_one_or_none()
+        if estimate is not None and estimate >= _EXACT_COUNT_THRESHOLD:
+            return estimate
+
+    result = await db.execute(select(func.count()).select_from(table))
+    return result.scalar_one()
@@ -1,6 +1,10 @@
+import time
+
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
+from app.core import metrics
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -10,11 +14,65 @@ class Base(DeclarativeBase):
     pass
 
 
-def get_engine() -> AsyncEngine:
-    return create_async_engine(settings.database_url, echo=False)
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool recording how long each checkout waits for a connection."""
+
+    pool_name = "primary"
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT_SECONDS.labels(pool=self.pool_name).observe(
+                time.perf_counter() - started_at
+            )
+
+
+def get_engine(url: str | None = None, pool_name: str = "primary") -> AsyncEngine:
+    """Engine for ``url`` (the primary by default) with the configured pool settings."""
+    url = url or settings.database_url
+    if url.startswith("sqlite"):
+        return create_async_engine(url, echo=False)
+
+    connect_args = {}
+    if "+asyncpg" in url:
+        connect_args = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return create_async_engine(
+        url,
+        echo=False,
+        # A subclass per engine, so pool.recreate() on dispose keeps the metrics label
+        poolclass=type(f"{pool_name.title()}Pool", (InstrumentedQueuePool,), {"pool_name": pool_name}),
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
+
+
+def instrument_pool(engine: AsyncEngine, pool_name: str = "primary") -> None:
+    """Report the engine's pool occupancy through the pool gauges."""
+    # Read through the engine, which swaps in a new pool when it is disposed
+    if isinstance(engine.pool, QueuePool):
+        metrics.DB_POOL_SIZE.labels(pool=pool_name).set_function(lambda: engine.pool.size())
+        metrics.DB_POOL_CHECKED_OUT.labels(pool=pool_name).set_function(lambda: engine.pool.checkedout())
+        metrics.DB_POOL_OVERFLOW.labels(pool=pool_name).set_function(lambda: max(0, engine.pool.overflow()))
 
 
 async_engine = get_engine()
+instrument_pool(async_engine)
+
+# Read-only routes use the replica when one is configured, and the primary otherwise
+if settings.database_read_url:
+    async_read_engine = get_engine(settings.database_read_url, "replica")
+    instrument_pool(async_read_engine, "replica")
+else:
+    async_read_engine = async_engine
 
 async_session_factory = async_sessionmaker(
     bind=async_engine,
@@ -22,8 +80,33 @@ async_session_factory = async_sessionmaker(
     class_=AsyncSession,
 )
 
+read_session_factory = async_sessionmaker(
+    bind=async_read_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
 
 async def get_session() -> AsyncSession:
     async with async_session_factory() as session:
         yield session
 
+
+async def get_read_session() -> AsyncSession:
+    """Session for routes that only read; may lag writes when it is served by a replica."""
+    async with read_session_factory() as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
+
+async def create_all_tables() -> None:
+    """Create the tables of every registered model (no migrations, see README)."""
+    import app.models  # noqa: F401  - registers models with Base.metadata
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -1,27 +1,58 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.analysis import router as analysis_router
+from app.api.analytics import router as analytics_router
+from app.api.metrics import HTTPMetricsMiddleware, router as metrics_router
 from app.api.tickets import router as tickets_router
 from app.core.config import get_settings
-from app.db.session import async_engine, Base
-# Import models to register them with Base.metadata
-from app.models import Ticket, AnalysisRun, TicketAnalysis  # noqa: F401
+from app.db.session import async_engine, async_session_factory, create_all_tables, dispose_engines
+from app.services.classification_cache import ClassificationCache
+from app.services.progress import progress_bus
+from app.services.similar_tickets import SimilarTicketService
+from app.worker import Worker
+
+
+async def _catch_up_similar_index() -> None:
+    async with async_session_factory() as db:
+        await SimilarTicketService.index_new_tickets(db, wait=True)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Create all database tables
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await create_all_tables()
+    # Drop cached classifications made with an older classify prompt
+    async with async_session_factory() as db:
+        await ClassificationCache.purge_stale(db)
+
+    # Relay progress notifications from workers to streaming clients
+    await progress_bus.start(async_engine)
+
+    # Index tickets written while the API was down (or build a cold index) without delaying startup
+    index_task = asyncio.create_task(_catch_up_similar_index())
+
+    # Optionally process queued analysis jobs inside the API process as well;
+    # production deployments run dedicated `python -m app.worker` processes
+    stop_worker = asyncio.Event()
+    worker_task = None
+    concurrency = get_settings().embedded_worker_concurrency
+    if concurrency > 0:
+        worker_task = asyncio.create_task(Worker(concurrency=concurrency).run(stop_worker))
     try:
         yield
     finally:
-        await async_engine.dispose()
+        stop_worker.set()
+        if worker_task is not None:
+            await worker_task
+        index_task.cancel()
+        await progress_bus.stop()
+        await dispose_engines()
 
 
 def create_app() -> FastAPI:
@@ -37,12 +68,17 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Per-route request latency, served with everything else at /metrics
+    app.add_middleware(HTTPMetricsMiddleware)
+
     @app.get("/healthz")
     async def health_check() -> dict[str, str]:
         return {"status": "ok"}
 
     app.include_router(tickets_router)
     app.include_router(analysis_router)
+    app.include_router(analytics_router)
+    app.include_router(metrics_router)
 
     return app
 
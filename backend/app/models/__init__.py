@@ -1,3 +1,23 @@
-from .entities import AnalysisRun, Ticket, TicketAnalysis
+from .entities import (
+    AnalysisJob,
+    AnalysisRun,
+    AnalysisRunTicket,
+    AnalyticsRollup,
+    ClassificationCacheEntry,
+    LLMRateLimitBucket,
+    LocalClassifierModel,
+    Ticket,
+    TicketAnalysis,
+)
 
-__all__ = ["Ticket", "AnalysisRun", "TicketAnalysis"]
+__all__ = [
+    "Ticket",
+    "AnalysisRun",
+    "AnalysisRunTicket",
+    "TicketAnalysis",
+    "AnalyticsRollup",
+    "ClassificationCacheEntry",
+    "LLMRateLimitBucket",
+    "LocalClassifierModel",
+    "AnalysisJob",
+]
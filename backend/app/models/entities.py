@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func, Enum as SQLEnum
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 import sqlalchemy as sa
@@ -21,6 +21,10 @@ class TicketStatus(str, enum.Enum):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Every ticket listing filters by status and pages newest first
+        Index("ix_tickets_status_created_at_id", "status", sa.desc("created_at"), sa.desc("id")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255))
@@ -35,14 +39,104 @@ class Ticket(Base):
     analyses: Mapped[List["TicketAnalysis"]] = relationship(back_populates="ticket")
 
 
+# Full-text search over title + description. The index lives outside the ORM
+# mapping because each dialect needs its own structure: a generated tsvector
+# column with a GIN index on PostgreSQL, an FTS5 table kept in sync by
+# triggers on SQLite (tests and local runs).
+TICKET_SEARCH_VECTOR = "search_vector"
+TICKET_FTS_TABLE = "tickets_fts"
+
+for _statement in (
+    f"""ALTER TABLE tickets ADD COLUMN IF NOT EXISTS {TICKET_SEARCH_VECTOR} tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', title || ' ' || description)) STORED""",
+    f"CREATE INDEX IF NOT EXISTS ix_tickets_search_vector ON tickets USING GIN ({TICKET_SEARCH_VECTOR})",
+):
+    sa.event.listen(Ticket.__table__, "after_create", sa.DDL(_statement).execute_if(dialect="postgresql"))
+
+for _statement in (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TICKET_FTS_TABLE}
+        USING fts5(title, description, content='tickets', content_rowid='id')""",
+    f"""CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO {TICKET_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+        INSERT INTO {TICKET_FTS_TABLE}({TICKET_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE OF title, description ON tickets BEGIN
+        INSERT INTO {TICKET_FTS_TABLE}({TICKET_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {TICKET_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+):
+    sa.event.listen(Ticket.__table__, "after_create", sa.DDL(_statement).execute_if(dialect="sqlite"))
+sa.event.listen(
+    Ticket.__table__,
+    "before_drop",
+    sa.DDL(f"DROP TABLE IF EXISTS {TICKET_FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+
 class AnalysisRun(Base):
     __tablename__ = "analysis_runs"
+    __table_args__ = (
+        # Active runs are looked up by "has processing tickets"
+        Index("ix_analysis_runs_processing_count", "processing_count"),
+        # Run listing pages newest first
+        Index("ix_analysis_runs_created_at_id", sa.desc("created_at"), sa.desc("id")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Set once the final summary has been written (successfully or not)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Set by a cancel request; the worker stops and releases unfinished tickets to PENDING
+    cancel_requested_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Per-run status counters, maintained on every ticket transition so run
+    # status can be answered without scanning tickets
+    ticket_count: Mapped[int] = mapped_column(Integer, default=0, server_default=sa.text("0"))
+    pending_count: Mapped[int] = mapped_column(Integer, default=0, server_default=sa.text("0"))
+    processing_count: Mapped[int] = mapped_column(Integer, default=0, server_default=sa.text("0"))
+    analyzed_count: Mapped[int] = mapped_column(Integer, default=0, server_default=sa.text("0"))
+    failed_count: Mapped[int] = mapped_column(Integer, default=0, server_default=sa.text("0"))
+
+    # Pipeline statistics reported by the LLM service (throughput, concurrency, ...)
+    stats: Mapped[Optional[dict]] = mapped_column(sa.JSON, nullable=True)
+    # Tickets that could not be classified, with the last error: [{"ticket_id", "error"}]
+    dead_letters: Mapped[Optional[list]] = mapped_column(sa.JSON, nullable=True)
 
     ticket_analyses: Mapped[List["TicketAnalysis"]] = relationship(back_populates="analysis_run", cascade="all, delete-orphan")
+    run_tickets: Mapped[List["AnalysisRunTicket"]] = relationship(back_populates="analysis_run", cascade="all, delete-orphan")
+
+    @property
+    def status(self) -> str:
+        """Overall run status derived from the status counters."""
+        if self.ticket_count and self.analyzed_count == self.ticket_count:
+            return "completed"
+        if self.cancel_requested_at is not None:
+            return "cancelling" if self.finished_at is None else "cancelled"
+        if self.failed_count:
+            return "failed"
+        if self.processing_count:
+            return "processing"
+        return "pending"
+
+
+class AnalysisRunTicket(Base):
+    """Membership of a ticket in an analysis run, with its status within that run."""
+    __tablename__ = "analysis_run_tickets"
+
+    analysis_run_id: Mapped[int] = mapped_column(ForeignKey("analysis_runs.id", ondelete="CASCADE"), primary_key=True)
+    ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id", ondelete="CASCADE"), primary_key=True, index=True)
+    status: Mapped[str] = mapped_column(
+        SQLEnum(TicketStatus, name="ticket_status", native_enum=True, create_constraint=True, values_callable=lambda x: [e.value for e in x]),
+        default=TicketStatus.PROCESSING.value,
+        server_default=sa.text("'processing'")
+    )
+
+    analysis_run: Mapped["AnalysisRun"] = relationship(back_populates="run_tickets")
 
 
 class TicketCategory(str, enum.Enum):
@@ -59,8 +153,8 @@ class TicketAnalysis(Base):
     __tablename__ = "ticket_analysis"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    analysis_run_id: Mapped[int] = mapped_column(ForeignKey("analysis_runs.id", ondelete="CASCADE"))
-    ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id", ondelete="CASCADE"))
+    analysis_run_id: Mapped[int] = mapped_column(ForeignKey("analysis_runs.id", ondelete="CASCADE"), index=True)
+    ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id", ondelete="CASCADE"), index=True)
     category: Mapped[str] = mapped_column(
         SQLEnum(
             TicketCategory,
@@ -83,7 +177,93 @@ class TicketAnalysis(Base):
         nullable=False,
     )
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # "llm" (including cached LLM results) or "local" (the local pre-classifier)
+    classified_by: Mapped[str] = mapped_column(String(16), default="llm", server_default=sa.text("'llm'"))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     analysis_run: Mapped["AnalysisRun"] = relationship(back_populates="ticket_analyses")
     ticket: Mapped["Ticket"] = relationship(back_populates="analyses")
 
+
+
+class AnalyticsRollup(Base):
+    """
+    Number of analyses per category and priority in one time bucket.
+
+    Incremented in the same transaction that inserts ``TicketAnalysis`` rows,
+    so breakdown queries never read the raw analyses.
+    """
+    __tablename__ = "analytics_rollups"
+
+    bucket: Mapped[str] = mapped_column(String(8), primary_key=True)  # "hour" or "day"
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    category: Mapped[str] = mapped_column(String(32), primary_key=True)
+    priority: Mapped[str] = mapped_column(String(16), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, server_default=sa.text("0"))
+
+
+class LocalClassifierModel(Base):
+    """A trained local pre-classifier; workers use the most recent one."""
+    __tablename__ = "local_classifier_models"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    samples: Mapped[int] = mapped_column(Integer)  # LLM analyses it was trained on
+    metrics: Mapped[dict] = mapped_column(sa.JSON)  # Accuracy and coverage on held-out analyses
+    model: Mapped[bytes] = mapped_column(sa.LargeBinary)  # NumPy .npz archive
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class LLMRateLimitBucket(Base):
+    """Shared token buckets for the LLM provider quota, one row per limit name."""
+    __tablename__ = "llm_rate_limits"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    requests: Mapped[float] = mapped_column(sa.Float)  # request tokens left in the bucket
+    tokens: Mapped[float] = mapped_column(sa.Float)  # LLM tokens left in the bucket
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class ClassificationCacheEntry(Base):
+    """Cached LLM classification keyed on ticket text, prompt version and model."""
+    __tablename__ = "classification_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    prompt_version: Mapped[str] = mapped_column(String(16), index=True)
+    model: Mapped[str] = mapped_column(String(64))
+    category: Mapped[str] = mapped_column(String(32))
+    priority: Mapped[str] = mapped_column(String(16))
+    notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class JobStatus(str, enum.Enum):
+    """Status of a queued analysis job."""
+    QUEUED = "queued"  # Waiting for a worker
+    RUNNING = "running"  # Claimed by a worker
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class AnalysisJob(Base):
+    """Durable queue entry asking a worker to process an analysis run."""
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        # Workers claim the oldest available queued job
+        Index("ix_analysis_jobs_status_available_at", "status", "available_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    analysis_run_id: Mapped[int] = mapped_column(ForeignKey("analysis_runs.id", ondelete="CASCADE"), index=True)
+    status: Mapped[str] = mapped_column(
+        SQLEnum(JobStatus, name="job_status", native_enum=True, create_constraint=True, values_callable=lambda x: [e.value for e in x]),
+        default=JobStatus.QUEUED.value,
+        server_default=sa.text("'queued'")
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default=sa.text("0"))
+    worker_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -1,7 +1,37 @@
 """Prompt templates for ticket classification and summarization."""
 
+import hashlib
+
 from langchain_core.prompts import ChatPromptTemplate
 
+
+def prompt_version(*templates: ChatPromptTemplate) -> str:
+    """Short fingerprint of the prompts' text; changes whenever a prompt is edited."""
+    text = "\n".join(
+        message.prompt.template for template in templates for message in template.messages
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+# Classification instructions shared by the single and batched "Map" prompts
+CLASSIFY_INSTRUCTIONS = (
+    "PRIORITY GUIDELINES:\n"
+    "- HIGH: Critical issues affecting multiple users, security vulnerabilities, "
+    "service outages, data loss/corruption, billing errors, account lockouts, "
+    "or issues that completely block core functionality.\n"
+    "- MEDIUM: Issues affecting some users but with workarounds, performance problems "
+    "that degrade but don't block functionality, missing features that are important "
+    "but not urgent, or bugs that impact non-critical features.\n"
+    "- LOW: Minor bugs with easy workarounds, cosmetic issues, feature requests for "
+    "nice-to-have enhancements, accessibility improvements that don't block usage, "
+    "or issues affecting very few users.\n\n"
+    "Be judicious with HIGH priority - most tickets should be MEDIUM or LOW. "
+    "Only mark as HIGH if it's truly critical or blocking.\n\n"
+    "Optionally provide notes with additional insights, recommendations, or important details. "
+    "Only include notes if they add value - leave notes empty if not needed. "
+    "Respond using the provided tool."
+)
+
 # Prompt for the "Map" step (classifying a single ticket)
 CLASSIFY_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
     (
@@ -9,25 +39,27 @@ CLASSIFY_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
         "You are an expert ticket classifier. Classify the following ticket into a "
         "category (billing, bug, feature request, support, technical, account) and a "
         "priority (low, medium, high) based on its title and description.\n\n"
-        "PRIORITY GUIDELINES:\n"
-        "- HIGH: Critical issues affecting multiple users, security vulnerabilities, "
-        "service outages, data loss/corruption, billing errors, account lockouts, "
-        "or issues that completely block core functionality.\n"
-        "- MEDIUM: Issues affecting some users but with workarounds, performance problems "
-        "that degrade but don't block functionality, missing features that are important "
-        "but not urgent, or bugs that impact non-critical features.\n"
-        "- LOW: Minor bugs with easy workarounds, cosmetic issues, feature requests for "
-        "nice-to-have enhancements, accessibility improvements that don't block usage, "
-        "or issues affecting very few users.\n\n"
-        "Be judicious with HIGH priority - most tickets should be MEDIUM or LOW. "
-        "Only mark as HIGH if it's truly critical or blocking.\n\n"
-        "Optionally provide notes with additional insights, recommendations, or important details. "
-        "Only include notes if they add value - leave notes empty if not needed. "
-        "Respond using the provided tool."
+        + CLASSIFY_INSTRUCTIONS
     ),
     ("human", "Ticket Title: {title}\n\nTicket Description: {description}")
 ])
 
+# Prompt for the batched "Map" step (classifying several tickets in one call)
+BATCH_CLASSIFY_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "You are an expert ticket classifier. Classify each of the following tickets into a "
+        "category (billing, bug, feature request, support, technical, account) and a "
+        "priority (low, medium, high) based on its title and description. "
+        "Return exactly one classification per ticket, using the ticket's ID as ticket_id.\n\n"
+        + CLASSIFY_INSTRUCTIONS
+    ),
+    ("human", "Here are the tickets:\n\n{tickets_as_string}")
+])
+
+# Cached classifications are keyed on this, so editing the prompt invalidates them
+CLASSIFY_PROMPT_VERSION = prompt_version(CLASSIFY_PROMPT_TEMPLATE, BATCH_CLASSIFY_PROMPT_TEMPLATE)
+
 # Prompt for the "Reduce" step (summarizing all tickets)
 SUMMARY_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
     (
@@ -39,3 +71,27 @@ SUMMARY_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
     ("human", "Here are the processed tickets:\n\n{tickets_as_string}")
 ])
 
+
+# Prompt for the first level of a hierarchical "Reduce" (summarizing one chunk of tickets)
+CHUNK_SUMMARY_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "You are a helpful assistant. Summarize the following subset of processed tickets "
+        "in one short paragraph. Capture the main themes, the categories that dominate, and "
+        "name every urgent (high-priority) issue. Your summary will be merged with summaries "
+        "of other subsets, so do not write an introduction or conclusion."
+    ),
+    ("human", "Here are the processed tickets:\n\n{tickets_as_string}")
+])
+
+# Prompt for the upper levels of a hierarchical "Reduce" (merging partial summaries)
+COMBINE_SUMMARY_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "You are a helpful assistant. Generate a concise, one-paragraph executive summary "
+        "from the following partial summaries of a batch of processed tickets. Highlight any "
+        "major themes, common categories, or urgent (high-priority) issues. Use the totals "
+        "provided for any counts rather than estimating them from the partial summaries."
+    ),
+    ("human", "Totals: {totals}\n\nHere are the partial summaries:\n\n{summaries}")
+])
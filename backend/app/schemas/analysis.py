@@ -1,13 +1,18 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.ticket import TicketResponse
 
 
 class AnalyzeRequest(BaseModel):
+    """Which PENDING tickets to analyze; filters combine, and none means all of them."""
     ticketIds: Optional[list[int]] = None
+    createdAfter: Optional[datetime] = None  # inclusive
+    createdBefore: Optional[datetime] = None  # exclusive
+    query: Optional[str] = None  # full-text match on title and description
+    limit: Optional[int] = Field(default=None, ge=1)  # oldest tickets first
 
 
 class TicketAnalysisResponse(BaseModel):
@@ -22,10 +27,18 @@ class TicketAnalysisResponse(BaseModel):
         from_attributes = True
 
 
+class DeadLetter(BaseModel):
+    """A ticket of a run that could not be classified."""
+    ticket_id: int
+    error: str
+
+
 class AnalysisRunResponse(BaseModel):
     id: int
     created_at: datetime
     summary: Optional[str] = None
+    stats: Optional[dict] = None
+    dead_letters: Optional[list[DeadLetter]] = None
     ticket_analyses: list[TicketAnalysisResponse] = []
 
     class Config:
@@ -34,8 +47,29 @@ class AnalysisRunResponse(BaseModel):
 
 class AnalysisStatusResponse(BaseModel):
     analysis_run_id: int
-    status: str  # "pending", "processing", "completed", "failed"
-    ticket_ids: list[int] = []
+    status: str  # "pending", "processing", "completed", "failed", "cancelling", "cancelled"
+    ticket_ids: Optional[list[int]] = None  # only when asked for with include_ticket_ids
+    ticket_count: int = 0
+    pending_count: int = 0
+    processing_count: int = 0
+    analyzed_count: int = 0
+    failed_count: int = 0
+    stats: Optional[dict] = None
+    dead_letters: Optional[list[DeadLetter]] = None
+
+
+class AnalysisProgressEvent(BaseModel):
+    """Progress update pushed to subscribers of a run."""
+    analysis_run_id: int
+    status: str  # "pending", "processing", "completed", "failed", "cancelling", "cancelled"
+    ticket_count: int = 0
+    pending_count: int = 0
+    processing_count: int = 0
+    analyzed_count: int = 0
+    failed_count: int = 0
+    ticket_ids: list[int] = []  # tickets written since the previous event
+    finished: bool = False
+    summary: Optional[str] = None  # set on the final event
 
 
 class AnalysisRunListItem(BaseModel):
@@ -43,12 +77,13 @@ class AnalysisRunListItem(BaseModel):
     created_at: datetime
     summary: Optional[str] = None
     ticket_count: int = 0
-    status: str  # "pending", "processing", "completed", "failed"
+    status: str  # "pending", "processing", "completed", "failed", "cancelling", "cancelled"
 
 
 class AnalysisRunListResponse(BaseModel):
     items: list[AnalysisRunListItem]
     page: int
     page_size: int
-    total: int
+    total: int  # estimated for large tables on PostgreSQL
+    next_cursor: Optional[str] = None
 
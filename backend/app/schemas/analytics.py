@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class BreakdownItem(BaseModel):
+    bucket_start: datetime
+    category: str
+    priority: str
+    count: int
+
+
+class BreakdownResponse(BaseModel):
+    bucket: str  # "hour" or "day"
+    start: datetime
+    end: datetime
+    items: list[BreakdownItem]
+    total: int
+    by_category: dict[str, int]
+    by_priority: dict[str, int]
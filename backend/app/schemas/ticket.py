@@ -23,6 +23,7 @@ class TicketListResponse(BaseModel):
     items: list[TicketResponse]
     page: int
     page_size: int
+    next_cursor: str | None = None  # pass as ?cursor= to fetch the following page
 
 
 class AnalyzedTicketResponse(BaseModel):
@@ -42,3 +43,36 @@ class AnalyzedTicketListResponse(BaseModel):
     items: list[AnalyzedTicketResponse]
     page: int
     page_size: int
+    next_cursor: str | None = None
+
+
+class TicketImportError(BaseModel):
+    line: int  # line number where the rejected record starts
+    error: str
+
+
+class TicketImportResponse(BaseModel):
+    accepted: int
+    rejected: int
+    errors: list[TicketImportError]  # first rejected rows, capped
+
+
+class TicketSearchResult(TicketResponse):
+    rank: float  # relevance, higher is better; only comparable within one query
+
+
+class TicketSearchResponse(BaseModel):
+    items: list[TicketSearchResult]
+    page_size: int
+    next_cursor: str | None = None
+
+
+class SimilarTicket(TicketResponse):
+    similarity: float  # cosine similarity of the hashed text vectors, 1.0 = same words
+    category: str | None = None  # from the ticket's latest analysis, if any
+    priority: str | None = None
+
+
+class SimilarTicketsResponse(BaseModel):
+    ticket_id: int
+    items: list[SimilarTicket]  # most similar first
@@ -1,100 +1,333 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
 from typing import Sequence
 
-from fastapi import BackgroundTasks
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, String, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import joinedload
 
-from app.models.entities import AnalysisRun, Ticket, TicketAnalysis, TicketStatus
-from app.schemas.analysis import AnalysisRunResponse
+from app.core import metrics
+from app.core.config import get_settings
+from app.db.dialects import dialect_name, estimated_row_count
+from app.models.entities import AnalysisRun, AnalysisRunTicket, Ticket, TicketAnalysis, TicketStatus
+from app.schemas.analysis import (
+    AnalysisRunListItem,
+    AnalysisRunResponse,
+    AnalysisStatusResponse,
+)
+from app.services.analytics_service import AnalyticsService
+from app.services.classification_cache import ClassificationCache
+from app.services.job_queue import JobQueue, utcnow
 from app.services.llm_service import LLMService
+from app.services.local_classifier import LocalClassifierService
+from app.services.pagination import decode_seek_cursor, next_seek_cursor, seek_after
+from app.services.progress import progress_bus
+from app.services.ticket_service import TicketService
+
+logger = logging.getLogger(__name__)
+
+# Maps a ticket status to the AnalysisRun counter column tracking it
+_STATUS_COUNTERS = {
+    TicketStatus.PENDING.value: "pending_count",
+    TicketStatus.PROCESSING.value: "processing_count",
+    TicketStatus.ANALYZED.value: "analyzed_count",
+    TicketStatus.FAILED.value: "failed_count",
+}
+
+
+class AnalysisResultWriter:
+    """
+    Persists classified tickets of a run in small transactional micro-batches.
+
+    Each flush inserts the ``TicketAnalysis`` rows, moves the tickets to
+    ANALYZED (with run counters) and updates the analytics rollups in one
+    commit, so progress is visible and durable while the rest of the run is
+    still being classified.
+    """
+
+    def __init__(self, db: AsyncSession, analysis_run_id: int):
+        settings = get_settings()
+        self.db = db
+        self.analysis_run_id = analysis_run_id
+        self.batch_size = settings.result_flush_batch_size
+        self.flush_interval = settings.result_flush_interval_seconds
+        self.written_ids: set[int] = set()
+        self._pending: list[dict] = []
+        self._last_flush = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def add(self, processed_tickets: list[dict]) -> None:
+        """Buffer classified tickets, flushing when the batch is full or old enough."""
+        self._pending.extend(processed_tickets)
+        if (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all buffered results in one transaction."""
+        async with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            # A ticket is written once even if it is reported twice
+            rows = {p["id"]: p for p in pending if p["id"] not in self.written_ids}
+            if not rows:
+                return
+
+            analyzed_at = utcnow()
+            self.db.add_all([
+                TicketAnalysis(
+                    analysis_run_id=self.analysis_run_id,
+                    ticket_id=ticket_id,
+                    category=processed["category"],
+                    priority=processed["priority"],
+                    # Use LLM-generated notes if available
+                    notes=processed.get("notes") or None,
+                    classified_by=processed.get("classified_by", "llm"),
+                    created_at=analyzed_at,
+                )
+                for ticket_id, processed in rows.items()
+            ])
+            await self.db.flush()
+            await AnalysisService.transition_tickets(
+                self.db, self.analysis_run_id, list(rows), TicketStatus.ANALYZED.value
+            )
+            await AnalyticsService.record_analyses(
+                self.db,
+                [(processed["category"], processed["priority"]) for processed in rows.values()],
+                analyzed_at,
+            )
+            await self.db.commit()
+            self.written_ids.update(rows)
+            metrics.ANALYSIS_TICKETS.labels(outcome="analyzed").inc(len(rows))
+            await progress_bus.publish(self.db, self.analysis_run_id, rows)
 
 
 class AnalysisService:
     """Service layer for ticket analysis operations."""
 
+    @staticmethod
+    def _status_response(run: AnalysisRun, ticket_ids: list[int] | None = None) -> AnalysisStatusResponse:
+        """Build a status response from a run's counters."""
+        return AnalysisStatusResponse(
+            analysis_run_id=run.id,
+            status=run.status,
+            ticket_ids=ticket_ids,
+            ticket_count=run.ticket_count,
+            pending_count=run.pending_count,
+            processing_count=run.processing_count,
+            analyzed_count=run.analyzed_count,
+            failed_count=run.failed_count,
+            stats=run.stats,
+            dead_letters=run.dead_letters,
+        )
+
+    @staticmethod
+    async def transition_tickets(
+        db: AsyncSession,
+        analysis_run_id: int,
+        ticket_ids: Sequence[int],
+        to_status: str,
+    ) -> int:
+        """Move tickets of a run to a new status, keeping run counters in sync.
+
+        Updates the ticket rows, their run memberships and the run's status
+        counters in the caller's transaction. Returns the number of tickets moved.
+        """
+        if not ticket_ids:
+            return 0
+
+        # Count the tickets leaving each status so the counters can be adjusted
+        result = await db.execute(
+            select(AnalysisRunTicket.status, func.count())
+            .where(
+                AnalysisRunTicket.analysis_run_id == analysis_run_id,
+                AnalysisRunTicket.ticket_id.in_(ticket_ids),
+                AnalysisRunTicket.status != to_status,
+            )
+            .group_by(AnalysisRunTicket.status)
+        )
+        moved_from = {status: count for status, count in result.all()}
+        moved = sum(moved_from.values())
+        if not moved:
+            return 0
+
+        await db.execute(
+            update(AnalysisRunTicket)
+            .where(
+                AnalysisRunTicket.analysis_run_id == analysis_run_id,
+                AnalysisRunTicket.ticket_id.in_(ticket_ids),
+            )
+            .values(status=to_status)
+        )
+        await db.execute(
+            update(Ticket)
+            .where(Ticket.id.in_(ticket_ids))
+            .values(status=to_status)
+        )
+
+        counters = {
+            _STATUS_COUNTERS[to_status]: getattr(AnalysisRun, _STATUS_COUNTERS[to_status]) + moved
+        }
+        for from_status, count in moved_from.items():
+            column = _STATUS_COUNTERS[from_status]
+            counters[column] = getattr(AnalysisRun, column) - count
+        await db.execute(
+            update(AnalysisRun)
+            .where(AnalysisRun.id == analysis_run_id)
+            .values(**counters)
+        )
+        return moved
+
+    @staticmethod
+    async def transition_run_tickets(
+        db: AsyncSession,
+        analysis_run_id: int,
+        from_status: str,
+        to_status: str,
+    ) -> int:
+        """Move every ticket of a run in one status to another, keeping run counters in sync.
+
+        Like ``transition_tickets``, but the tickets are selected in the
+        database, so a run of any size takes a fixed number of statements and
+        no id list. Returns the number of tickets moved.
+        """
+        if from_status == to_status:
+            return 0
+        members = select(AnalysisRunTicket.ticket_id).where(
+            AnalysisRunTicket.analysis_run_id == analysis_run_id,
+            AnalysisRunTicket.status == from_status,
+        )
+        # Tickets first: the memberships still mark which ones to move
+        await db.execute(
+            update(Ticket)
+            .where(Ticket.id.in_(members.scalar_subquery()))
+            .values(status=to_status)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(
+            update(AnalysisRunTicket)
+            .where(
+                AnalysisRunTicket.analysis_run_id == analysis_run_id,
+                AnalysisRunTicket.status == from_status,
+            )
+            .values(status=to_status)
+            .execution_options(synchronize_session=False)
+        )
+        moved = result.rowcount
+        if not moved:
+            return 0
+
+        from_column, to_column = _STATUS_COUNTERS[from_status], _STATUS_COUNTERS[to_status]
+        await db.execute(
+            update(AnalysisRun)
+            .where(AnalysisRun.id == analysis_run_id)
+            .values({
+                from_column: getattr(AnalysisRun, from_column) - moved,
+                to_column: getattr(AnalysisRun, to_column) + moved,
+            })
+        )
+        return moved
+
     @staticmethod
     async def list_analysis_runs(
-        db: AsyncSession, page: int = 1, page_size: int = 10
+        db: AsyncSession, page: int = 1, page_size: int = 10, cursor: str | None = None
     ) -> dict:
-        """List all analysis runs with pagination."""
-        from app.schemas.analysis import AnalysisRunListItem
-        from sqlalchemy import func
-        from app.models.entities import Ticket, TicketStatus
-        
-        offset = (page - 1) * page_size
-
-        # Get total count
-        total_result = await db.execute(select(func.count(AnalysisRun.id)))
-        total = total_result.scalar_one()
-
-        # Get paginated analysis runs with ticket_analyses loaded
-        from sqlalchemy.orm import joinedload
-        
-        result = await db.execute(
+        """List all analysis runs with pagination (offset, or keyset when ``cursor`` is given)."""
+        # Planner estimate on large tables instead of a full count on every page
+        total = await estimated_row_count(db, AnalysisRun.__table__)
+
+        # Status and ticket count come straight from the run counters
+        query = (
             select(AnalysisRun)
-            .options(joinedload(AnalysisRun.ticket_analyses))
-            .order_by(AnalysisRun.created_at.desc())
-            .offset(offset)
+            .order_by(AnalysisRun.created_at.desc(), AnalysisRun.id.desc())
             .limit(page_size)
         )
-        runs = result.unique().scalars().all()
-
-        # Build response with status and ticket count
-        items = []
-        for run in runs:
-            # Get ticket count from ticket_analyses
-            ticket_count = len(run.ticket_analyses) if run.ticket_analyses else 0
-            
-            # Determine status based on ticket statuses
-            if ticket_count > 0:
-                ticket_ids = [ta.ticket_id for ta in run.ticket_analyses]
-                tickets_result = await db.execute(
-                    select(Ticket).where(Ticket.id.in_(ticket_ids))
-                )
-                tickets = tickets_result.scalars().all()
-                
-                if all(t.status == TicketStatus.ANALYZED.value for t in tickets):
-                    status = "completed"
-                elif any(t.status == TicketStatus.FAILED.value for t in tickets):
-                    status = "failed"
-                elif any(t.status == TicketStatus.PROCESSING.value for t in tickets):
-                    status = "processing"
-                else:
-                    status = "pending"
-            else:
-                # No tickets yet, check if there are processing tickets that might belong
-                tickets_result = await db.execute(
-                    select(Ticket).where(Ticket.status == TicketStatus.PROCESSING.value)
-                )
-                processing_tickets = tickets_result.scalars().all()
-                if processing_tickets:
-                    status = "processing"
-                    ticket_count = len(processing_tickets)
-                else:
-                    status = "pending"
-            
-            items.append(AnalysisRunListItem(
+        if cursor is not None:
+            query = query.where(seek_after(db, AnalysisRun, *decode_seek_cursor(cursor)))
+        else:
+            query = query.offset((page - 1) * page_size)
+        result = await db.execute(query)
+        runs = result.scalars().all()
+
+        items = [
+            AnalysisRunListItem(
                 id=run.id,
                 created_at=run.created_at,
                 summary=run.summary,
-                ticket_count=ticket_count,
-                status=status
-            ))
+                ticket_count=run.ticket_count,
+                status=run.status,
+            )
+            for run in runs
+        ]
 
         return {
             "items": items,
             "page": page,
             "page_size": page_size,
-            "total": total
+            "total": total,
+            "next_cursor": next_seek_cursor(runs, page_size),
         }
 
+    @staticmethod
+    async def _member_ticket_ids(db: AsyncSession, analysis_run_ids: list[int]) -> dict[int, list[int]]:
+        """Ticket ids of each run, from its memberships."""
+        members: dict[int, list[int]] = {run_id: [] for run_id in analysis_run_ids}
+        if analysis_run_ids:
+            result = await db.execute(
+                select(AnalysisRunTicket.analysis_run_id, AnalysisRunTicket.ticket_id)
+                .where(AnalysisRunTicket.analysis_run_id.in_(analysis_run_ids))
+                .order_by(AnalysisRunTicket.analysis_run_id, AnalysisRunTicket.ticket_id)
+            )
+            for run_id, ticket_id in result.all():
+                members[run_id].append(ticket_id)
+        return members
+
+    @staticmethod
+    async def get_analysis_status(
+        db: AsyncSession, analysis_run_id: int, include_ticket_ids: bool = False
+    ) -> AnalysisStatusResponse:
+        """
+        Get the current status of an analysis run from its counters.
+
+        One primary-key lookup whatever the size of the run; the run's ticket
+        ids are only read from its memberships when asked for.
+        """
+        analysis_run = await db.get(AnalysisRun, analysis_run_id)
+
+        if not analysis_run:
+            raise ValueError("Analysis run not found")
+
+        ticket_ids = None
+        if include_ticket_ids:
+            ticket_ids = (await AnalysisService._member_ticket_ids(db, [analysis_run_id]))[analysis_run_id]
+        return AnalysisService._status_response(analysis_run, ticket_ids)
+
+    @staticmethod
+    async def get_active_analysis_runs(
+        db: AsyncSession, include_ticket_ids: bool = False
+    ) -> list[AnalysisStatusResponse]:
+        """Get all analysis runs that still have processing tickets, optionally with their ticket ids."""
+        result = await db.execute(
+            select(AnalysisRun)
+            .where(AnalysisRun.processing_count > 0)
+            .order_by(AnalysisRun.created_at.desc())
+        )
+        runs = result.scalars().all()
+
+        members = {}
+        if include_ticket_ids:
+            members = await AnalysisService._member_ticket_ids(db, [run.id for run in runs])
+        return [AnalysisService._status_response(run, members.get(run.id)) for run in runs]
+
     @staticmethod
     async def get_analysis_run_details(
         db: AsyncSession, analysis_run_id: int
     ) -> AnalysisRunResponse:
         """Get detailed information about a specific analysis run."""
-        from sqlalchemy.orm import joinedload
-        
         result = await db.execute(
             select(AnalysisRun)
             .where(AnalysisRun.id == analysis_run_id)
@@ -103,69 +336,126 @@ class AnalysisService:
             )
         )
         analysis_run = result.unique().scalar_one_or_none()
-        
+
         if not analysis_run:
             raise ValueError(f"Analysis run {analysis_run_id} not found")
-        
+
         return AnalysisRunResponse.model_validate(analysis_run)
 
     @staticmethod
-    async def analyze_tickets(
+    def _claimable_tickets(
         db: AsyncSession,
-        background_tasks: BackgroundTasks,
-        ticket_ids: list[int] | None = None
-    ) -> AnalysisRunResponse:
-        """Start analysis of tickets - creates analysis run and returns immediately. Processing happens in background."""
-        
-        # Determine which tickets to analyze
+        ticket_ids: list[int] | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query: str | None = None,
+        limit: int | None = None,
+    ) -> Select:
+        """
+        Ids of PENDING tickets matching the filters, evaluated in the database.
+
+        On PostgreSQL the rows are locked with ``SKIP LOCKED``, so concurrent
+        claims take disjoint tickets instead of waiting on each other.
+        """
+        statement = select(Ticket.id).where(Ticket.status == TicketStatus.PENDING.value)
         if ticket_ids:
-            # Analyze specific tickets with PENDING status
+            statement = statement.where(Ticket.id.in_(ticket_ids))
+        if created_after is not None:
+            statement = statement.where(Ticket.created_at >= created_after)
+        if created_before is not None:
+            statement = statement.where(Ticket.created_at < created_before)
+        if query is not None:
+            matches = TicketService.search_matches(db, query)
+            statement = statement.where(Ticket.id.in_(select(matches.c.id)))
+        if limit is not None:
+            statement = statement.order_by(Ticket.created_at, Ticket.id).limit(limit)
+        if dialect_name(db) == "postgresql":
+            statement = statement.with_for_update(skip_locked=True, of=Ticket)
+        return statement
+
+    @staticmethod
+    async def _claim_tickets(db: AsyncSession, analysis_run_id: int, claimable: Select) -> int:
+        """
+        Move claimable tickets to PROCESSING and make them members of a run, in
+        the caller's transaction. Returns the number of tickets claimed.
+
+        The status check is repeated in the UPDATE, so a ticket is claimed by
+        one run only. On PostgreSQL the claim and the membership insert are one
+        statement and no ticket id passes through Python.
+        """
+        claimed = (
+            update(Ticket)
+            .where(Ticket.id.in_(claimable), Ticket.status == TicketStatus.PENDING.value)
+            .values(status=TicketStatus.PROCESSING.value)
+            .returning(Ticket.id)
+            .execution_options(synchronize_session=False)
+        )
+        if dialect_name(db) == "postgresql":
+            claimed = claimed.cte("claimed")
             result = await db.execute(
-                select(Ticket).where(
-                    Ticket.id.in_(ticket_ids),
-                    Ticket.status == TicketStatus.PENDING.value
+                insert(AnalysisRunTicket).from_select(
+                    ["analysis_run_id", "ticket_id", "status"],
+                    select(
+                        literal(analysis_run_id),
+                        claimed.c.id,
+                        literal(TicketStatus.PROCESSING.value, AnalysisRunTicket.status.type),
+                    ),
                 )
             )
-            tickets: Sequence[Ticket] = result.scalars().all()
-        else:
-            # Analyze all ready to analyze tickets (PENDING status)
-            result = await db.execute(
-                select(Ticket).where(Ticket.status == TicketStatus.PENDING.value)
-            )
-            tickets: Sequence[Ticket] = result.scalars().all()
+            return result.rowcount
 
-        if not tickets:
-            raise ValueError("No tickets to analyze")
+        # SQLite allows one writer at a time, so claiming first cannot race
+        ticket_ids = (await db.execute(claimed)).scalars().all()
+        if ticket_ids:
+            await db.execute(insert(AnalysisRunTicket), [
+                {
+                    "analysis_run_id": analysis_run_id,
+                    "ticket_id": ticket_id,
+                    "status": TicketStatus.PROCESSING.value,
+                }
+                for ticket_id in ticket_ids
+            ])
+        return len(ticket_ids)
 
-        # Update ticket statuses to PROCESSING
-        for ticket in tickets:
-            ticket.status = TicketStatus.PROCESSING.value
-        await db.flush()
+    @staticmethod
+    async def analyze_tickets(
+        db: AsyncSession,
+        ticket_ids: list[int] | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        query: str | None = None,
+        limit: int | None = None,
+    ) -> AnalysisRunResponse:
+        """Start analysis of tickets - creates analysis run and returns immediately.
 
-        # Create analysis run
-        analysis_run = AnalysisRun(
-            summary=f"Analyzing {len(tickets)} ticket(s)"
+        PENDING tickets matching the filters (all of them if none are given)
+        are claimed for the run in the database, so overlapping requests never
+        analyze a ticket twice. Processing is queued as a durable job that a
+        worker picks up.
+        """
+        claimable = AnalysisService._claimable_tickets(
+            db, ticket_ids, created_after, created_before, query, limit
         )
+
+        analysis_run = AnalysisRun()
         db.add(analysis_run)
         await db.flush()  # Get the ID
-        await db.commit()
 
-        # Start background processing with a new session
-        from app.db.session import async_session_factory
-        
-        async def process_with_new_session():
-            async with async_session_factory() as new_db:
-                await AnalysisService.process_analysis_background(
-                    new_db,
-                    analysis_run.id,
-                    ticket_ids
-                )
-        
-        background_tasks.add_task(process_with_new_session)
+        claimed = await AnalysisService._claim_tickets(db, analysis_run.id, claimable)
+        if not claimed:
+            await db.rollback()
+            raise ValueError("No tickets to analyze")
+
+        # The run's tickets are all counted as processing
+        analysis_run.summary = f"Analyzing {claimed} ticket(s)"
+        analysis_run.ticket_count = claimed
+        analysis_run.processing_count = claimed
+
+        # Queue the processing in the same transaction so it is never lost
+        JobQueue.enqueue(db, analysis_run.id)
+        await db.commit()
 
         # Return immediately with the analysis run
-        from sqlalchemy.orm import joinedload
-        
         result = await db.execute(
             select(AnalysisRun)
             .where(AnalysisRun.id == analysis_run.id)
@@ -177,121 +467,199 @@ class AnalysisService:
 
         return AnalysisRunResponse.model_validate(analysis_run)
 
+    @staticmethod
+    async def cancel_analysis(db: AsyncSession, analysis_run_id: int) -> AnalysisStatusResponse:
+        """
+        Ask a run to stop. Raises ValueError if it does not exist and
+        RuntimeError if it has already finished.
+
+        A run whose job is still queued is released at once. A running job is
+        stopped by its worker, which polls for the request and then releases
+        the run; results already written are kept.
+        """
+        run = await db.get(AnalysisRun, analysis_run_id)
+        if run is None:
+            raise ValueError("Analysis run not found")
+        if run.finished_at is not None:
+            raise RuntimeError("Analysis run has already finished")
+
+        if run.cancel_requested_at is None:
+            run.cancel_requested_at = utcnow()
+        if await JobQueue.cancel_queued(db, analysis_run_id):
+            await AnalysisService.release_cancelled_run(db, analysis_run_id)
+        else:
+            await db.commit()
+            await progress_bus.publish(db, analysis_run_id)
+        return await AnalysisService.get_analysis_status(db, analysis_run_id)
+
+    @staticmethod
+    async def release_cancelled_run(db: AsyncSession, analysis_run_id: int) -> None:
+        """Finish a cancelled run, returning its unfinished tickets to PENDING so a new run can take them."""
+        run = await db.get(AnalysisRun, analysis_run_id, populate_existing=True)
+        if run.finished_at is not None:
+            # It completed just before the cancel took effect
+            await db.commit()
+            return
+        released = await AnalysisService.transition_run_tickets(
+            db, analysis_run_id, TicketStatus.PROCESSING.value, TicketStatus.PENDING.value
+        )
+        await db.execute(
+            update(AnalysisRun)
+            .where(AnalysisRun.id == analysis_run_id)
+            .values(
+                summary=f"Cancelled: {run.analyzed_count} ticket(s) analyzed, {released} released",
+                cancel_requested_at=run.cancel_requested_at or utcnow(),
+                finished_at=utcnow(),
+            )
+        )
+        await db.commit()
+        await progress_bus.publish(db, analysis_run_id)
+
+    @staticmethod
+    async def fail_run(db: AsyncSession, analysis_run_id: int, error: str) -> int:
+        """
+        Finish a run that cannot continue, in the caller's transaction.
+
+        Results already written stay; the run's unfinished tickets are marked
+        FAILED. Returns the number of tickets failed.
+        """
+        failed = await AnalysisService.transition_run_tickets(
+            db, analysis_run_id, TicketStatus.PROCESSING.value, TicketStatus.FAILED.value
+        )
+        await db.execute(
+            update(AnalysisRun)
+            .where(AnalysisRun.id == analysis_run_id, AnalysisRun.finished_at.is_(None))
+            .values(summary=f"Analysis failed: {error}", finished_at=utcnow())
+        )
+        return failed
+
+    @staticmethod
+    async def _checkpointed_tickets(db: AsyncSession, analysis_run_id: int) -> list[dict]:
+        """Tickets of a run already classified and written, e.g. by an attempt that was interrupted."""
+        result = await db.execute(
+            select(
+                Ticket.id,
+                Ticket.title,
+                Ticket.description,
+                # Plain values, as the LLM service produces them
+                TicketAnalysis.category.cast(String).label("category"),
+                TicketAnalysis.priority.cast(String).label("priority"),
+                TicketAnalysis.notes,
+                TicketAnalysis.classified_by,
+            )
+            .join(TicketAnalysis, TicketAnalysis.ticket_id == Ticket.id)
+            .where(TicketAnalysis.analysis_run_id == analysis_run_id)
+            .order_by(Ticket.id)
+        )
+        return [dict(zip(result.keys(), row)) for row in result.all()]
+
     @staticmethod
     async def process_analysis_background(
-        db: AsyncSession, analysis_run_id: int, ticket_ids: list[int] | None = None
+        db: AsyncSession, analysis_run_id: int, final_attempt: bool = True
     ) -> None:
-        """Background task to process ticket analysis using LLM."""
+        """Background task to process ticket analysis using LLM.
+
+        Resumable: only the run's tickets still PROCESSING are classified, and
+        those an earlier attempt already wrote are passed to the summary as
+        checkpointed results. If this is not the ``final_attempt``, a failure
+        leaves the unfinished tickets PROCESSING for the retry instead of
+        failing them.
+        """
         try:
+            run = await db.get(AnalysisRun, analysis_run_id)
+            if run is None or run.finished_at is not None:
+                return
+            if run.cancel_requested_at is not None:
+                await AnalysisService.release_cancelled_run(db, analysis_run_id)
+                return
 
-            # Get tickets to analyze (should be PROCESSING status)
-            if ticket_ids:
-                result = await db.execute(
-                    select(Ticket).where(
-                        Ticket.id.in_(ticket_ids),
-                        Ticket.status == TicketStatus.PROCESSING.value
-                    )
-                )
-                tickets: Sequence[Ticket] = result.scalars().all()
-            else:
-                result = await db.execute(
-                    select(Ticket).where(Ticket.status == TicketStatus.PROCESSING.value)
+            # Get this run's tickets that are still PROCESSING
+            result = await db.execute(
+                select(Ticket)
+                .join(AnalysisRunTicket, AnalysisRunTicket.ticket_id == Ticket.id)
+                .where(
+                    AnalysisRunTicket.analysis_run_id == analysis_run_id,
+                    AnalysisRunTicket.status == TicketStatus.PROCESSING.value,
                 )
-                tickets: Sequence[Ticket] = result.scalars().all()
+            )
+            tickets: Sequence[Ticket] = result.scalars().all()
+            checkpointed = await AnalysisService._checkpointed_tickets(db, analysis_run_id)
 
-            if not tickets:
+            if not tickets and not checkpointed:
                 return
 
             # Prepare tickets for LLM processing
             tickets_for_llm = [
                 {
+                    "id": ticket.id,
                     "title": ticket.title,
-                    "description": ticket.description
+                    "description": ticket.description,
+                    "created_at": ticket.created_at,  # ticket age counts toward urgency
                 }
                 for ticket in tickets
             ]
 
-            # Initialize LLM service and analyze tickets
-            llm_service = LLMService()
-            processed_tickets, batch_summary = await llm_service.analyze_tickets(tickets_for_llm)
-
-            # Process each ticket - continue even if one fails
-            successful_count = 0
-            failed_count = 0
-
-            # Create a mapping of title+description to processed ticket for lookup
-            processed_map = {
-                (pt["title"], pt["description"]): pt
-                for pt in processed_tickets
-            }
-
-            for ticket in tickets:
-                try:
-                    # Find the corresponding processed ticket
-                    processed = processed_map.get((ticket.title, ticket.description))
-                    if not processed:
-                        raise ValueError(f"Processed ticket not found for ticket {ticket.id}: {ticket.title}")
-                    
-                    category = processed["category"]
-                    priority = processed["priority"]
-                    # Use LLM-generated notes if available, otherwise empty string
-                    notes = processed.get("notes") or None
-
-                    ticket_analysis = TicketAnalysis(
-                        analysis_run_id=analysis_run_id,
-                        ticket_id=ticket.id,
-                        category=category,
-                        priority=priority,
-                        notes=notes,
-                    )
-                    db.add(ticket_analysis)
-                    # Update ticket status to ANALYZED
-                    ticket.status = TicketStatus.ANALYZED.value
-                    successful_count += 1
-                except Exception as e:
-                    # Log error but continue with other tickets
-                    # Update ticket status to FAILED
-                    ticket.status = TicketStatus.FAILED.value
-                    failed_count += 1
-                    print(f"Error analyzing ticket {ticket.id}: {e}")
+            # Initialize LLM service and analyze tickets; results are written
+            # in micro-batches as they complete
+            writer = AnalysisResultWriter(db, analysis_run_id)
+            writer.written_ids.update(t["id"] for t in checkpointed)
+            settings = get_settings()
+            cache = None
+            if settings.classification_cache_enabled:
+                cache = ClassificationCache(async_sessionmaker(db.bind, expire_on_commit=False))
+            local_classifier = None
+            if settings.local_classifier_enabled:
+                local_classifier = await LocalClassifierService.load_latest(db)
+            llm_service = LLMService(cache=cache, result_sink=writer, local_classifier=local_classifier)
+            _, batch_summary = await llm_service.analyze_tickets(tickets_for_llm, checkpointed)
+            await writer.flush()
+
+            # Any ticket the pipeline did not return a result for has failed
+            # and is dead-lettered with the reason
+            missing_ids = [ticket.id for ticket in tickets if ticket.id not in writer.written_ids]
+            errors = {letter["ticket_id"]: letter["error"] for letter in llm_service.dead_letters}
+            dead_letters = [
+                {"ticket_id": ticket_id, "error": errors.get(ticket_id, "No result returned")}
+                for ticket_id in missing_ids
+            ]
+            for letter in dead_letters:
+                logger.error("Error analyzing ticket %d: %s", letter["ticket_id"], letter["error"])
+            failed = await AnalysisService.transition_tickets(
+                db, analysis_run_id, missing_ids, TicketStatus.FAILED.value
+            )
 
             # Update summary with LLM-generated summary or fallback
-            if successful_count > 0:
-                summary = batch_summary if batch_summary else f"Analyzed {successful_count} ticket(s)"
+            if writer.written_ids:
+                summary = batch_summary if batch_summary else f"Analyzed {len(writer.written_ids)} ticket(s)"
             else:
                 summary = "Analysis completed with no successful results"
-            
-            if failed_count > 0:
-                summary += f", {failed_count} failed"
+
+            if missing_ids:
+                summary += f", {len(missing_ids)} failed"
 
             await db.execute(
                 update(AnalysisRun)
                 .where(AnalysisRun.id == analysis_run_id)
-                .values(summary=summary)
+                .values(
+                    summary=summary,
+                    stats=llm_service.stats,
+                    dead_letters=dead_letters or None,
+                    finished_at=utcnow(),
+                )
             )
             await db.commit()
+            metrics.ANALYSIS_TICKETS.labels(outcome="failed").inc(failed)
+            metrics.ANALYSIS_RUN_TICKETS_PER_SECOND.observe(llm_service.stats["tickets_per_second"])
+            await progress_bus.publish(db, analysis_run_id)
 
         except Exception as e:
-            # Mark tickets as failed on error
-            if ticket_ids:
-                await db.execute(
-                    update(Ticket)
-                    .where(Ticket.id.in_(ticket_ids))
-                    .values(status=TicketStatus.FAILED.value)
-                )
-            else:
-                # Mark all tickets without analyses as failed
-                await db.execute(
-                    update(Ticket)
-                    .where(~Ticket.analyses.any())
-                    .values(status=TicketStatus.FAILED.value)
-                )
-            
-            await db.execute(
-                update(AnalysisRun)
-                .where(AnalysisRun.id == analysis_run_id)
-                .values(summary=f"Analysis failed: {str(e)}")
-            )
+            await db.rollback()
+            if not final_attempt:
+                # Results already written stay and the retry resumes from them
+                raise
+
+            failed = await AnalysisService.fail_run(db, analysis_run_id, str(e))
             await db.commit()
+            metrics.ANALYSIS_TICKETS.labels(outcome="failed").inc(failed)
+            await progress_bus.publish(db, analysis_run_id)
             raise
-
@@ -0,0 +1,166 @@
+"""Category × priority × time rollups of ticket analyses."""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.dialects import upsert_insert
+from app.models.entities import AnalyticsRollup, TicketAnalysis
+from app.schemas.analytics import BreakdownItem, BreakdownResponse
+
+BUCKET_WIDTHS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+BUCKETS = tuple(BUCKET_WIDTHS)
+
+# Rollup rows written per INSERT during a backfill
+_BACKFILL_CHUNK_SIZE = 1000
+
+
+def _as_utc(at: datetime) -> datetime:
+    # SQLite hands timestamps back naive; they are stored in UTC
+    if at.tzinfo is None:
+        return at.replace(tzinfo=timezone.utc)
+    return at.astimezone(timezone.utc)
+
+
+def bucket_start(at: datetime, bucket: str) -> datetime:
+    """Start of the UTC hour or day containing ``at`` (naive values are taken as UTC)."""
+    at = _as_utc(at).replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        at = at.replace(hour=0)
+    return at
+
+
+class AnalyticsService:
+    """Maintain and query analytics rollups."""
+
+    @staticmethod
+    async def record_analyses(
+        db: AsyncSession, analyses: Iterable[tuple[str, str]], at: datetime
+    ) -> None:
+        """
+        Count ``(category, priority)`` analyses made at ``at`` into the rollups.
+
+        Runs in the caller's transaction, so the counts commit together with
+        the analyses they describe.
+        """
+        counts = Counter(analyses)
+        if not counts:
+            return
+        await AnalyticsService._increment(db, [
+            {
+                "bucket": bucket,
+                "bucket_start": bucket_start(at, bucket),
+                "category": category,
+                "priority": priority,
+                "count": count,
+            }
+            for bucket in BUCKETS
+            for (category, priority), count in counts.items()
+        ])
+
+    @staticmethod
+    async def _increment(db: AsyncSession, rows: list[dict]) -> None:
+        key = ["bucket", "bucket_start", "category", "priority"]
+        insert = upsert_insert(db, AnalyticsRollup)
+        await db.execute(
+            insert.on_conflict_do_update(
+                index_elements=key,
+                set_={"count": AnalyticsRollup.count + insert.excluded.count},
+            ),
+            # Concurrent transactions lock the rollup rows they share in the same
+            # order, so they wait for each other instead of deadlocking
+            sorted(rows, key=lambda row: tuple(row[column] for column in key)),
+        )
+
+    @staticmethod
+    async def backfill(db: AsyncSession) -> int:
+        """
+        Rebuild all rollups from the stored analyses in one transaction.
+
+        Meant to be run once (e.g. after upgrading) while no analyses are being
+        written. Returns the number of analyses counted.
+        """
+        counts: Counter = Counter()
+        analyzed = 0
+        result = await db.stream(
+            select(TicketAnalysis.created_at, TicketAnalysis.category, TicketAnalysis.priority)
+            .execution_options(yield_per=10_000)
+        )
+        async for created_at, category, priority in result:
+            analyzed += 1
+            for bucket in BUCKETS:
+                counts[(bucket, bucket_start(created_at, bucket), category, priority)] += 1
+
+        await db.execute(delete(AnalyticsRollup))
+        rows = [
+            {"bucket": b, "bucket_start": start, "category": c, "priority": p, "count": n}
+            for (b, start, c, p), n in counts.items()
+        ]
+        for i in range(0, len(rows), _BACKFILL_CHUNK_SIZE):
+            await AnalyticsService._increment(db, rows[i:i + _BACKFILL_CHUNK_SIZE])
+        await db.commit()
+        return analyzed
+
+    @staticmethod
+    async def breakdown(
+        db: AsyncSession,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        bucket: str = "day",
+    ) -> BreakdownResponse:
+        """
+        Analyses per bucket, category and priority with ``start <= bucket_start < end``.
+
+        Defaults to the last 24 hours for hourly buckets and the last 30 days
+        for daily buckets. Only rollup rows are read.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+        if end is None:
+            # Include the current, still-filling bucket
+            end = bucket_start(datetime.now(timezone.utc), bucket) + BUCKET_WIDTHS[bucket]
+        else:
+            end = _as_utc(end)
+        if start is None:
+            start = end - (timedelta(days=1) if bucket == "hour" else timedelta(days=30))
+        start = bucket_start(start, bucket)
+        if start >= end:
+            raise ValueError("'from' must be before 'to'")
+
+        result = await db.execute(
+            select(AnalyticsRollup)
+            .where(
+                AnalyticsRollup.bucket == bucket,
+                AnalyticsRollup.bucket_start >= start,
+                AnalyticsRollup.bucket_start < end,
+            )
+            .order_by(AnalyticsRollup.bucket_start, AnalyticsRollup.category, AnalyticsRollup.priority)
+        )
+        rollups = result.scalars().all()
+
+        by_category: Counter = Counter()
+        by_priority: Counter = Counter()
+        for rollup in rollups:
+            by_category[rollup.category] += rollup.count
+            by_priority[rollup.priority] += rollup.count
+
+        return BreakdownResponse(
+            bucket=bucket,
+            start=start,
+            end=end,
+            items=[
+                BreakdownItem(
+                    bucket_start=bucket_start(rollup.bucket_start, bucket),
+                    category=rollup.category,
+                    priority=rollup.priority,
+                    count=rollup.count,
+                )
+                for rollup in rollups
+            ],
+            total=sum(by_category.values()),
+            by_category=dict(by_category),
+            by_priority=dict(by_priority),
+        )
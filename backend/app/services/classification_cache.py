@@ -0,0 +1,142 @@
+"""Content-addressed cache of ticket classifications.
+
+Entries are keyed on a hash of the normalized ticket text, the classify prompt
+version and the model name. Lookups go through an in-process LRU first and
+fall back to the ``classification_cache`` table.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.db.dialects import upsert_insert
+from app.db.session import async_session_factory
+from app.models.entities import ClassificationCacheEntry
+from app.prompts.ticket_analysis import CLASSIFY_PROMPT_VERSION
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Rows per INSERT and keys per lookup statement, kept well under driver bind-parameter limits
+_INSERT_CHUNK = 1000
+
+
+def normalize_ticket_text(title: str, description: str) -> str:
+    """Normalize ticket text so trivially different duplicates share a key."""
+    text = f"{title}\n{description}".lower()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def cache_key(title: str, description: str, model: str, prompt_version: str = CLASSIFY_PROMPT_VERSION) -> str:
+    """Hash of normalized ticket text, prompt version and model name."""
+    payload = "\x1f".join([normalize_ticket_text(title, description), prompt_version, model])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Small bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, Dict] = OrderedDict()
+
+    def get(self, key: str) -> Dict | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Dict) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Shared by every run in this process
+memory_cache = LRUCache(get_settings().classification_cache_size)
+
+
+class ClassificationCache:
+    """Two-level (memory + database) cache of classification results."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_factory,
+        lru: LRUCache = memory_cache,
+        prompt_version: str = CLASSIFY_PROMPT_VERSION,
+    ):
+        self.session_factory = session_factory
+        self.lru = lru
+        self.prompt_version = prompt_version
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """Return cached classifications for whichever keys are present."""
+        found: Dict[str, Dict] = {}
+        missing = []
+        for key in set(keys):
+            value = self.lru.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+
+        if missing:
+            async with self.session_factory() as db:
+                for start in range(0, len(missing), _INSERT_CHUNK):
+                    result = await db.execute(
+                        select(ClassificationCacheEntry).where(
+                            ClassificationCacheEntry.key.in_(missing[start:start + _INSERT_CHUNK]),
+                            ClassificationCacheEntry.prompt_version == self.prompt_version,
+                        )
+                    )
+                    for entry in result.scalars():
+                        value = {"category": entry.category, "priority": entry.priority, "notes": entry.notes}
+                        self.lru.put(entry.key, value)
+                        found[entry.key] = value
+
+        return found
+
+    async def put_many(self, entries: Dict[str, Dict], model: str) -> None:
+        """Store classifications, ignoring keys that are already cached."""
+        if not entries:
+            return
+
+        for key, value in entries.items():
+            self.lru.put(key, value)
+
+        rows = [
+            {
+                "key": key,
+                "prompt_version": self.prompt_version,
+                "model": model,
+                "category": value["category"],
+                "priority": value["priority"],
+                "notes": value.get("notes"),
+            }
+            for key, value in entries.items()
+        ]
+        async with self.session_factory() as db:
+            for start in range(0, len(rows), _INSERT_CHUNK):
+                stmt = upsert_insert(db, ClassificationCacheEntry).values(rows[start:start + _INSERT_CHUNK])
+                await db.execute(stmt.on_conflict_do_nothing(index_elements=["key"]))
+            await db.commit()
+
+    @staticmethod
+    async def purge_stale(db: AsyncSession, prompt_version: str = CLASSIFY_PROMPT_VERSION) -> int:
+        """Delete entries written under any other prompt version."""
+        result = await db.execute(
+            delete(ClassificationCacheEntry).where(ClassificationCacheEntry.prompt_version != prompt_version)
+        )
+        await db.commit()
+        return result.rowcount
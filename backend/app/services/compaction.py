@@ -0,0 +1,193 @@
+"""
+Compaction of ticket text before it is put into a prompt.
+
+Tickets pasted from email carry quoted reply chains and signatures, and bug
+reports carry stack traces and log dumps; none of it helps classify or
+summarize the ticket, but every token of it is paid for, once in the
+classify prompt and again in the summary. ``compact_description`` removes
+that noise and then cuts whatever still exceeds the per-ticket token budget
+out of the middle, keeping the head (what the customer asks) and the tail
+(usually the final error).
+"""
+
+import re
+from typing import List
+
+from app.services.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+# First line of a quoted thread: everything from here on was written earlier
+_REPLY_HEADER = re.compile(
+    r"^(?:On\b.{0,200}\bwrote:|-{2,}\s*(?:Original|Forwarded) Message\s*-{2,}|_{10,})$",
+    re.IGNORECASE,
+)
+_OUTLOOK_HEADER_FIELDS = ("sent:", "date:", "to:", "subject:")
+
+# "-- " is the conventional signature delimiter
+_SIGNATURE_DELIMITER = re.compile(r"^--\s*$")
+_SENT_FROM = re.compile(r"^(?:Sent from my|Get Outlook for)\b", re.IGNORECASE)
+_VALEDICTION = re.compile(
+    r"^(?:(?:best|kind|warm|many)\s+)?(?:regards|wishes|thanks|thank you|thx|cheers|sincerely|best)\b[\s\w,!.]{0,20}$",
+    re.IGNORECASE,
+)
+# A signature is at most this many short lines of names, titles and contact details
+_MAX_SIGNATURE_LINES = 6
+_MAX_SIGNATURE_LINE_CHARS = 60
+# Lowercase words outside addresses; a line with more of them than this is a sentence
+_LOWERCASE_WORD = re.compile(r"(?<![\w@./:])[a-z]+(?![\w@./])")
+_MAX_SIGNATURE_LOWERCASE_WORDS = 2
+_POSTSCRIPT = re.compile(r"^p\.?\s?s\b", re.IGNORECASE)
+
+# Numbers, hex ids and the like, which differ between otherwise identical log lines
+_VARIABLE_PART = re.compile(r"0x[0-9a-f]+|[0-9a-f]{8,}|\d+", re.IGNORECASE)
+# Consecutive similar lines beyond this many are collapsed into a marker
+_MAX_REPEATED_LINES = 2
+
+# Stack frame lines of Java/JavaScript/.NET, Python and native traces
+_STACK_FRAME = re.compile(r'^\s*(?:at\s+\S|File ".*", line \d+|#\d+\s+0x[0-9a-f]+)')
+# Frames kept at the top and bottom of a long trace
+_HEAD_FRAMES = 3
+_TAIL_FRAMES = 2
+
+# Share of the budget given to the beginning of an over-long text; the rest goes to its end
+_HEAD_SHARE = 2 / 3
+
+
+def compact_description(text: str, token_budget: int) -> str:
+    """Ticket text without quoted replies, signatures and repeated log lines, within ``token_budget``."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    lines = _strip_quoted_replies(lines)
+    lines = _strip_signature(lines)
+    lines = _collapse_stack_frames(lines)
+    lines = _collapse_repeated_lines(lines)
+    compacted = re.sub(r"\n{3,}", "\n\n", "\n".join(line.rstrip() for line in lines)).strip()
+    # Never compact a ticket away entirely
+    if not compacted:
+        compacted = text.strip()
+    return _keep_head_and_tail(compacted, token_budget)
+
+
+def _strip_quoted_replies(lines: List[str]) -> List[str]:
+    """Drop ``>`` quoted lines and the earlier messages below a reply header."""
+    kept: List[str] = []
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        header = bool(_REPLY_HEADER.match(stripped))
+        if not header and stripped.endswith("wrote:") and kept and kept[-1].strip().startswith("On "):
+            # Mail clients wrap long "On <date>, <name> wrote:" lines
+            kept.pop()
+            header = True
+        if not header and stripped.lower().startswith("from:"):
+            following = [other.strip().lower() for other in lines[i + 1:i + 4]]
+            header = any(field.startswith(_OUTLOOK_HEADER_FIELDS) for field in following)
+        if header and any(kept_line.strip() for kept_line in kept):
+            return kept
+        if stripped.startswith(">"):
+            continue
+        kept.append(line)
+    return kept
+
+
+def _strip_signature(lines: List[str]) -> List[str]:
+    """Drop a trailing signature block and "Sent from my ..." lines."""
+    lines = [line for line in lines if not _SENT_FROM.match(line.strip())]
+    for i, line in enumerate(lines):
+        if i and _SIGNATURE_DELIMITER.match(line) and _looks_like_signature(lines[i + 1:]):
+            return lines[:i]
+
+    # A sign-off ("Thanks,", "Best regards") followed only by a signature (name, title, phone)
+    content = [i for i, line in enumerate(lines) if line.strip()]
+    for i in reversed(content[1:]):
+        if len([j for j in content if j > i]) > _MAX_SIGNATURE_LINES:
+            break
+        if _VALEDICTION.match(lines[i].strip()) and _looks_like_signature(lines[i + 1:]):
+            return lines[:i]
+    return lines
+
+
+def _looks_like_signature(lines: List[str]) -> bool:
+    """Whether ``lines`` are a few short lines without sentences or a postscript."""
+    content = [line.strip() for line in lines if line.strip()]
+    return len(content) <= _MAX_SIGNATURE_LINES and all(
+        len(line) <= _MAX_SIGNATURE_LINE_CHARS
+        and not _POSTSCRIPT.match(line)
+        and len(_LOWERCASE_WORD.findall(line)) <= _MAX_SIGNATURE_LOWERCASE_WORDS
+        for line in content
+    )
+
+
+def _collapse_stack_frames(lines: List[str]) -> List[str]:
+    """Keep the first and last frames of long stack traces."""
+    collapsed: List[str] = []
+    frames: List[List[str]] = []
+
+    def flush() -> None:
+        if len(frames) > _HEAD_FRAMES + _TAIL_FRAMES + 1:
+            omitted = len(frames) - _HEAD_FRAMES - _TAIL_FRAMES
+            indent = frames[0][0][:_indent(frames[0][0])]
+            marker = f"{indent}[... {omitted} frames omitted]"
+            kept = frames[:_HEAD_FRAMES] + [[marker]] + frames[-_TAIL_FRAMES:]
+        else:
+            kept = frames
+        collapsed.extend(line for frame in kept for line in frame)
+        frames.clear()
+
+    for line in lines:
+        if _STACK_FRAME.match(line):
+            frames.append([line])
+        elif frames and line.strip() and _indent(line) > _indent(frames[-1][0]):
+            # Source line printed under a Python frame
+            frames[-1].append(line)
+        else:
+            flush()
+            collapsed.append(line)
+    flush()
+    return collapsed
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _collapse_repeated_lines(lines: List[str]) -> List[str]:
+    """Replace runs of lines that differ only in numbers and ids with a count (stack frames excepted)."""
+    collapsed: List[str] = []
+    run_key, run_length = None, 0
+
+    def flush() -> None:
+        if run_length > _MAX_REPEATED_LINES:
+            collapsed.append(f"[... {run_length - _MAX_REPEATED_LINES} similar lines omitted]")
+
+    for line in lines:
+        # Stack frames were already collapsed
+        key = None if _STACK_FRAME.match(line) else _VARIABLE_PART.sub("#", line.strip())
+        if key and key == run_key:
+            run_length += 1
+            if run_length <= _MAX_REPEATED_LINES:
+                collapsed.append(line)
+            continue
+        flush()
+        collapsed.append(line)
+        run_key, run_length = key, 1
+    flush()
+    return collapsed
+
+
+def _keep_head_and_tail(text: str, token_budget: int) -> str:
+    """Cut text over the budget out of the middle, at whitespace where possible."""
+    if estimate_tokens(text) <= token_budget:
+        return text
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    head_chars = int(budget_chars * _HEAD_SHARE)
+    tail_chars = max(0, budget_chars - head_chars)
+
+    head = text[:head_chars]
+    cut = max(head.rfind("\n"), head.rfind(" "))
+    if cut > head_chars * 0.8:
+        head = head[:cut]
+    tail = text[len(text) - tail_chars:] if tail_chars else ""
+    cut = min((i for i in (tail.find("\n"), tail.find(" ")) if i >= 0), default=-1)
+    if 0 <= cut < tail_chars * 0.2:
+        tail = tail[cut + 1:]
+
+    omitted = estimate_tokens(text[len(head):len(text) - len(tail)])
+    return f"{head.rstrip()}\n[... {omitted} tokens omitted ...]\n{tail.lstrip()}"
@@ -0,0 +1,121 @@
+"""Adaptive (AIMD) concurrency control for outbound LLM calls."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import openai
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Return True if an exception signals provider overload (429 or timeout)."""
+    if isinstance(exc, (openai.RateLimitError, openai.APITimeoutError, asyncio.TimeoutError, TimeoutError)):
+        return True
+    return getattr(exc, "status_code", None) == 429
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits in-flight requests with an additive-increase/multiplicative-decrease policy.
+
+    Every request that completes within ``latency_target`` seconds grows the limit
+    by ``1 / limit`` (roughly +1 per round of requests). A 429 or timeout cuts the
+    limit by ``decrease_factor``, at most once per round: failures from requests
+    started before the last cut do not cut it again.
+    """
+
+    def __init__(
+        self,
+        initial: int = 5,
+        minimum: int = 1,
+        maximum: int = 50,
+        latency_target: float = 5.0,
+        decrease_factor: float = 0.5,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._limit = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._last_decrease = 0.0
+
+        self._started_at = time.monotonic()
+        self.completed = 0
+        self.overloads = 0
+        self.errors = 0
+        self.peak_limit = self.limit
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> float:
+        """Wait for a free slot and return the request start time."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return time.monotonic()
+
+    async def release(
+        self, started_at: float, overloaded: bool = False, failed: bool = False, abandoned: bool = False
+    ) -> None:
+        """Free a slot and adapt the limit from the request outcome."""
+        now = time.monotonic()
+        async with self._condition:
+            self._in_flight -= 1
+            if abandoned:
+                # Cancelled by our side (run cancel, shutdown): says nothing about the provider
+                pass
+            elif failed:
+                # Errors unrelated to load say nothing about the right limit
+                self.errors += 1
+            elif overloaded:
+                self.overloads += 1
+                if started_at >= self._last_decrease:
+                    self._limit = max(float(self.minimum), self._limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.completed += 1
+                if now - started_at <= self.latency_target:
+                    self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+                    self.peak_limit = max(self.peak_limit, self.limit)
+            # Wake only as many waiters as there are free slots
+            self._condition.notify(max(0, self.limit - self._in_flight))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of the block."""
+        started_at = await self.acquire()
+        overloaded = failed = abandoned = False
+        try:
+            yield
+        except asyncio.CancelledError:
+            abandoned = True
+            raise
+        except BaseException as exc:
+            overloaded = is_overload_error(exc)
+            failed = not overloaded
+            raise
+        finally:
+            await self.release(started_at, overloaded=overloaded, failed=failed, abandoned=abandoned)
+
+    def stats(self) -> dict:
+        """Throughput and concurrency figures for reporting on the run."""
+        elapsed = time.monotonic() - self._started_at
+        return {
+            "concurrency_limit": self.limit,
+            "peak_concurrency_limit": self.peak_limit,
+            "llm_calls": self.completed,
+            "llm_overloads": self.overloads,
+            "llm_errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "calls_per_second": round(self.completed / elapsed, 3) if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,167 @@
+"""
+Offline chat model for development, load tests and benchmarks.
+
+``FakeChatModel`` stands in for ``ChatOpenAI`` wherever ``LLMService`` calls
+``with_structured_output``. Its answers are derived from a hash of the
+ticket text, so the same tickets always get the same classification, and its
+latency, errors and 429s are drawn from a seeded generator keyed by prompt
+and attempt, so a run behaves identically whatever order calls are made in.
+Like the OpenAI client, it retries failed requests a few times before raising.
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import re
+from collections import defaultdict
+
+import httpx
+import openai
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+
+CATEGORIES = ("billing", "bug", "feature_request", "support", "technical", "account")
+
+# First matching keyword wins; tickets matching none get a category by hash
+_CATEGORY_KEYWORDS = (
+    ("billing", ("refund", "invoice", "charge", "payment", "billing", "subscription")),
+    ("account", ("login", "password", "account", "sign in", "2fa")),
+    ("bug", ("error", "crash", "bug", "broken", "exception")),
+    ("feature_request", ("feature", "would like", "please add", "request")),
+    ("technical", ("api", "timeout", "slow", "integration", "webhook")),
+)
+_HIGH_PRIORITY_KEYWORDS = ("urgent", "outage", "down", "asap", "data loss", "security")
+
+_TICKET_BLOCK = re.compile(r"Ticket ID: (\d+)\nTitle: (.*?)\nDescription: (.*?)(?=\n---\n|\Z)", re.S)
+_SINGLE_TICKET = re.compile(r"Ticket Title: (.*?)\n\nTicket Description: (.*)\Z", re.S)
+_FAKE_REQUEST = httpx.Request("POST", "https://fake-llm.invalid/v1/chat/completions")
+
+
+def _digest(*parts: object) -> int:
+    data = "\x1f".join(str(part) for part in parts).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def classify_text(text: str) -> tuple[str, str]:
+    """Deterministic ``(category, priority)`` of a ticket's text."""
+    lowered = text.lower()
+    digest = _digest(text)
+    category = next(
+        (name for name, words in _CATEGORY_KEYWORDS if any(word in lowered for word in words)),
+        CATEGORIES[digest % len(CATEGORIES)],
+    )
+    if any(word in lowered for word in _HIGH_PRIORITY_KEYWORDS):
+        priority = "high"
+    else:
+        # Mostly low and medium, like real support queues
+        priority = ("low", "medium", "medium", "high")[(digest >> 8) % 4]
+    return category, priority
+
+
+class FakeChatModel:
+    """
+    Chat model stand-in with deterministic structured outputs.
+
+    Args:
+        latency_seconds: Median call latency; latencies are log-normal.
+        latency_sigma: Spread of the log-normal latency (0 for constant latency).
+        error_rate: Fraction of calls failing with HTTP 500.
+        rate_limit_rate: Fraction of calls rejected with HTTP 429.
+        seed: Seed of the latency and failure draws.
+        max_retries: Attempts repeated after an injected failure, with the
+            OpenAI client's exponential backoff, before the error is raised.
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.5,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 0,
+        max_retries: int = 2,
+    ):
+        self.latency_seconds = latency_seconds
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        self.max_retries = max_retries
+        self.calls = 0
+        self._attempts: dict[int, int] = defaultdict(int)
+
+    @classmethod
+    def from_settings(cls) -> "FakeChatModel":
+        settings = get_settings()
+        return cls(
+            latency_seconds=settings.fake_llm_latency_seconds,
+            latency_sigma=settings.fake_llm_latency_sigma,
+            error_rate=settings.fake_llm_error_rate,
+            rate_limit_rate=settings.fake_llm_rate_limit_rate,
+            seed=settings.fake_llm_seed,
+        )
+
+    def with_structured_output(self, schema: type[BaseModel]) -> Runnable:
+        async def respond(prompt_value) -> BaseModel:
+            return await self._respond(schema, prompt_value.to_string())
+
+        return RunnableLambda(lambda _: None, afunc=respond)
+
+    async def _respond(self, schema: type[BaseModel], prompt: str) -> BaseModel:
+        self.calls += 1
+        prompt_key = _digest(prompt)
+        for retry in range(self.max_retries + 1):
+            try:
+                await self._attempt(prompt_key)
+                return self._output(schema, prompt)
+            except openai.APIStatusError:
+                if retry == self.max_retries:
+                    raise
+            await asyncio.sleep(min(8.0, 0.5 * 2**retry))
+
+    async def _attempt(self, prompt_key: int) -> None:
+        """Simulate one HTTP request: wait, then maybe fail."""
+        attempt = self._attempts[prompt_key]
+        self._attempts[prompt_key] += 1
+        # Every attempt at a prompt gets its own draws, whatever the call order
+        rng = random.Random(_digest(self.seed, prompt_key, attempt))
+
+        if self.latency_seconds > 0:
+            await asyncio.sleep(rng.lognormvariate(math.log(self.latency_seconds), self.latency_sigma))
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            raise openai.RateLimitError(
+                "Rate limit reached (injected)",
+                response=httpx.Response(429, request=_FAKE_REQUEST),
+                body=None,
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise openai.InternalServerError(
+                "Server error (injected)",
+                response=httpx.Response(500, request=_FAKE_REQUEST),
+                body=None,
+            )
+
+    @staticmethod
+    def _output(schema: type[BaseModel], prompt: str) -> BaseModel:
+        fields = schema.model_fields
+        if "classifications" in fields:
+            item_schema = fields["classifications"].annotation.__args__[0]
+            return schema(classifications=[
+                item_schema(ticket_id=int(ticket_id), **_classification(f"{title}\n{description}"))
+                for ticket_id, title, description in _TICKET_BLOCK.findall(prompt)
+            ])
+        if "category" in fields:
+            # Only the ticket itself; the instructions name every category
+            match = _SINGLE_TICKET.search(prompt)
+            return schema(**_classification("\n".join(match.groups()) if match else prompt))
+        entries = prompt.count("Title:") or prompt.count("\n---\n") + 1
+        return schema(summary=f"Summary of {entries} entries ({_digest(prompt) % 10_000:04d}).")
+
+
+def _classification(text: str) -> dict:
+    category, priority = classify_text(text)
+    return {"category": category, "priority": priority}
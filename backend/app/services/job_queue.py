@@ -0,0 +1,226 @@
+"""Durable, database-backed queue of analysis jobs."""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.models.entities import AnalysisJob, JobStatus
+from app.services.progress import progress_bus
+
+
+def utcnow() -> datetime:
+    # Timestamps are always set from Python so comparisons behave the same on every dialect
+    return datetime.now(timezone.utc)
+
+
+def _held(job: AnalysisJob) -> tuple:
+    """
+    Criteria matching a job only while the claim ``job`` was loaded from still holds.
+
+    A reclaimed job is claimed again with another worker id, or with the same
+    one and a higher attempt count, so the settling of a stale claim matches
+    nothing.
+    """
+    return (
+        AnalysisJob.id == job.id,
+        AnalysisJob.status == JobStatus.RUNNING.value,
+        AnalysisJob.worker_id == job.worker_id,
+        AnalysisJob.attempts == job.attempts,
+    )
+
+
+class JobQueue:
+    """Enqueue, claim and settle analysis jobs stored in ``analysis_jobs``."""
+
+    @staticmethod
+    def enqueue(db: AsyncSession, analysis_run_id: int) -> AnalysisJob:
+        """Add a job for a run to the caller's transaction."""
+        job = AnalysisJob(
+            analysis_run_id=analysis_run_id,
+            status=JobStatus.QUEUED.value,
+            available_at=utcnow(),
+        )
+        db.add(job)
+        return job
+
+    @staticmethod
+    async def claim(db: AsyncSession, worker_id: str) -> AnalysisJob | None:
+        """
+        Claim the oldest available queued job for a worker.
+
+        On Postgres, ``FOR UPDATE SKIP LOCKED`` lets concurrent workers pick
+        different jobs without blocking. The guarded UPDATE makes the claim
+        safe on databases that ignore row locks (SQLite) as well.
+        """
+        now = utcnow()
+        result = await db.execute(
+            select(AnalysisJob.id)
+            .where(
+                AnalysisJob.status == JobStatus.QUEUED.value,
+                AnalysisJob.available_at <= now,
+            )
+            .order_by(AnalysisJob.available_at, AnalysisJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job_id = result.scalar_one_or_none()
+        if job_id is None:
+            await db.commit()
+            return None
+
+        claimed = await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, AnalysisJob.status == JobStatus.QUEUED.value)
+            .values(
+                status=JobStatus.RUNNING.value,
+                worker_id=worker_id,
+                heartbeat_at=now,
+                attempts=AnalysisJob.attempts + 1,
+            )
+        )
+        await db.commit()
+        if claimed.rowcount != 1:
+            # Another worker won the race
+            return None
+        return await db.get(AnalysisJob, job_id, populate_existing=True)
+
+    @staticmethod
+    async def heartbeat(db: AsyncSession, job_id: int, worker_id: str) -> bool:
+        """Record that a worker is still processing a job. Returns False if it lost the job."""
+        result = await db.execute(
+            update(AnalysisJob)
+            .where(
+                AnalysisJob.id == job_id,
+                AnalysisJob.worker_id == worker_id,
+                AnalysisJob.status == JobStatus.RUNNING.value,
+            )
+            .values(heartbeat_at=utcnow())
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def complete(db: AsyncSession, job: AnalysisJob) -> bool:
+        """Mark a claimed job as succeeded. Returns False if the claim was lost meanwhile."""
+        result = await db.execute(
+            update(AnalysisJob)
+            .where(*_held(job))
+            .values(status=JobStatus.SUCCEEDED.value, finished_at=utcnow())
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def fail(db: AsyncSession, job: AnalysisJob, error: str) -> bool:
+        """Mark a claimed job as failed. Returns False if the claim was lost meanwhile."""
+        result = await db.execute(
+            update(AnalysisJob)
+            .where(*_held(job))
+            .values(status=JobStatus.FAILED.value, finished_at=utcnow(), last_error=error)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def retry(db: AsyncSession, job: AnalysisJob, error: str, delay: float) -> bool:
+        """
+        Requeue a claimed job after a failed attempt, available again in ``delay`` seconds.
+
+        Returns False if the claim was lost meanwhile.
+        """
+        result = await db.execute(
+            update(AnalysisJob)
+            .where(*_held(job))
+            .values(
+                status=JobStatus.QUEUED.value,
+                worker_id=None,
+                available_at=utcnow() + timedelta(seconds=delay),
+                last_error=error,
+            )
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def cancel(db: AsyncSession, job_id: int) -> None:
+        """Mark a job as cancelled, in the caller's transaction."""
+        await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id)
+            .values(status=JobStatus.CANCELLED.value, finished_at=utcnow())
+        )
+
+    @staticmethod
+    async def cancel_queued(db: AsyncSession, analysis_run_id: int) -> bool:
+        """
+        Cancel a run's job if no worker holds it, in the caller's transaction.
+
+        Returns False if the job is running, in which case its worker notices
+        the cancel request and stops it.
+        """
+        result = await db.execute(
+            update(AnalysisJob)
+            .where(
+                AnalysisJob.analysis_run_id == analysis_run_id,
+                AnalysisJob.status == JobStatus.QUEUED.value,
+            )
+            .values(status=JobStatus.CANCELLED.value, finished_at=utcnow())
+        )
+        return result.rowcount > 0
+
+    @staticmethod
+    async def reclaim_stale(db: AsyncSession, stale_after: timedelta | None = None) -> int:
+        """
+        Requeue running jobs whose worker stopped sending heartbeats.
+
+        Jobs that have used up their attempts are failed instead, and their
+        runs finished in the same transaction with the unfinished tickets
+        failed. Returns the number of jobs requeued.
+        """
+        # analysis_service builds on this module
+        from app.services.analysis_service import AnalysisService
+
+        settings = get_settings()
+        if stale_after is None:
+            stale_after = timedelta(seconds=settings.worker_stale_after_seconds)
+        now = utcnow()
+        # Stored timestamps may come back naive (SQLite), so the criteria are
+        # evaluated only in the database, never against loaded objects
+        stale = (
+            (AnalysisJob.status == JobStatus.RUNNING.value)
+            & (AnalysisJob.heartbeat_at < now - stale_after)
+        )
+
+        error = "Worker stopped responding"
+        abandoned_runs = (await db.execute(
+            update(AnalysisJob)
+            .where(stale, AnalysisJob.attempts >= settings.job_max_attempts)
+            .values(status=JobStatus.FAILED.value, finished_at=now, last_error=error)
+            .returning(AnalysisJob.analysis_run_id)
+            .execution_options(synchronize_session=False)
+        )).scalars().all()
+        failed = 0
+        for analysis_run_id in abandoned_runs:
+            failed += await AnalysisService.fail_run(db, analysis_run_id, error)
+        result = await db.execute(
+            update(AnalysisJob)
+            .where(stale)
+            .values(status=JobStatus.QUEUED.value, worker_id=None, available_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        metrics.ANALYSIS_TICKETS.labels(outcome="failed").inc(failed)
+        for analysis_run_id in abandoned_runs:
+            await progress_bus.publish(db, analysis_run_id)
+        return result.rowcount
+
+    @staticmethod
+    async def queue_depth(db: AsyncSession) -> int:
+        """Number of jobs waiting for a worker."""
+        result = await db.execute(
+            select(func.count(AnalysisJob.id)).where(AnalysisJob.status == JobStatus.QUEUED.value)
+        )
+        return result.scalar_one()
@@ -1,20 +1,114 @@
 """LLM service for ticket analysis using LangGraph."""
 
+import asyncio
+import logging
 import os
-from typing import Dict, List, Literal, TypedDict
+import time
+from collections import Counter, defaultdict
+from statistics import median
+from typing import Awaitable, Callable, Dict, Iterable, List, Literal, Protocol, TypedDict
 
 from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph
 from pydantic import BaseModel, Field
 
-from app.prompts.ticket_analysis import CLASSIFY_PROMPT_TEMPLATE, SUMMARY_PROMPT_TEMPLATE
+from app.core import metrics
+from app.core.config import get_settings
+from app.prompts.ticket_analysis import (
+    BATCH_CLASSIFY_PROMPT_TEMPLATE,
+    CHUNK_SUMMARY_PROMPT_TEMPLATE,
+    CLASSIFY_PROMPT_TEMPLATE,
+    COMBINE_SUMMARY_PROMPT_TEMPLATE,
+    SUMMARY_PROMPT_TEMPLATE,
+)
+from app.services.classification_cache import ClassificationCache, cache_key
+from app.services.compaction import compact_description
+from app.services.concurrency import AdaptiveConcurrencyLimiter, is_overload_error
+from app.services.fake_llm import FakeChatModel
+from app.services.local_classifier import LocalClassifier
+from app.services.rate_limit import RateLimiter, get_rate_limiter
+from app.services.retry import backoff_delay, is_retryable_error, retry_after_seconds
+from app.services.scheduling import LIKELY_HIGH_SCORE, FairScheduler, Flow, get_fair_scheduler, urgency_score
+from app.services.text_features import ticket_text
+from app.services.tokens import estimate_tokens, pack_by_token_budget, truncate_to_tokens
 
 # Load environment variables from .env file (if it exists)
 # This works for local development. In Docker, environment variables should be
 # set via docker-compose.yml or Docker environment variables.
 load_dotenv()  # Will search for .env in current and parent directories
 
+logger = logging.getLogger(__name__)
+
+# Per-ticket tokens in a batched call beyond title and description:
+# the "Ticket ID/Title/Description" framing plus the structured output item
+_BATCH_ITEM_OVERHEAD_TOKENS = 60
+
+
+# Tokens a call spends beyond its input values: prompt template and structured output
+_CALL_OVERHEAD_TOKENS = 400
+
+# Graph node names, also used to label LLM call metrics
+_COMPACT_NODE = "compact_tickets"
+_CLASSIFY_NODE = "process_ticket_batch"
+_SUMMARY_NODE = "generate_batch_summary"
+
+
+class TokenUsageRecorder(BaseCallbackHandler):
+    """Counts the tokens each model response reports into ``llm_tokens_total``."""
+
+    def __init__(self, node: str):
+        self.input_tokens = metrics.LLM_TOKENS.labels(node=node, direction="input")
+        self.output_tokens = metrics.LLM_TOKENS.labels(node=node, direction="output")
+
+    def on_llm_end(self, response: LLMResult, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.input_tokens.inc(usage.get("input_tokens", 0))
+                    self.output_tokens.inc(usage.get("output_tokens", 0))
+
+
+_token_usage_recorders = {node: TokenUsageRecorder(node) for node in (_CLASSIFY_NODE, _SUMMARY_NODE)}
+
+
+async def _gather_or_cancel(*aws: Awaitable) -> list:
+    """
+    Like ``asyncio.gather``, but the first failure cancels the other awaitables
+    before it propagates, so none keeps reporting results (and writing through
+    the run's session) while the caller handles the error.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _describe_error(error: BaseException) -> str:
+    """Short description of a failure, for logs and dead letters."""
+    return f"{type(error).__name__}: {error}"[:500]
+
+
+# Receives (position, classification) pairs as map results complete
+ClassifiedCallback = Callable[[List[tuple[int, Dict]]], Awaitable[None]]
+
+
+class ResultSink(Protocol):
+    """Destination for classified tickets as the map step produces them."""
+
+    async def add(self, processed_tickets: List[Dict]) -> None:
+        ...
+
+    async def flush(self) -> None:
+        ...
+
 
 # Pydantic model for structured output (ticket classification)
 class TicketClassification(BaseModel):
@@ -38,6 +132,22 @@ class TicketClassification(BaseModel):
     )
 
 
+class BatchedTicketClassification(TicketClassification):
+    """The classification for one ticket within a batched call."""
+
+    ticket_id: int = Field(..., description="The ID of the ticket this classification belongs to.")
+
+
+# Pydantic model for structured output of a batched classification call
+class TicketClassificationBatch(BaseModel):
+    """Classifications for a batch of support tickets, one per ticket."""
+
+    classifications: List[BatchedTicketClassification] = Field(
+        ...,
+        description="Exactly one classification per ticket in the batch."
+    )
+
+
 # Pydantic model for structured summary output
 class BatchSummary(BaseModel):
     """Executive summary of a batch of processed tickets."""
@@ -55,11 +165,13 @@ class TicketTriageState(TypedDict):
 
     Attributes:
         input_tickets: The initial list of tickets to process.
+        checkpointed_tickets: Tickets classified by an earlier attempt of the same run.
         processed_tickets: The list of tickets *after* classification.
         batch_summary: The final summary of all tickets.
     """
 
     input_tickets: List[Dict]
+    checkpointed_tickets: List[Dict]
     processed_tickets: List[Dict]
     batch_summary: str
 
@@ -67,22 +179,66 @@ class TicketTriageState(TypedDict):
 class LLMService:
     """Service for LLM-based ticket analysis."""
 
-    def __init__(self):
-        """Initialize the LLM service with API key from environment variables."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENAI_API_KEY is not set in environment variables. "
-                "Please set it in your .env file. See backend/ENV_SETUP.md for instructions."
+    def __init__(
+        self,
+        cache: ClassificationCache | None = None,
+        result_sink: ResultSink | None = None,
+        rate_limiter: RateLimiter | None = None,
+        local_classifier: LocalClassifier | None = None,
+        scheduler: FairScheduler | None = None,
+    ):
+        """Initialize the LLM service with the configured backend (OpenAI or the offline fake).
+
+        Args:
+            cache: Optional classification cache consulted before calling the model.
+            result_sink: Optional sink that receives classified tickets as they complete.
+            rate_limiter: Provider quota to respect; defaults to the process-wide limiter.
+            local_classifier: Optional model that settles confident tickets without an LLM call.
+            scheduler: Shares LLM call slots with other runs; defaults to the process-wide scheduler.
+        """
+        settings = get_settings()
+        if settings.llm_backend == "fake":
+            self.model_name = "fake"
+            self.llm = FakeChatModel.from_settings()
+        else:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError(
+                    "OPENAI_API_KEY is not set in environment variables. "
+                    "Please set it in your .env file. See backend/ENV_SETUP.md for instructions."
+                )
+
+            # Initialize the LLM with gpt-4o-mini for speed and structured output
+            self.model_name = "gpt-4o-mini"
+            self.llm = ChatOpenAI(
+                model=self.model_name,
+                temperature=0,
+                api_key=api_key
             )
-        
-        # Initialize the LLM with gpt-4o-mini for speed and structured output
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0,
-            api_key=api_key
-        )
         self._graph = None
+        self.cache = cache
+        self.result_sink = result_sink
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.local_classifier = local_classifier
+
+        # Shared by every LLM call of this service (one service per run)
+        self.limiter = AdaptiveConcurrencyLimiter(
+            initial=settings.llm_initial_concurrency,
+            minimum=settings.llm_min_concurrency,
+            maximum=settings.llm_max_concurrency,
+            latency_target=settings.llm_latency_target_seconds,
+        )
+        self.scheduler = scheduler or get_fair_scheduler()
+        self.flow = Flow(limiter=self.limiter)
+        self.stats: Dict = {}
+        self._map_started_at = 0.0
+        # Seconds from the start of the map step until each ticket was classified
+        self._classified_after: Dict[str, float] = {}
+        self._classify_requests = 0
+        self._batch_fallbacks = 0
+        self._call_retries = 0
+        # Tickets whose classification kept failing: {"ticket_id", "error"}
+        self.dead_letters: List[Dict] = []
 
     def _build_graph(self) -> StateGraph:
         """Build and compile the LangGraph for ticket processing."""
@@ -91,107 +247,531 @@ class LLMService:
 
         builder = StateGraph(TicketTriageState)
 
+        # Add the preprocessing node shared by the classify and summary prompts
+        builder.add_node(_COMPACT_NODE, self._compact_tickets)
+
         # Add the "Map" node
-        builder.add_node("process_ticket_batch", self._process_ticket_batch)
+        builder.add_node(_CLASSIFY_NODE, self._process_ticket_batch)
 
         # Add the "Reduce" node
-        builder.add_node("generate_batch_summary", self._generate_batch_summary)
+        builder.add_node(_SUMMARY_NODE, self._generate_batch_summary)
 
         # Define the flow
-        builder.set_entry_point("process_ticket_batch")
-        builder.add_edge("process_ticket_batch", "generate_batch_summary")
-        builder.add_edge("generate_batch_summary", END)
+        builder.set_entry_point(_COMPACT_NODE)
+        builder.add_edge(_COMPACT_NODE, _CLASSIFY_NODE)
+        builder.add_edge(_CLASSIFY_NODE, _SUMMARY_NODE)
+        builder.add_edge(_SUMMARY_NODE, END)
 
         # Compile the graph
         self._graph = builder.compile()
         return self._graph
 
-    def _process_ticket_batch(self, state: TicketTriageState) -> Dict[str, List[Dict]]:
+    async def _compact_tickets(self, state: TicketTriageState) -> Dict[str, List[Dict]]:
+        """
+        Compact ticket descriptions before any prompt sees them.
+
+        Both the classify and the summary prompts are built from the compacted
+        text, so noise such as quoted replies or log dumps is paid for in
+        neither. Identical tickets with different noise also share a
+        classification (and cache entry).
+        """
+        settings = get_settings()
+        if not settings.ticket_compaction_enabled:
+            return {}
+        budget = settings.ticket_token_budget
+        tokens_before = tokens_after = 0
+
+        def compact(tickets: List[Dict]) -> List[Dict]:
+            nonlocal tokens_before, tokens_after
+            compacted = []
+            for ticket in tickets:
+                description = compact_description(ticket["description"], budget)
+                tokens_before += estimate_tokens(ticket["description"])
+                tokens_after += estimate_tokens(description)
+                compacted.append({**ticket, "description": description})
+            return compacted
+
+        update = {
+            "input_tickets": compact(state["input_tickets"]),
+            "checkpointed_tickets": compact(state.get("checkpointed_tickets") or []),
+        }
+        saved = tokens_before - tokens_after
+        self.stats.update({
+            "description_tokens": tokens_before,
+            "compacted_description_tokens": tokens_after,
+            "compaction_tokens_saved": saved,
+        })
+        metrics.TICKET_COMPACTION_TOKENS_SAVED.inc(saved)
+        return update
+
+    async def _process_ticket_batch(self, state: TicketTriageState) -> Dict[str, List[Dict]]:
         """
         This is the "MAP" step.
-        It takes the list of input tickets and processes them in parallel.
+        It takes the list of input tickets and processes them concurrently.
+
+        Each classification is handed to the result sink (if any) as soon as it
+        is available, and the sink is flushed before the step returns so the
+        reduce step only starts once every map result is durable. Tickets go to
+        the LLM most urgent first. Checkpointed tickets of an earlier attempt
+        are not classified again but are passed on to the summary.
+
+        A failing call fails only its own tickets: they are retried, and those
+        still failing are dead-lettered and left out of the summary.
         """
         tickets_in = state["input_tickets"]
+        self._map_started_at = time.monotonic()
+        self._classified_after = {}
+
+        # Identical tickets share a key, so each distinct text is classified once
+        keys = [cache_key(t["title"], t["description"], self.model_name) for t in tickets_in]
+        tickets_by_key: Dict[str, List[Dict]] = defaultdict(list)
+        for key, ticket in zip(keys, tickets_in):
+            tickets_by_key[key].append(ticket)
+        urgency = {
+            key: urgency_score(tickets[0]["title"], tickets[0]["description"], tickets[0].get("created_at"))
+            for key, tickets in tickets_by_key.items()
+        }
+
+        cached = await self.cache.get_many(tickets_by_key) if self.cache else {}
+        results: Dict[str, Dict] = dict(cached)
+        await self._emit([
+            {**ticket, **classification}
+            for key, classification in cached.items()
+            for ticket in tickets_by_key[key]
+        ])
+        self._mark_classified(cached)
+
+        to_classify = [key for key in tickets_by_key if key not in cached]
+
+        # Tickets the local classifier is sure about skip the LLM, except for an audit sample
+        local, audited = self._classify_locally(to_classify, tickets_by_key)
+        for key, classification in local.items():
+            if key not in audited:
+                results[key] = classification
+        await self._emit([
+            {**ticket, **classification}
+            for key, classification in local.items()
+            if key not in audited
+            for ticket in tickets_by_key[key]
+        ])
+        self._mark_classified(key for key in local if key not in audited)
+        to_llm = [key for key in to_classify if key not in local or key in audited]
+        # Likely HIGH-priority tickets are batched and scheduled first
+        to_llm.sort(key=lambda key: urgency[key], reverse=True)
+
+        async def on_classified(done: List[tuple[int, Dict]]) -> None:
+            # Add the new 'category' and 'priority' fields to the original ticket dicts
+            for ref, classification in done:
+                results[to_llm[ref]] = classification
+            self._mark_classified(to_llm[ref] for ref, _ in done)
+            await self._emit([
+                {**ticket, **classification}
+                for ref, classification in done
+                for ticket in tickets_by_key[to_llm[ref]]
+            ])
+
+        # Run the "map" concurrently; the limiter adapts how many calls are in flight
+        failures = await self._classify_tickets([tickets_by_key[key][0] for key in to_llm], on_classified)
+        self.dead_letters = [
+            {"ticket_id": ticket.get("id"), "error": _describe_error(error)}
+            for ref, error in sorted(failures.items())
+            for ticket in tickets_by_key[to_llm[ref]]
+        ]
+        if self.cache:
+            await self.cache.put_many({key: results[key] for key in to_llm if key in results}, self.model_name)
+        if self.result_sink:
+            await self.result_sink.flush()
+
+        # Combine original tickets with their classifications, in input order
+        checkpointed = state.get("checkpointed_tickets") or []
+        processed_tickets = [
+            {**original, **results[key]}
+            for key, original in zip(keys, tickets_in)
+            if key in results
+        ] + checkpointed
+
+        cache_hits = sum(1 for key in keys if key in cached)
+        local_hits = sum(1 for key in keys if key in local and key not in audited)
+        agreed = sum(
+            1 for key in audited
+            if key in results
+            and (results[key]["category"], results[key]["priority"])
+            == (local[key]["category"], local[key]["priority"])
+        )
+        self.stats.update({
+            "cache_hits": cache_hits,
+            "cache_misses": len(keys) - cache_hits,
+            "local_hits": local_hits,
+            "local_share": round(local_hits / len(keys), 4) if keys else 0.0,
+            "local_audited": len(audited),
+            "local_agreement": round(agreed / len(audited), 4) if audited else None,
+            "resumed_tickets": len(checkpointed),
+            "classify_calls": len(to_llm),
+            "classify_requests": self._classify_requests,
+            "batch_fallbacks": self._batch_fallbacks,
+            "call_retries": self._call_retries,
+            "dead_lettered": len(self.dead_letters),
+            **self._time_to_classification_stats(
+                [key for key in tickets_by_key if urgency[key] >= LIKELY_HIGH_SCORE]
+            ),
+        })
+
+        return {"processed_tickets": processed_tickets}
+
+    def _mark_classified(self, keys: Iterable[str]) -> None:
+        """Record how long after the start of the map step tickets got their classification."""
+        elapsed = time.monotonic() - self._map_started_at
+        for key in keys:
+            self._classified_after.setdefault(key, elapsed)
+
+    def _time_to_classification_stats(self, likely_high: List[str]) -> Dict:
+        """Median and worst time to classification, overall and for likely HIGH-priority tickets."""
+        def seconds(keys: Iterable[str]) -> List[float]:
+            return sorted(self._classified_after[key] for key in keys if key in self._classified_after)
+
+        everything, urgent = seconds(self._classified_after), seconds(likely_high)
+        return {
+            "classified_p50_seconds": round(median(everything), 3) if everything else None,
+            "likely_high_tickets": len(likely_high),
+            "likely_high_p50_seconds": round(median(urgent), 3) if urgent else None,
+            "likely_high_max_seconds": round(urgent[-1], 3) if urgent else None,
+        }
+
+    def _classify_locally(
+        self, keys: List[str], tickets_by_key: Dict[str, List[Dict]]
+    ) -> tuple[Dict[str, Dict], set[str]]:
+        """
+        Classifications the local classifier is confident about, by key, and the
+        keys among them sampled to be classified by the LLM as well.
 
-        # Create the "worker" chain that classifies one ticket
+        The sample is chosen by key, so the same tickets are audited every time.
+        """
+        if not self.local_classifier or not keys:
+            return {}, set()
+        settings = get_settings()
+        predictions = self.local_classifier.predict([
+            ticket_text(tickets_by_key[key][0]["title"], tickets_by_key[key][0]["description"])
+            for key in keys
+        ])
+        confident = {
+            key: {"category": p.category, "priority": p.priority, "notes": None, "classified_by": "local"}
+            for key, p in zip(keys, predictions)
+            if p.confidence >= settings.local_classifier_threshold
+        }
+        audited = {
+            key for key in confident
+            if int(key[:8], 16) / 0xFFFFFFFF < settings.local_classifier_audit_rate
+        }
+        return confident, audited
+
+    async def _emit(self, processed: List[Dict]) -> None:
+        """Hand finished classifications to the result sink."""
+        if processed and self.result_sink:
+            await self.result_sink.add(processed)
+
+    async def _classify_tickets(
+        self, tickets: List[Dict], on_classified: ClassifiedCallback
+    ) -> Dict[int, Exception]:
+        """
+        Classify tickets, reporting results as they complete.
+
+        ``on_classified`` receives ``(position, classification)`` pairs, where
+        position is the ticket's index in ``tickets``. Returns the error of
+        each position that could not be classified; other tickets are not
+        affected by it.
+        """
+        self._classify_requests = 0
+        self._batch_fallbacks = 0
+        self._call_retries = 0
+        failures: Dict[int, Exception] = {}
+        settings = get_settings()
+        if not settings.llm_batch_classification:
+            await _gather_or_cancel(*(
+                self._classify_isolated(ref, t, on_classified, failures) for ref, t in enumerate(tickets)
+            ))
+            return failures
+
+        # Pack tickets into as few calls as the token budget allows
+        batches = pack_by_token_budget(
+            list(enumerate(tickets)),
+            lambda item: self._classification_cost(item[1]),
+            budget=settings.llm_batch_token_budget,
+            max_items=settings.llm_batch_max_tickets,
+        )
+        await _gather_or_cancel(*(self._classify_batch(batch, on_classified, failures) for batch in batches))
+        return failures
+
+    @staticmethod
+    def _classification_cost(ticket: Dict) -> int:
+        """Estimated tokens one ticket adds to a batched call, including its output."""
+        return (
+            estimate_tokens(ticket["title"])
+            + estimate_tokens(ticket["description"])
+            + _BATCH_ITEM_OVERHEAD_TOKENS
+        )
+
+    async def _classify_single(self, ticket: Dict) -> Dict:
+        """Classify one ticket with its own call."""
         # We bind the Pydantic model to the LLM to force structured JSON output
         classify_chain = (
             CLASSIFY_PROMPT_TEMPLATE
             | self.llm.with_structured_output(TicketClassification)
         )
+        self._classify_requests += 1
+        classification = await self._ainvoke_with_retry(classify_chain, ticket, _CLASSIFY_NODE)
+        return classification.model_dump()  # .model_dump() converts Pydantic to dict
+
+    async def _classify_isolated(
+        self, ref: int, ticket: Dict, on_classified: ClassifiedCallback, failures: Dict[int, Exception]
+    ) -> None:
+        """Classify one ticket with its own call, recording a failure instead of raising it."""
+        try:
+            classification = await self._classify_single(ticket)
+        except Exception as e:
+            logger.warning("Classification of ticket %s failed: %s", ticket.get("id"), _describe_error(e))
+            failures[ref] = e
+            return
+        await on_classified([(ref, classification)])
+
+    async def _classify_batch(
+        self, batch: List[tuple[int, Dict]], on_classified: ClassifiedCallback, failures: Dict[int, Exception]
+    ) -> None:
+        """
+        Classify several tickets in one call.
 
-        # Run the "map" in parallel
-        # .batch() runs the chain for every item in the `tickets_in` list.
-        # We set max_concurrency to 5 for parallel processing.
-        classifications = classify_chain.batch(tickets_in, {"max_concurrency": 5})
+        Tickets are referenced by their position in the map input. Any ticket the
+        response leaves out, duplicates or garbles is retried with a single call.
+        If the call itself keeps failing with transient errors, its tickets fail.
+        """
+        if len(batch) == 1:
+            ref, ticket = batch[0]
+            await self._classify_isolated(ref, ticket, on_classified, failures)
+            return
+
+        batch_chain = (
+            BATCH_CLASSIFY_PROMPT_TEMPLATE
+            | self.llm.with_structured_output(TicketClassificationBatch)
+        )
+        tickets_as_string = "\n---\n".join(
+            f"Ticket ID: {ref}\nTitle: {ticket['title']}\nDescription: {ticket['description']}"
+            for ref, ticket in batch
+        )
 
-        # Combine original tickets with new classifications
-        processed_tickets = []
-        for original, classification in zip(tickets_in, classifications):
-            # Add the new 'category' and 'priority' fields to the original ticket dict
-            processed_tickets.append({
-                **original,
-                **classification.model_dump()  # .model_dump() converts Pydantic to dict
-            })
+        by_ref: Dict[int, Dict] = {}
+        self._classify_requests += 1
+        try:
+            response = await self._ainvoke_with_retry(
+                batch_chain, {"tickets_as_string": tickets_as_string}, _CLASSIFY_NODE
+            )
+            refs = {ref for ref, _ in batch}
+            counts = Counter(item.ticket_id for item in response.classifications)
+            by_ref = {
+                item.ticket_id: item.model_dump(exclude={"ticket_id"})
+                for item in response.classifications
+                if counts[item.ticket_id] == 1 and item.ticket_id in refs
+            }
+        except Exception as e:
+            # Retries are used up; single calls would only multiply load on a struggling provider
+            if is_retryable_error(e):
+                logger.warning("Batched classification of %d tickets failed: %s", len(batch), _describe_error(e))
+                failures.update((ref, e) for ref, _ in batch)
+                return
+        await on_classified(list(by_ref.items()))
+
+        missing = [(ref, ticket) for ref, ticket in batch if ref not in by_ref]
+        self._batch_fallbacks += len(missing)
+        metrics.LLM_RETRIES.inc(len(missing))
+
+        await asyncio.gather(*(
+            self._classify_isolated(ref, ticket, on_classified, failures) for ref, ticket in missing
+        ))
+
+    @staticmethod
+    def _estimate_call_tokens(inputs: Dict) -> int:
+        """Tokens a call is expected to consume: its inputs plus template and output."""
+        return sum(estimate_tokens(str(value)) for value in inputs.values()) + _CALL_OVERHEAD_TOKENS
+
+    async def _ainvoke_with_retry(self, chain, inputs: Dict, node: str):
+        """
+        ``_ainvoke_limited`` repeating transient failures (429, 5xx, timeouts).
 
-        return {"processed_tickets": processed_tickets}
+        Waits are jittered and grow exponentially, but are never shorter than
+        the provider's ``Retry-After``. The slot is released while waiting.
+        """
+        settings = get_settings()
+        attempt = 1
+        while True:
+            try:
+                return await self._ainvoke_limited(chain, inputs, node)
+            except Exception as e:
+                if attempt >= settings.llm_retry_max_attempts or not is_retryable_error(e):
+                    raise
+                delay = backoff_delay(
+                    attempt,
+                    settings.llm_retry_base_delay_seconds,
+                    settings.llm_retry_max_delay_seconds,
+                    retry_after_seconds(e),
+                )
+            self._call_retries += 1
+            metrics.LLM_CALL_RETRIES.labels(node=node).inc()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _ainvoke_limited(self, chain, inputs: Dict, node: str):
+        """
+        Invoke a chain asynchronously under the adaptive concurrency limit.
 
-    def _generate_batch_summary(self, state: TicketTriageState) -> Dict[str, str]:
+        The call first waits for its turn among the calls of every run in this
+        process, which the scheduler only gives while the run has a free slot.
+        Quota is reserved in that fair order, but the turn is given up while
+        the call sleeps off a quota wait, so other runs' calls are not held up.
+        """
+        cost = self._estimate_call_tokens(inputs)
+        async with self.scheduler.turn(self.flow, cost) as turn:
+            if self.rate_limiter:
+                # Wait for quota before taking a concurrency slot, so waiting calls don't hold slots
+                wait = await self.rate_limiter.reserve(cost)
+                if wait > 0:
+                    async with turn.suspended():
+                        await asyncio.sleep(wait)
+
+            started_at = time.perf_counter()
+            outcome = "ok"
+            try:
+                async with self.limiter.slot():
+                    return await chain.ainvoke(inputs, config={"callbacks": [_token_usage_recorders[node]]})
+            except Exception as e:
+                outcome = "overloaded" if is_overload_error(e) else "error"
+                if getattr(e, "status_code", None) == 429:
+                    metrics.LLM_RATE_LIMITED.labels(node=node).inc()
+                raise
+            finally:
+                metrics.LLM_CALL_SECONDS.labels(node=node).observe(time.perf_counter() - started_at)
+                metrics.LLM_CALLS.labels(node=node, outcome=outcome).inc()
+
+    async def _generate_batch_summary(self, state: TicketTriageState) -> Dict[str, str]:
         """
         This is the "REDUCE" step.
         It takes the list of *all* processed tickets and generates a single summary.
+
+        Tickets are packed into token-bounded chunks. A single chunk is summarized
+        directly; otherwise chunks are summarized in parallel and the partial
+        summaries are combined level by level until one summary remains, so no
+        call ever exceeds the configured budgets.
         """
         processed_tickets = state["processed_tickets"]
-
-        # Format the ticket data into a single string for the LLM
-        tickets_as_string_list = []
-        for t in processed_tickets:
-            tickets_as_string_list.append(
+        if not processed_tickets:
+            # Every ticket failed; there is nothing to summarize
+            return {"batch_summary": ""}
+        settings = get_settings()
+        chunk_budget = settings.summary_chunk_token_budget
+
+        # Format each ticket for the LLM; no single entry may exceed a chunk
+        entries = [
+            truncate_to_tokens(
                 f"  - Title: {t['title']}\n"
                 f"    Category: {t['category']}\n"
                 f"    Priority: {t.get('priority', 'N/A')}\n"
-                f"    Description: {t['description']}"
+                f"    Description: {t['description']}",
+                chunk_budget,
+            )
+            for t in processed_tickets
+        ]
+        chunks = pack_by_token_budget(entries, estimate_tokens, budget=chunk_budget)
+        self.stats["summary_levels"] = 1
+        self.stats["summary_calls"] = len(chunks)
+
+        if len(chunks) == 1:
+            summary_chain = (
+                SUMMARY_PROMPT_TEMPLATE
+                | self.llm.with_structured_output(BatchSummary)
+            )
+            summary_result = await self._ainvoke_with_retry(
+                summary_chain, {"tickets_as_string": "\n---\n".join(chunks[0])}, _SUMMARY_NODE
             )
-        tickets_as_string = "\n---\n".join(tickets_as_string_list)
+            return {"batch_summary": summary_result.summary}
 
-        # Create the "reduce" chain with structured output
-        llm = self.llm
-        summary_chain = (
-            SUMMARY_PROMPT_TEMPLATE
-            | llm.with_structured_output(BatchSummary)
+        # Level 1: summarize ticket chunks in parallel
+        chunk_chain = (
+            CHUNK_SUMMARY_PROMPT_TEMPLATE
+            | self.llm.with_structured_output(BatchSummary)
+        )
+        results = await asyncio.gather(*(
+            self._ainvoke_with_retry(
+                chunk_chain, {"tickets_as_string": "\n---\n".join(chunk)}, _SUMMARY_NODE
+            )
+            for chunk in chunks
+        ))
+        summaries = [result.summary for result in results]
+
+        # Higher levels: combine partial summaries until one remains. Each partial
+        # summary is capped at half the budget so every group merges at least two.
+        combine_budget = settings.summary_combine_token_budget
+        combine_chain = (
+            COMBINE_SUMMARY_PROMPT_TEMPLATE
+            | self.llm.with_structured_output(BatchSummary)
+        )
+        totals = self._summary_totals(processed_tickets)
+        while True:
+            capped = [truncate_to_tokens(summary, combine_budget // 2) for summary in summaries]
+            groups = pack_by_token_budget(capped, estimate_tokens, budget=combine_budget)
+            self.stats["summary_levels"] += 1
+            self.stats["summary_calls"] += len(groups)
+            results = await asyncio.gather(*(
+                self._ainvoke_with_retry(combine_chain, {
+                    "summaries": "\n---\n".join(group),
+                    "totals": totals,
+                }, _SUMMARY_NODE)
+                for group in groups
+            ))
+            summaries = [result.summary for result in results]
+            if len(summaries) == 1:
+                return {"batch_summary": summaries[0]}
+
+    @staticmethod
+    def _summary_totals(processed_tickets: List[Dict]) -> str:
+        """Exact category/priority counts, which partial summaries cannot provide."""
+        categories = Counter(t["category"] for t in processed_tickets)
+        priorities = Counter(t.get("priority", "N/A") for t in processed_tickets)
+        return (
+            f"{len(processed_tickets)} tickets. "
+            f"Categories: {', '.join(f'{k}={v}' for k, v in categories.most_common())}. "
+            f"Priorities: {', '.join(f'{k}={v}' for k, v in priorities.most_common())}."
         )
-
-        # Invoke the chain to get the structured summary
-        summary_result = summary_chain.invoke({"tickets_as_string": tickets_as_string})
-        summary = summary_result.summary
-
-        return {"batch_summary": summary}
 
     async def analyze_tickets(
-        self, tickets: List[Dict[str, str]]
+        self, tickets: List[Dict[str, str]], checkpointed: List[Dict] | None = None
     ) -> tuple[List[Dict], str]:
         """
         Analyze a batch of tickets using LangGraph.
 
         Args:
             tickets: List of ticket dictionaries with 'title' and 'description' keys.
+            checkpointed: Tickets of the same run already classified by an earlier
+                attempt (with 'category' and 'priority'); they are summarized, not reclassified.
 
         Returns:
             Tuple of (processed_tickets, batch_summary) where:
             - processed_tickets: List of tickets with added 'category' and 'priority' fields
+              (and descriptions as compacted for the prompts)
             - batch_summary: Executive summary string of all tickets
         """
         # Build the graph if not already built
         graph = self._build_graph()
 
         # Prepare input for the graph
-        inputs = {"input_tickets": tickets}
-
-        # Run the graph (this is synchronous, but we're in an async context)
-        # We'll run it in a thread pool to avoid blocking
-        import asyncio
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, graph.invoke, inputs)
+        inputs = {"input_tickets": tickets, "checkpointed_tickets": checkpointed or []}
+
+        # Run the graph natively on the event loop
+        self.stats = {}
+        started_at = time.monotonic()
+        result = await graph.ainvoke(inputs)
+        elapsed = time.monotonic() - started_at
+
+        self.stats.update({
+            **self.limiter.stats(),
+            "tickets_per_second": round(len(tickets) / elapsed, 3) if elapsed > 0 else 0.0,
+        })
 
         return result["processed_tickets"], result["batch_summary"]
 
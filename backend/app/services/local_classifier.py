@@ -0,0 +1,220 @@
+"""
+Local pre-classifier that settles confident tickets without an LLM call.
+
+One softmax regression per output (category, priority) over hashed TF-IDF
+features, trained from stored LLM analyses with
+``python -m app.cli train-classifier``. Trained models are stored in
+``local_classifier_models`` so every worker picks up the latest one.
+"""
+
+import io
+import random
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.entities import LocalClassifierModel, Ticket, TicketAnalysis, TicketCategory
+from app.services.compaction import compact_description
+from app.services.text_features import (
+    N_FEATURES,
+    SparseRows,
+    inverse_document_frequencies,
+    term_counts,
+    tfidf,
+    ticket_text,
+)
+
+CATEGORIES = tuple(category.value for category in TicketCategory)
+PRIORITIES = ("low", "medium", "high")
+
+# Share of the training analyses held out to measure the model
+_HOLDOUT_FRACTION = 0.1
+
+
+@dataclass
+class LocalPrediction:
+    category: str
+    priority: str
+    confidence: float  # The lower of the two heads' probabilities
+
+
+class _SoftmaxHead:
+    """Multinomial logistic regression over sparse features, trained by mini-batch SGD."""
+
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray):
+        self.labels = tuple(labels)
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def fit(
+        cls,
+        features: SparseRows,
+        targets: np.ndarray,
+        labels: Sequence[str],
+        epochs: int = 20,
+        learning_rate: float = 2.0,
+        l2: float = 1e-4,
+        batch_size: int = 128,
+    ) -> "_SoftmaxHead":
+        weights = np.zeros((N_FEATURES, len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        head = cls(labels, weights, bias)
+        for _ in range(epochs):
+            for start in range(0, len(features), batch_size):
+                end = min(start + batch_size, len(features))
+                batch = features.slice(start, end)
+                # Gradient of the mean cross-entropy with respect to the logits
+                error = head.probabilities(batch)
+                error[np.arange(end - start), targets[start:end]] -= 1
+                error /= end - start
+                per_value = batch.data[:, None] * error[batch.row_ids()]
+                for k in range(len(labels)):
+                    weights[:, k] -= learning_rate * np.bincount(
+                        batch.indices, weights=per_value[:, k], minlength=N_FEATURES
+                    )
+                bias -= learning_rate * error.sum(axis=0)
+            weights *= 1 - learning_rate * l2
+        return head
+
+    def probabilities(self, features: SparseRows) -> np.ndarray:
+        logits = features.dot(self.weights) + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+class LocalClassifier:
+    """Category and priority heads sharing one TF-IDF weighting."""
+
+    def __init__(self, idf: np.ndarray, category: _SoftmaxHead, priority: _SoftmaxHead):
+        self.idf = idf
+        self.category = category
+        self.priority = priority
+
+    @classmethod
+    def train(cls, texts: Sequence[str], categories: Sequence[str], priorities: Sequence[str]) -> "LocalClassifier":
+        counts = term_counts(texts)
+        idf = inverse_document_frequencies(counts)
+        features = tfidf(counts, idf)
+        return cls(
+            idf,
+            _SoftmaxHead.fit(features, np.array([CATEGORIES.index(c) for c in categories]), CATEGORIES),
+            _SoftmaxHead.fit(features, np.array([PRIORITIES.index(p) for p in priorities]), PRIORITIES),
+        )
+
+    def predict(self, texts: Sequence[str]) -> list[LocalPrediction]:
+        if not texts:
+            return []
+        features = tfidf(term_counts(texts), self.idf)
+        category = self.category.probabilities(features)
+        priority = self.priority.probabilities(features)
+        return [
+            LocalPrediction(
+                category=self.category.labels[c.argmax()],
+                priority=self.priority.labels[p.argmax()],
+                confidence=float(min(c.max(), p.max())),
+            )
+            for c, p in zip(category, priority)
+        ]
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            idf=self.idf,
+            category_weights=self.category.weights,
+            category_bias=self.category.bias,
+            category_labels=np.array(self.category.labels),
+            priority_weights=self.priority.weights,
+            priority_bias=self.priority.bias,
+            priority_labels=np.array(self.priority.labels),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LocalClassifier":
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            return cls(
+                arrays["idf"],
+                _SoftmaxHead(arrays["category_labels"].tolist(), arrays["category_weights"], arrays["category_bias"]),
+                _SoftmaxHead(arrays["priority_labels"].tolist(), arrays["priority_weights"], arrays["priority_bias"]),
+            )
+
+
+class LocalClassifierService:
+    """Train, store and load local pre-classifiers."""
+
+    @staticmethod
+    async def train(db: AsyncSession, min_samples: int | None = None) -> LocalClassifierModel:
+        """
+        Train a model on every LLM analysis, measure it on a held-out share and store it.
+
+        Analyses made by the local classifier itself are left out, so the model
+        never learns from its own output. Raises ValueError if there are fewer
+        than ``min_samples`` analyses.
+        """
+        settings = get_settings()
+        min_samples = settings.local_classifier_min_samples if min_samples is None else min_samples
+
+        result = await db.stream(
+            select(Ticket.title, Ticket.description, TicketAnalysis.category, TicketAnalysis.priority)
+            .join(Ticket, Ticket.id == TicketAnalysis.ticket_id)
+            .where(TicketAnalysis.classified_by == "llm")
+            .order_by(TicketAnalysis.id)
+            .execution_options(yield_per=10_000)
+        )
+
+        def text(title: str, description: str) -> str:
+            # Predictions are made on the text the pipeline compacted, so train on the same
+            if settings.ticket_compaction_enabled:
+                description = compact_description(description, settings.ticket_token_budget)
+            return ticket_text(title, description)
+
+        samples = [
+            (text(title, description), category, priority)
+            async for title, description, category, priority in result
+        ]
+        if len(samples) < min_samples:
+            raise ValueError(f"Need at least {min_samples} LLM analyses to train, found {len(samples)}")
+
+        # Fixed seed, so retraining on the same analyses gives the same model
+        random.Random(0).shuffle(samples)
+        holdout = samples[:max(1, int(len(samples) * _HOLDOUT_FRACTION))]
+        classifier = LocalClassifier.train(*zip(*samples[len(holdout):]))
+        metrics = _evaluate(classifier, holdout, settings.local_classifier_threshold)
+
+        model = LocalClassifierModel(samples=len(samples), metrics=metrics, model=classifier.to_bytes())
+        db.add(model)
+        await db.commit()
+        return model
+
+    @staticmethod
+    async def load_latest(db: AsyncSession) -> LocalClassifier | None:
+        """The most recently trained classifier, or None if none has been trained."""
+        data = (await db.execute(
+            select(LocalClassifierModel.model).order_by(LocalClassifierModel.id.desc()).limit(1)
+        )).scalar_one_or_none()
+        return LocalClassifier.from_bytes(data) if data is not None else None
+
+
+def _evaluate(classifier: LocalClassifier, holdout: list[tuple[str, str, str]], threshold: float) -> dict:
+    """Accuracy on held-out analyses, overall and on the tickets confident enough to skip the LLM."""
+    predictions = classifier.predict([text for text, _, _ in holdout])
+    correct = [
+        (prediction.category == category, prediction.priority == priority, prediction.confidence >= threshold)
+        for prediction, (_, category, priority) in zip(predictions, holdout)
+    ]
+    confident = [c and p for c, p, sure in correct if sure]
+    return {
+        "holdout": len(holdout),
+        "category_accuracy": round(sum(c for c, _, _ in correct) / len(holdout), 4),
+        "priority_accuracy": round(sum(p for _, p, _ in correct) / len(holdout), 4),
+        "threshold": threshold,
+        "confident_share": round(len(confident) / len(holdout), 4),
+        "confident_accuracy": round(sum(confident) / len(confident), 4) if confident else None,
+    }
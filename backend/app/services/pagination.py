@@ -0,0 +1,98 @@
+"""Keyset (cursor) pagination helpers."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import String, and_, case, func, or_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.dialects import dialect_name
+
+
+def _encode(payload: dict) -> str:
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict) or not isinstance(payload.get("id"), int):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque cursor pointing just past the row with ``last_id``."""
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    """Row id encoded in a cursor. Raises ValueError for malformed cursors."""
+    return _decode(cursor)["id"]
+
+
+def encode_rank_cursor(rank: float, last_id: int) -> str:
+    """Opaque cursor for results ordered by ``rank DESC, id DESC``."""
+    return _encode({"rank": rank, "id": last_id})
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """``(rank, id)`` encoded in a ranked cursor. Raises ValueError for malformed cursors."""
+    payload = _decode(cursor)
+    if not isinstance(payload.get("rank"), (int, float)):
+        raise ValueError("Invalid cursor")
+    return float(payload["rank"]), payload["id"]
+
+
+def encode_seek_cursor(created_at: datetime, last_id: int) -> str:
+    """Opaque cursor for results ordered by ``created_at DESC, id DESC``."""
+    return _encode({"created_at": created_at.isoformat(), "id": last_id})
+
+
+def decode_seek_cursor(cursor: str) -> tuple[datetime, int]:
+    """``(created_at, id)`` encoded in a seek cursor. Raises ValueError for malformed cursors."""
+    payload = _decode(cursor)
+    try:
+        return datetime.fromisoformat(payload["created_at"]), payload["id"]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def seek_after(db: AsyncSession, model, created_at: datetime, last_id: int):
+    """
+    Filter selecting rows after ``(created_at, last_id)`` in ``created_at DESC, id DESC`` order.
+
+    The sort key comes from the cursor, so the page continues even if the
+    last row has since been deleted. SQLite compares the stored text, and
+    keeps ``CURRENT_TIMESTAMP`` defaults without the microseconds bound
+    datetimes carry, so there both sides are compared in the longer format.
+    """
+    column, value = model.created_at, created_at
+    if dialect_name(db) == "sqlite":
+        stored = type_coerce(model.created_at, String)
+        column = case((func.length(stored) == 19, stored.concat(".000000")), else_=stored)
+        value = created_at.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return or_(column < value, and_(column == value, model.id < last_id))
+
+
+def next_seek_cursor(rows, page_size: int) -> str | None:
+    """Cursor for the page after ``rows`` sorted by ``created_at DESC, id DESC``, or None on the last page."""
+    if len(rows) < page_size:
+        return None
+    return encode_seek_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def next_cursor(rows, page_size: int, key: str = "id") -> str | None:
+    """
+    Cursor for the page after ``rows``, or None when this was the last page.
+
+    ``key`` names the attribute of the last row holding the id the page is sorted by.
+    """
+    if len(rows) < page_size:
+        return None
+    return encode_cursor(getattr(rows[-1], key))
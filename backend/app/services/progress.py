@@ -0,0 +1,236 @@
+"""Push notifications of analysis run progress (served as Server-Sent Events)."""
+
+import asyncio
+import contextlib
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.dialects import dialect_name
+from app.db.session import async_session_factory
+from app.models.entities import AnalysisRun
+from app.schemas.analysis import AnalysisProgressEvent
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "analysis_progress"
+# NOTIFY payloads are limited to 8000 bytes; larger ones drop their ticket ids
+_MAX_NOTIFY_BYTES = 7900
+# Comment lines sent while idle so proxies keep the connection open; the run is
+# re-read at the same time in case a notification was lost
+_KEEPALIVE_SECONDS = 15.0
+# Longest pause between attempts to re-open a lost LISTEN connection
+_MAX_RECONNECT_DELAY = 30.0
+
+
+async def load_progress(
+    db: AsyncSession, analysis_run_id: int, ticket_ids: Iterable[int] = ()
+) -> AnalysisProgressEvent:
+    """Current counters of a run. Raises ValueError if the run does not exist."""
+    run = await db.get(AnalysisRun, analysis_run_id, populate_existing=True)
+    if run is None:
+        raise ValueError("Analysis run not found")
+    finished = run.finished_at is not None
+    return AnalysisProgressEvent(
+        analysis_run_id=run.id,
+        status=run.status,
+        ticket_count=run.ticket_count,
+        pending_count=run.pending_count,
+        processing_count=run.processing_count,
+        analyzed_count=run.analyzed_count,
+        failed_count=run.failed_count,
+        ticket_ids=list(ticket_ids),
+        finished=finished,
+        summary=run.summary if finished else None,
+    )
+
+
+class ProgressBus:
+    """
+    Fans out analysis progress to subscribers such as SSE clients.
+
+    Publishers only say which tickets of a run were just written; the bus turns
+    each notification into one counters snapshot shared by every subscriber of
+    that run, so the database is read once per event rather than once per
+    client. On PostgreSQL notifications travel over ``LISTEN/NOTIFY`` and reach
+    every API process whichever worker made the progress; on other databases
+    delivery is in-process. A lost LISTEN connection is re-opened, and streams
+    re-read their run while idle, so a missed notification only delays an
+    update.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = async_session_factory):
+        self.session_factory = session_factory
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._engine: AsyncEngine | None = None
+        self._listen_connection: AsyncConnection | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """Listen for notifications from other processes (PostgreSQL only)."""
+        if engine.dialect.name != "postgresql":
+            return
+        self._engine = engine
+        await self._listen()
+
+    async def stop(self) -> None:
+        self._engine = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._listen_connection is not None:
+            connection, self._listen_connection = self._listen_connection, None
+            await connection.close()
+
+    async def _listen(self) -> None:
+        connection = await self._engine.connect()
+        try:
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.add_listener(CHANNEL, self._on_notify)
+            raw.driver_connection.add_termination_listener(self._on_listen_lost)
+        except BaseException:
+            await connection.close()
+            raise
+        self._listen_connection = connection
+
+    def _on_listen_lost(self, connection) -> None:
+        if self._engine is None or self._listen_connection is None:
+            # Closed by stop()
+            return
+        logger.warning("Lost the progress notification connection, reconnecting")
+        self._spawn(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        lost, self._listen_connection = self._listen_connection, None
+        with contextlib.suppress(Exception):
+            await lost.invalidate()
+        delay = 1.0
+        while self._engine is not None:
+            try:
+                await self._listen()
+            except Exception:
+                logger.exception("Failed to reconnect the progress notification connection")
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, _MAX_RECONNECT_DELAY)
+                continue
+            # Notifications sent while disconnected are lost; give subscribers the current counters
+            for run_id in list(self._subscribers):
+                await self._dispatch({"run_id": run_id, "ticket_ids": []})
+            return
+
+    async def publish(
+        self, db: AsyncSession, analysis_run_id: int, ticket_ids: Iterable[int] = ()
+    ) -> None:
+        """
+        Announce progress of a run. Call after the progress has been committed.
+
+        Best effort: failures are logged and never interrupt the analysis.
+        """
+        payload = {"run_id": analysis_run_id, "ticket_ids": list(ticket_ids)}
+        if dialect_name(db) != "postgresql":
+            await self._dispatch(payload)
+            return
+
+        data = json.dumps(payload)
+        if len(data) > _MAX_NOTIFY_BYTES:
+            # Subscribers still get the counters, just not which tickets moved
+            data = json.dumps({"run_id": analysis_run_id, "ticket_ids": []})
+        try:
+            await db.execute(
+                text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": data}
+            )
+            await db.commit()
+        except Exception:
+            logger.exception("Failed to publish progress of analysis run %d", analysis_run_id)
+            await db.rollback()
+
+    @asynccontextmanager
+    async def subscribe(self, analysis_run_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving an ``AnalysisProgressEvent`` for each progress update of a run."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[analysis_run_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[analysis_run_id].discard(queue)
+            if not self._subscribers[analysis_run_id]:
+                del self._subscribers[analysis_run_id]
+
+    async def stream(
+        self, analysis_run_id: int, is_disconnected: Callable[[], Awaitable[bool]]
+    ) -> AsyncIterator[str]:
+        """
+        Server-Sent Events for one run: a ``progress`` event with the current
+        counters, one per batch of written tickets, and a final ``finished``
+        event carrying the summary. While no notification arrives the run is
+        re-read every ``_KEEPALIVE_SECONDS``, and changed counters are sent.
+        """
+        # Subscribe before reading the snapshot so no update falls in between
+        async with self.subscribe(analysis_run_id) as queue:
+            async with self.session_factory() as db:
+                event = await load_progress(db, analysis_run_id)
+            while True:
+                yield _format_event(event)
+                if event.finished:
+                    return
+                while True:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=_KEEPALIVE_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        if await is_disconnected():
+                            return
+                    # A lost notification would otherwise leave the client waiting for good
+                    snapshot = await self._reload(analysis_run_id)
+                    if snapshot is not None and (
+                        snapshot.finished or not _same_counters(snapshot, event)
+                    ):
+                        event = snapshot
+                        break
+                    yield ": keepalive\n\n"
+
+    async def _reload(self, analysis_run_id: int) -> AnalysisProgressEvent | None:
+        try:
+            async with self.session_factory() as db:
+                return await load_progress(db, analysis_run_id)
+        except Exception:
+            logger.exception("Failed to load progress of analysis run %d", analysis_run_id)
+            return None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self._spawn(self._dispatch(json.loads(payload)))
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, payload: dict) -> None:
+        run_id = payload["run_id"]
+        queues = list(self._subscribers.get(run_id, ()))
+        if not queues:
+            return
+        try:
+            async with self.session_factory() as db:
+                event = await load_progress(db, run_id, payload["ticket_ids"])
+        except Exception:
+            logger.exception("Failed to load progress of analysis run %d", run_id)
+            return
+        for queue in queues:
+            queue.put_nowait(event)
+
+
+def _same_counters(a: AnalysisProgressEvent, b: AnalysisProgressEvent) -> bool:
+    return a.model_dump(exclude={"ticket_ids"}) == b.model_dump(exclude={"ticket_ids"})
+
+
+def _format_event(event: AnalysisProgressEvent) -> str:
+    name = "finished" if event.finished else "progress"
+    return f"event: {name}\ndata: {event.model_dump_json()}\n\n"
+
+
+progress_bus = ProgressBus()
@@ -0,0 +1,169 @@
+"""Provider quota (requests and tokens per minute) shared by every LLM call."""
+
+import asyncio
+import math
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.db.dialects import upsert_insert
+from app.db.session import async_session_factory
+from app.models.entities import LLMRateLimitBucket
+
+
+class TokenBuckets:
+    """
+    A request bucket and a token bucket refilled continuously at per-minute rates.
+
+    Reservations always succeed and may drive a bucket negative; the caller then
+    waits until the deficit has refilled. Callers are therefore served in the
+    order they reserve, and throughput settles at the configured rate instead
+    of bursting into the quota and stalling.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, burst_seconds: float):
+        self.request_rate = requests_per_minute / 60
+        self.token_rate = tokens_per_minute / 60
+        # A rate of 0 disables that bucket
+        self.request_capacity = max(1.0, self.request_rate * burst_seconds) if self.request_rate else math.inf
+        self.token_capacity = max(1.0, self.token_rate * burst_seconds) if self.token_rate else math.inf
+
+    def full(self) -> tuple[float, float]:
+        return (
+            self.request_capacity if self.request_rate else 0.0,
+            self.token_capacity if self.token_rate else 0.0,
+        )
+
+    def reserve(
+        self, requests: float, tokens: float, elapsed: float, cost: int
+    ) -> tuple[float, float, float]:
+        """
+        Refill levels for ``elapsed`` seconds and take one request and ``cost`` tokens.
+
+        Returns the new ``(requests, tokens)`` levels and how long to wait.
+        """
+        wait = 0.0
+        if self.request_rate:
+            requests = min(self.request_capacity, requests + self.request_rate * elapsed) - 1
+            wait = max(wait, -requests / self.request_rate)
+        if self.token_rate:
+            tokens = min(self.token_capacity, tokens + self.token_rate * elapsed) - cost
+            wait = max(wait, -tokens / self.token_rate)
+        return requests, tokens, wait
+
+
+class RateLimiter(ABC):
+    """Base class: ``acquire`` waits until a call of ``cost`` tokens fits the quota."""
+
+    def __init__(self, buckets: TokenBuckets):
+        self.buckets = buckets
+
+    async def acquire(self, cost: int) -> float:
+        """Reserve one request and ``cost`` tokens, sleeping if the quota is ahead. Returns the wait."""
+        wait = await self.reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    async def reserve(self, cost: int) -> float:
+        """Reserve one request and ``cost`` tokens without sleeping. Returns how long the caller must wait."""
+        wait = await self._reserve(cost)
+        metrics.LLM_RATE_LIMIT_WAIT_SECONDS.observe(wait)
+        return wait
+
+    @abstractmethod
+    async def _reserve(self, cost: int) -> float:
+        """Take one request and ``cost`` tokens from the quota. Returns how long to wait."""
+
+
+class LocalRateLimiter(RateLimiter):
+    """Quota shared by all runs of this process only."""
+
+    def __init__(self, buckets: TokenBuckets):
+        super().__init__(buckets)
+        self._requests, self._tokens = buckets.full()
+        self._updated_at = time.monotonic()
+
+    async def _reserve(self, cost: int) -> float:
+        now = time.monotonic()
+        self._requests, self._tokens, wait = self.buckets.reserve(
+            self._requests, self._tokens, now - self._updated_at, cost
+        )
+        self._updated_at = now
+        return wait
+
+
+class DatabaseRateLimiter(RateLimiter):
+    """
+    Quota shared by every process through one locked row of ``llm_rate_limits``.
+
+    Each reservation is one short transaction (``SELECT ... FOR UPDATE`` then
+    ``UPDATE``); reservations within a process are serialized so they do not
+    queue on the row lock. The row is created on first use with
+    ``ON CONFLICT DO NOTHING``, so processes starting together do not collide.
+    """
+
+    def __init__(
+        self,
+        buckets: TokenBuckets,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_factory,
+        name: str = "llm",
+    ):
+        super().__init__(buckets)
+        self.session_factory = session_factory
+        self.name = name
+        self._lock = asyncio.Lock()
+
+    async def _reserve(self, cost: int) -> float:
+        async with self._lock, self.session_factory() as db:
+            # Wall-clock time, since the row is shared between hosts
+            now = datetime.now(timezone.utc)
+            locked = (
+                select(LLMRateLimitBucket)
+                .where(LLMRateLimitBucket.name == self.name)
+                .with_for_update()
+            )
+            bucket = (await db.execute(locked)).scalar_one_or_none()
+            if bucket is None:
+                # Another process may be creating the row too; whichever insert loses waits for it
+                requests, tokens = self.buckets.full()
+                await db.execute(
+                    upsert_insert(db, LLMRateLimitBucket)
+                    .values(name=self.name, requests=requests, tokens=tokens, updated_at=now)
+                    .on_conflict_do_nothing(index_elements=["name"])
+                )
+                bucket = (await db.execute(locked)).scalar_one()
+
+            updated_at = bucket.updated_at
+            if updated_at.tzinfo is None:
+                # SQLite returns naive timestamps
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            elapsed = max(0.0, (now - updated_at).total_seconds())
+            bucket.requests, bucket.tokens, wait = self.buckets.reserve(
+                bucket.requests, bucket.tokens, elapsed, cost
+            )
+            bucket.updated_at = now
+            await db.commit()
+            return wait
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter | None:
+    """The process-wide rate limiter, or None when no quota is configured."""
+    settings = get_settings()
+    if not settings.llm_requests_per_minute and not settings.llm_tokens_per_minute:
+        return None
+    buckets = TokenBuckets(
+        settings.llm_requests_per_minute,
+        settings.llm_tokens_per_minute,
+        settings.llm_rate_limit_burst_seconds,
+    )
+    if settings.llm_rate_limit_backend == "local":
+        return LocalRateLimiter(buckets)
+    return DatabaseRateLimiter(buckets)
@@ -0,0 +1,62 @@
+"""Retry policy for transient LLM call failures."""
+
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import openai
+
+from app.services.concurrency import is_overload_error
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Return True for failures worth repeating the call for: overload, 5xx and dropped connections."""
+    if is_overload_error(exc) or isinstance(exc, openai.APIConnectionError):
+        return True
+    return (getattr(exc, "status_code", None) or 0) >= 500
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Delay the provider asked for in ``retry-after-ms`` or ``Retry-After``, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if "retry-after-ms" in headers:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            # An HTTP date
+            retry_at = parsedate_to_datetime(value)
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    retry_after: float | None = None,
+    rng: random.Random | None = None,
+) -> float:
+    """
+    Seconds to wait before retry number ``attempt`` (1 for the first retry).
+
+    Full jitter over an exponentially growing window, so retries of many
+    calls that failed together spread out instead of arriving together
+    again; never shorter than the provider's ``retry_after``.
+    """
+    window = min(cap, base * 2 ** (attempt - 1))
+    delay = (rng or random).uniform(0, window)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
@@ -0,0 +1,177 @@
+"""
+Priority-first scheduling of LLM calls within and across analysis runs.
+
+Within a run, tickets are classified in order of a cheap urgency score
+(keywords of likely HIGH-priority issues, plus ticket age), so a data-loss
+report in a 10k-ticket backlog is among the first calls rather than wherever
+the database happened to return it.
+
+Across runs, every LLM call of this process takes a turn from one
+``FairScheduler``: a start-time fair queue that shares the process's call
+slots between runs in proportion to their weights, measured in estimated
+tokens. A huge backlog run keeps its share but cannot starve a small
+interactive run started after it.
+"""
+
+import asyncio
+import re
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AsyncIterator
+
+from app.core.config import get_settings
+from app.services.concurrency import AdaptiveConcurrencyLimiter
+
+# Signals of the issues the classify prompt calls HIGH, with their weight
+_URGENCY_SIGNALS = [
+    (re.compile(p, re.IGNORECASE), weight)
+    for p, weight in [
+        (r"data (loss|lost)|lost (all |my |our |the )*(data|files|work)|deleted|wiped|corrupt", 3.0),
+        (r"outage|\b(is|are|went|goes|site|service|system|server|app|api) down\b|not loading for anyone", 3.0),
+        (r"security|breach|vulnerab|hacked|compromised|leaked", 3.0),
+        (r"locked out|can'?not (log ?in|login|sign in|access)|can'?t (log ?in|login|sign in|access)", 2.0),
+        (r"charged twice|double[- ]charged|overcharged|billing error|wrong amount", 2.0),
+        (r"urgent|asap|critical|emergency|immediately|production|prod\b", 2.0),
+        (r"error|crash|fail|broken|not working|timeout|timed out", 1.0),
+    ]
+]
+# Waiting tickets gain up to this much urgency, linearly over _AGE_HORIZON_HOURS
+_AGE_WEIGHT = 1.0
+_AGE_HORIZON_HOURS = 72.0
+# Tickets scoring at least this are reported as likely HIGH priority
+LIKELY_HIGH_SCORE = 3.0
+
+
+def urgency_score(title: str, description: str, created_at: datetime | None = None) -> float:
+    """How urgently a ticket should be classified; higher is sooner."""
+    text = f"{title}\n{description}"
+    score = sum(weight for pattern, weight in _URGENCY_SIGNALS if pattern.search(text))
+    if created_at is not None:
+        if created_at.tzinfo is None:
+            # SQLite returns naive UTC timestamps
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        age_hours = (datetime.now(timezone.utc) - created_at).total_seconds() / 3600
+        score += _AGE_WEIGHT * min(1.0, max(0.0, age_hours) / _AGE_HORIZON_HOURS)
+    return score
+
+
+class Flow:
+    """The queued LLM calls of one run, as seen by the scheduler."""
+
+    def __init__(self, weight: float = 1.0, limiter: AdaptiveConcurrencyLimiter | None = None):
+        self.weight = weight
+        # The run's own concurrency limit; calls beyond it are not given a turn
+        self.limiter = limiter
+        self.waiting: deque[tuple[float, asyncio.Future]] = deque()
+        self.in_flight = 0
+        self.last_finish = 0.0
+
+    def ready(self) -> bool:
+        return bool(self.waiting) and (self.limiter is None or self.in_flight < self.limiter.limit)
+
+
+class Turn:
+    """One call's place in a ``FairScheduler``, yielded by ``FairScheduler.turn``."""
+
+    def __init__(self, scheduler: "FairScheduler", flow: Flow, start: float):
+        self.scheduler = scheduler
+        self.flow = flow
+        self.start = start
+        self.held = False
+
+    @asynccontextmanager
+    async def suspended(self) -> AsyncIterator[None]:
+        """
+        Give the slot up for the duration of the block, e.g. while sleeping off
+        a quota wait. The slot is taken back ahead of the flow's later calls.
+        """
+        self.scheduler._release(self.flow)
+        self.held = False
+        yield
+        await self.scheduler._wait(self, front=True)
+
+
+class FairScheduler:
+    """
+    Start-time fair queuing of LLM calls over ``capacity`` in-flight slots.
+
+    A call of ``cost`` tokens from a flow gets the start tag
+    ``max(virtual time, flow's last finish tag)`` and advances the flow's
+    finish tag by ``cost / weight``. Free slots go to the waiting call with
+    the lowest start tag, so within a flow calls keep their order, and an
+    idle flow that becomes busy competes from the current virtual time
+    rather than from credit saved up while idle.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_flight = 0
+        self.virtual_time = 0.0
+        self._flows: list[Flow] = []
+
+    @asynccontextmanager
+    async def turn(self, flow: Flow, cost: int) -> AsyncIterator[Turn]:
+        """Hold one of the scheduler's slots for the duration of the block."""
+        start = max(self.virtual_time, flow.last_finish)
+        flow.last_finish = start + max(1, cost) / flow.weight
+        turn = Turn(self, flow, start)
+        await self._wait(turn)
+        try:
+            yield turn
+        finally:
+            if turn.held:
+                self._release(flow)
+
+    async def _wait(self, turn: Turn, front: bool = False) -> None:
+        """Queue ``turn`` for a slot and wait until it is granted."""
+        flow = turn.flow
+        future = asyncio.get_running_loop().create_future()
+        entry = (turn.start, future)
+        if front:
+            # Its start tag is older than any call of the flow still waiting
+            flow.waiting.appendleft(entry)
+        else:
+            flow.waiting.append(entry)
+        if flow not in self._flows:
+            self._flows.append(flow)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                if entry in flow.waiting:
+                    flow.waiting.remove(entry)
+            else:
+                # Granted just as the caller was cancelled
+                self._release(flow)
+            raise
+        turn.held = True
+
+    def _release(self, flow: Flow) -> None:
+        self.in_flight -= 1
+        flow.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.capacity:
+            ready = [flow for flow in self._flows if flow.ready()]
+            if not ready:
+                break
+            flow = min(ready, key=lambda f: f.waiting[0][0])
+            start, future = flow.waiting.popleft()
+            if not flow.waiting:
+                self._flows.remove(flow)
+            if future.cancelled():
+                continue
+            self.virtual_time = max(self.virtual_time, start)
+            self.in_flight += 1
+            flow.in_flight += 1
+            future.set_result(None)
+
+
+@lru_cache
+def get_fair_scheduler() -> FairScheduler:
+    """The scheduler shared by every run of this process."""
+    return FairScheduler(max(1, get_settings().llm_scheduler_concurrency))
@@ -0,0 +1,345 @@
+"""
+Similar-ticket retrieval over a local, memory-mapped vector index.
+
+Every ticket gets a hashed text vector (see ``text_features.hashed_vectors``)
+and a 256-bit SimHash code of it. Both live in flat files under
+``SIMILAR_INDEX_PATH`` that are memory-mapped, so only the pages a query
+touches are read and nothing is materialized as Python objects. A query ranks
+every ticket by Hamming distance between codes, a few vectorized operations
+over the code columns, then re-scores the closest candidates by exact cosine
+similarity.
+
+The index follows the tickets table by id: ``sync`` appends every ticket with
+an id above the last one indexed. It runs in the background at startup and
+after tickets are created; a write request never waits for a sync that is
+already running (such as a cold rebuild) but leaves its tickets to it. Queries
+answer from whatever is indexed and never wait for a sync. The file lock and
+the vectorizing run in threads, so a cold index or another process holding the
+lock does not stall the event loop.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.entities import Ticket, TicketAnalysis
+from app.schemas.ticket import SimilarTicket, SimilarTicketsResponse, TicketResponse
+from app.services.text_features import hashed_vectors, ticket_text
+
+logger = logging.getLogger(__name__)
+
+_CODE_WORDS = 4  # 256-bit codes
+# Tickets re-scored exactly per query, as a multiple of the results asked for
+_CANDIDATE_FACTOR = 20
+_MIN_CANDIDATES = 200
+# Tickets read from the database and appended per step of a sync
+_SYNC_CHUNK_SIZE = 5000
+_INITIAL_CAPACITY = 1024
+
+
+class SimilarTicketIndex:
+    """
+    Append-only vector index in one directory.
+
+    ``meta.json`` records how many rows are valid and is replaced atomically
+    after rows are written, so readers (in any process on this host) never
+    see a half-written row. Writers serialize on an ``flock``.
+    """
+
+    def __init__(self, path: str | Path, dimensions: int):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        # Fixed random hyperplanes: the code bit is the side of the hyperplane a vector is on
+        self._hyperplanes = np.random.default_rng(0).standard_normal(
+            (_CODE_WORDS * 64, dimensions)
+        ).astype(np.float32)
+        self._meta_mtime: int | None = None
+        self._meta: dict = {}
+        self._arrays: dict[str, np.memmap] = {}
+        self._lock = asyncio.Lock()
+        # Set when tickets were written while a sync of this process was running
+        self._pending = False
+
+    # Reading
+
+    def _read_meta(self) -> dict:
+        meta_path = self.path / "meta.json"
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return _empty_meta(self.dimensions)
+        if mtime != self._meta_mtime:
+            meta = json.loads(meta_path.read_text())
+            if meta["capacity"] != self._meta.get("capacity"):
+                self._arrays = {}
+            self._meta, self._meta_mtime = meta, mtime
+        return self._meta
+
+    def _array(self, name: str, mode: str = "r") -> np.memmap:
+        key = f"{name}:{mode}"
+        if key not in self._arrays:
+            capacity = self._meta["capacity"]
+            if name == "vectors":
+                shape, dtype = (capacity, self.dimensions), np.float32
+            elif name == "ids":
+                shape, dtype = (capacity,), np.int64
+            else:
+                shape, dtype = (capacity,), np.uint64
+            self._arrays[key] = np.memmap(self.path / f"{name}.bin", dtype=dtype, mode=mode, shape=shape)
+        return self._arrays[key]
+
+    def __len__(self) -> int:
+        return self._read_meta()["count"]
+
+    def search(self, queries: np.ndarray, limit: int, exclude_ids: set[int] = frozenset()) -> list[list[tuple[int, float]]]:
+        """Closest ``limit`` tickets to each query vector, as ``(ticket_id, cosine similarity)``."""
+        count = self._read_meta()["count"]
+        if count == 0:
+            return [[] for _ in queries]
+        ids = self._array("ids")[:count]
+        vectors = self._array("vectors")[:count]
+        columns = [self._array(f"codes{word}")[:count] for word in range(_CODE_WORDS)]
+        query_codes = self._codes(queries)
+        wanted = limit + len(exclude_ids)
+        candidates_per_query = max(_MIN_CANDIDATES, wanted * _CANDIDATE_FACTOR)
+
+        results = []
+        for query, code in zip(queries, query_codes):
+            if count <= candidates_per_query:
+                candidates = np.arange(count)
+            else:
+                distance = np.bitwise_count(columns[0] ^ code[0]).astype(np.uint16)
+                for word in range(1, _CODE_WORDS):
+                    distance += np.bitwise_count(columns[word] ^ code[word])
+                candidates = np.sort(np.argpartition(distance, candidates_per_query)[:candidates_per_query])
+            scores = vectors[candidates] @ query
+            order = np.argsort(-scores)[:wanted]
+            matches = [(int(ids[candidates[i]]), float(scores[i])) for i in order]
+            results.append([match for match in matches if match[0] not in exclude_ids][:limit])
+        return results
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        """SimHash codes of ``vectors`` as ``len(vectors) x _CODE_WORDS`` uint64 words."""
+        bits = (vectors @ self._hyperplanes.T) > 0
+        return np.packbits(bits, axis=1).view(">u8").astype(np.uint64)
+
+    # Writing
+
+    def _append(self, ticket_ids: list[int], vectors: np.ndarray, identity: dict | None = None) -> None:
+        """Append rows, and update the database identity in ``identity``; the caller holds the file lock."""
+        meta = dict(self._read_meta())
+        count, capacity = meta["count"], meta["capacity"]
+        if count + len(ticket_ids) > capacity:
+            capacity = max(_INITIAL_CAPACITY, 2 * capacity, count + len(ticket_ids))
+            self._grow(capacity)
+            meta["capacity"] = capacity
+            self._meta = meta
+            self._arrays = {}
+
+        end = count + len(ticket_ids)
+        self._array("ids", "r+")[count:end] = ticket_ids
+        self._array("vectors", "r+")[count:end] = vectors
+        codes = self._codes(vectors)
+        for word in range(_CODE_WORDS):
+            self._array(f"codes{word}", "r+")[count:end] = codes[:, word]
+        for array in self._arrays.values():
+            if array.mode == "r+":
+                array.flush()
+
+        meta.update(count=end, last_ticket_id=max(meta["last_ticket_id"], max(ticket_ids)), **(identity or {}))
+        self._write_meta(meta)
+
+    def _grow(self, capacity: int) -> None:
+        sizes = {"ids": 8, "vectors": 4 * self.dimensions, **{f"codes{w}": 8 for w in range(_CODE_WORDS)}}
+        for name, row_bytes in sizes.items():
+            with open(self.path / f"{name}.bin", "ab") as file:
+                file.truncate(capacity * row_bytes)
+
+    def _write_meta(self, meta: dict) -> None:
+        temporary = self.path / "meta.json.tmp"
+        temporary.write_text(json.dumps(meta))
+        os.replace(temporary, self.path / "meta.json")
+
+    def _reset(self) -> None:
+        self._arrays = {}
+        self._meta = {}
+        self._write_meta(_empty_meta(self.dimensions))
+        for name in ["ids", "vectors", *(f"codes{w}" for w in range(_CODE_WORDS))]:
+            (self.path / f"{name}.bin").unlink(missing_ok=True)
+
+    def _index_rows(self, rows: list) -> None:
+        """Vectorize and append ticket rows; run in a thread."""
+        vectors = hashed_vectors([ticket_text(r.title, r.description) for r in rows], self.dimensions)
+        identity = {"last_ticket": _fingerprint(rows[-1])}
+        if self._read_meta()["count"] == 0:
+            identity["first_ticket"] = [rows[0].id, _fingerprint(rows[0])]
+        self._append([r.id for r in rows], vectors, identity)
+
+    async def _matches_database(self, db: AsyncSession, meta: dict) -> bool:
+        """Whether the first and last indexed tickets are still the same rows in ``db``."""
+        if meta["count"] == 0:
+            return True
+        if meta["dimensions"] != self.dimensions or "first_ticket" not in meta:
+            return False
+        first_id, first_fingerprint = meta["first_ticket"]
+        rows = (await db.execute(
+            select(Ticket.id, Ticket.title, Ticket.created_at)
+            .where(Ticket.id.in_([first_id, meta["last_ticket_id"]]))
+        )).all()
+        found = {row.id: _fingerprint(row) for row in rows}
+        return (
+            found.get(first_id) == first_fingerprint
+            and found.get(meta["last_ticket_id"]) == meta.get("last_ticket")
+        )
+
+    async def sync(self, db: AsyncSession, wait: bool = True) -> int:
+        """
+        Index every ticket with an id above the last one indexed. Returns the number added.
+
+        Starts over when the index does not match the database: other
+        dimensions, or first and last indexed tickets that are not the same
+        rows any more (an index built against another or a recreated database).
+
+        With ``wait=False`` nothing is done if a sync is already running: one in
+        this process is told to read again before it finishes, one in another
+        process reads until it finds no newer tickets.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        if not wait and self._lock.locked():
+            self._pending = True
+            return 0
+        added = 0
+        async with self._lock:
+            with open(self.path / "lock", "w") as lock_file:
+                if wait:
+                    # Another process may hold the lock for the length of a full rebuild
+                    await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)
+                else:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return 0
+                meta = self._read_meta()
+                if not await self._matches_database(db, meta):
+                    logger.info("Similar-ticket index does not match the database, rebuilding it")
+                    await asyncio.to_thread(self._reset)
+                    meta = self._read_meta()
+
+                last_id = meta["last_ticket_id"]
+                while True:
+                    self._pending = False
+                    rows = (await db.execute(
+                        select(Ticket.id, Ticket.title, Ticket.description, Ticket.created_at)
+                        .where(Ticket.id > last_id)
+                        .order_by(Ticket.id)
+                        .limit(_SYNC_CHUNK_SIZE)
+                    )).all()
+                    if rows:
+                        await asyncio.to_thread(self._index_rows, rows)
+                        added += len(rows)
+                        last_id = rows[-1].id
+                    # Tickets committed while the last chunk was read are picked up as well
+                    if len(rows) < _SYNC_CHUNK_SIZE and not self._pending:
+                        break
+        return added
+
+
+def _empty_meta(dimensions: int) -> dict:
+    return {"dimensions": dimensions, "count": 0, "capacity": 0, "last_ticket_id": 0}
+
+
+def _fingerprint(row) -> str:
+    """Identity of a ticket row that another database is very unlikely to repeat under the same id."""
+    created_at = row.created_at.replace(tzinfo=None).isoformat()
+    return hashlib.sha256(f"{row.id}\0{created_at}\0{row.title}".encode()).hexdigest()[:16]
+
+
+@lru_cache
+def get_similar_index() -> SimilarTicketIndex | None:
+    """The index of this host, or None if similar-ticket retrieval is disabled."""
+    settings = get_settings()
+    if not settings.similar_index_enabled:
+        return None
+    return SimilarTicketIndex(settings.similar_index_path, settings.similar_index_dimensions)
+
+
+class SimilarTicketService:
+    """Keep the similar-ticket index current and answer similarity queries."""
+
+    @staticmethod
+    async def index_new_tickets(db: AsyncSession, wait: bool = False) -> None:
+        """
+        Add newly committed tickets to the index.
+
+        Without ``wait`` this returns at once when a sync is already running,
+        which indexes the tickets instead, so requests do not queue behind a
+        rebuild. Best effort: a failure is logged and the tickets are picked up
+        by the next sync instead.
+        """
+        index = get_similar_index()
+        if index is None:
+            return
+        try:
+            await index.sync(db, wait=wait)
+        except Exception:
+            logger.exception("Failed to update the similar-ticket index")
+
+    @staticmethod
+    async def find_similar(db: AsyncSession, ticket_id: int, limit: int = 10) -> SimilarTicketsResponse:
+        """
+        Most similar other tickets and their latest classification.
+
+        Raises ValueError if the ticket does not exist and RuntimeError if
+        similar-ticket retrieval is disabled.
+        """
+        index = get_similar_index()
+        if index is None:
+            raise RuntimeError("Similar-ticket retrieval is disabled")
+        ticket = await db.get(Ticket, ticket_id)
+        if ticket is None:
+            raise ValueError("Ticket not found")
+
+        # Answer from what is indexed; tickets are added after they are written, not here
+        query = hashed_vectors([ticket_text(ticket.title, ticket.description)], index.dimensions)
+        # NumPy releases the GIL, so other requests keep being served meanwhile
+        [matches] = await asyncio.to_thread(index.search, query, limit, {ticket_id})
+        if not matches:
+            return SimilarTicketsResponse(ticket_id=ticket_id, items=[])
+
+        match_ids = [match_id for match_id, _ in matches]
+        tickets = {
+            t.id: t for t in (await db.execute(select(Ticket).where(Ticket.id.in_(match_ids)))).scalars()
+        }
+        latest: dict[int, TicketAnalysis] = {}
+        analyses = await db.execute(
+            select(TicketAnalysis)
+            .where(TicketAnalysis.ticket_id.in_(match_ids))
+            .order_by(TicketAnalysis.id.desc())
+        )
+        for analysis in analyses.scalars():
+            latest.setdefault(analysis.ticket_id, analysis)
+
+        return SimilarTicketsResponse(
+            ticket_id=ticket_id,
+            items=[
+                SimilarTicket(
+                    **TicketResponse.model_validate(tickets[match_id]).model_dump(),
+                    similarity=round(similarity, 4),
+                    category=latest[match_id].category if match_id in latest else None,
+                    priority=latest[match_id].priority if match_id in latest else None,
+                )
+                for match_id, similarity in matches
+                # Tickets deleted since they were indexed
+                if match_id in tickets
+            ],
+        )
@@ -0,0 +1,130 @@
+"""
+Hashed features of ticket text.
+
+Words and word bigrams are hashed into a fixed number of buckets, so no
+vocabulary has to be stored or kept in sync between processes. TF-IDF
+features (for the local classifier) are held as compressed sparse rows in
+plain NumPy arrays; ``hashed_vectors`` gives small dense vectors for
+similarity search.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+
+N_FEATURES = 2**16
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def ticket_text(title: str, description: str) -> str:
+    return f"{title}\n{description}"
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased words followed by adjacent word pairs."""
+    words = _TOKEN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _bucket(token: str) -> int:
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(token.encode("utf-8")) & (N_FEATURES - 1)
+
+
+@dataclass
+class SparseRows:
+    """Rows of a sparse ``len(self) x N_FEATURES`` matrix in CSR layout."""
+
+    indptr: np.ndarray  # int64, len(rows) + 1
+    indices: np.ndarray  # int32 feature buckets
+    data: np.ndarray  # float32 values
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def slice(self, start: int, end: int) -> "SparseRows":
+        lo, hi = self.indptr[start], self.indptr[end]
+        return SparseRows(self.indptr[start:end + 1] - lo, self.indices[lo:hi], self.data[lo:hi])
+
+    def row_ids(self) -> np.ndarray:
+        """Row number of every stored value."""
+        return np.repeat(np.arange(len(self)), np.diff(self.indptr))
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """``self @ weights`` for a dense ``N_FEATURES x k`` matrix."""
+        rows = self.row_ids()
+        contributions = weights[self.indices] * self.data[:, None]
+        return np.stack(
+            [np.bincount(rows, weights=contributions[:, k], minlength=len(self)) for k in range(weights.shape[1])],
+            axis=1,
+        )
+
+
+def term_counts(texts: Iterable[str]) -> SparseRows:
+    """Hashed token counts of each text."""
+    indptr = [0]
+    indices: list[np.ndarray] = []
+    data: list[np.ndarray] = []
+    for text in texts:
+        buckets, counts = np.unique(
+            np.fromiter((_bucket(token) for token in tokenize(text)), dtype=np.int32), return_counts=True
+        )
+        indices.append(buckets)
+        data.append(counts.astype(np.float32))
+        indptr.append(indptr[-1] + len(buckets))
+    return SparseRows(
+        np.asarray(indptr, dtype=np.int64),
+        np.concatenate(indices) if indices else np.zeros(0, np.int32),
+        np.concatenate(data) if data else np.zeros(0, np.float32),
+    )
+
+
+def inverse_document_frequencies(counts: SparseRows) -> np.ndarray:
+    """Smoothed IDF weight of every bucket, as in scikit-learn's ``TfidfTransformer``."""
+    document_frequency = np.bincount(counts.indices, minlength=N_FEATURES)
+    return (np.log((1 + len(counts)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+
+def tfidf(counts: SparseRows, idf: np.ndarray) -> SparseRows:
+    """Sublinear TF times IDF, with every row scaled to unit length."""
+    data = (1 + np.log(counts.data)) * idf[counts.indices]
+    norms = np.sqrt(np.bincount(counts.row_ids(), weights=data**2, minlength=len(counts)))
+    norms[norms == 0] = 1
+    return SparseRows(counts.indptr, counts.indices, (data / norms[counts.row_ids()]).astype(np.float32))
+
+
+# Frequent words that say nothing about what a ticket is about
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from has have hi hello i if in is it its me my no not of on or "
+    "our please so that the their there this to us was we were what when which with would you your thanks".split()
+)
+
+
+def hashed_vectors(texts: Sequence[str], dimensions: int) -> np.ndarray:
+    """
+    Dense, unit-length ``len(texts) x dimensions`` vectors of signed hashed
+    token counts (sublinear TF).
+
+    Needs no fitted state, so vectors of new tickets are comparable with
+    every vector computed before.
+    """
+    vectors = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = [word for word in _TOKEN.findall(text.lower()) if word not in _STOPWORDS]
+        tokens = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        if not tokens:
+            continue
+        hashes, counts = np.unique(
+            np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint32),
+            return_counts=True,
+        )
+        # The top bit picks the sign, so colliding tokens tend to cancel out
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+        np.add.at(vectors[row], hashes % dimensions, signs * (1 + np.log(counts)))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
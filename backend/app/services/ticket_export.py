@@ -0,0 +1,225 @@
+"""
+Streaming export of tickets with their latest analysis.
+
+Rows are read through a server-side cursor in batches of
+``_EXPORT_BATCH_SIZE`` and every batch is encoded and handed on before the
+next one is fetched, so memory use is the same for a thousand rows or ten
+million. Parquet output needs the optional ``pyarrow`` dependency
+(``pip install -e '.[parquet]'``).
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence
+
+from pydantic_core import to_json
+from sqlalchemy import Select, String, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.entities import Ticket, TicketAnalysis
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is unavailable without pyarrow
+    pa = pq = None
+
+# Rows fetched from the cursor, and written as one Parquet row group, at a time
+_EXPORT_BATCH_SIZE = 5000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = (
+    "ticket_id",
+    "title",
+    "description",
+    "status",
+    "created_at",
+    "analysis_id",
+    "analysis_run_id",
+    "category",
+    "priority",
+    "notes",
+    "classified_by",
+    "analyzed_at",
+)
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("ticket_id", pa.int64()),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("status", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("analysis_id", pa.int64()),
+        ("analysis_run_id", pa.int64()),
+        ("category", pa.string()),
+        ("priority", pa.string()),
+        ("notes", pa.string()),
+        ("classified_by", pa.string()),
+        ("analyzed_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+class _ChunkSink:
+    """
+    Write-only file for ``ParquetWriter`` whose bytes are taken out as they are written.
+
+    Keeps counting the position across ``take`` calls, since the Parquet
+    footer records absolute offsets of the row groups.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class TicketExportService:
+    """Export tickets joined with their latest analysis as NDJSON, CSV or Parquet."""
+
+    @staticmethod
+    def export_query(
+        since: datetime | None = None, until: datetime | None = None, status: str | None = None
+    ) -> Select:
+        """
+        Every matching ticket in id order with its latest analysis, if any.
+
+        ``since`` is inclusive and ``until`` exclusive, both on the ticket's
+        ``created_at``. Enum columns are cast to text so every format gets
+        their plain values.
+        """
+        latest = (
+            select(TicketAnalysis.ticket_id, func.max(TicketAnalysis.id).label("analysis_id"))
+            .group_by(TicketAnalysis.ticket_id)
+            .subquery("latest")
+        )
+        query = (
+            select(
+                Ticket.id.label("ticket_id"),
+                Ticket.title,
+                Ticket.description,
+                Ticket.status.cast(String).label("status"),
+                Ticket.created_at,
+                TicketAnalysis.id.label("analysis_id"),
+                TicketAnalysis.analysis_run_id,
+                TicketAnalysis.category.cast(String).label("category"),
+                TicketAnalysis.priority.cast(String).label("priority"),
+                TicketAnalysis.notes,
+                TicketAnalysis.classified_by,
+                TicketAnalysis.created_at.label("analyzed_at"),
+            )
+            .outerjoin(latest, latest.c.ticket_id == Ticket.id)
+            .outerjoin(TicketAnalysis, TicketAnalysis.id == latest.c.analysis_id)
+            .order_by(Ticket.id)
+        )
+        if since is not None:
+            query = query.where(Ticket.created_at >= since)
+        if until is not None:
+            query = query.where(Ticket.created_at < until)
+        if status is not None:
+            query = query.where(Ticket.status == status)
+        return query
+
+    @staticmethod
+    async def iter_batches(
+        db: AsyncSession,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        status: str | None = None,
+    ) -> AsyncIterator[Sequence[tuple]]:
+        """Rows of the export (in ``EXPORT_COLUMNS`` order), a cursor batch at a time."""
+        result = await db.stream(
+            TicketExportService.export_query(since, until, status)
+            .execution_options(yield_per=_EXPORT_BATCH_SIZE)
+        )
+        async for batch in result.partitions():
+            yield batch
+
+    @staticmethod
+    def export(
+        db: AsyncSession,
+        format: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        status: str | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Encoded export as a stream of byte chunks, one per cursor batch.
+
+        Raises ValueError for unknown formats and RuntimeError for Parquet
+        without pyarrow, before anything is read.
+        """
+        if format not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unknown export format: {format}")
+        if format == "parquet" and pq is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install -e '.[parquet]')")
+        encode = {"ndjson": _encode_ndjson, "csv": _encode_csv, "parquet": _encode_parquet}[format]
+        return encode(TicketExportService.iter_batches(db, since, until, status))
+
+
+async def _encode_ndjson(batches: AsyncIterator[Sequence[tuple]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(to_json(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in batch)
+
+
+async def _encode_csv(batches: AsyncIterator[Sequence[tuple]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for batch in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # The header alone, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _encode_parquet(batches: AsyncIterator[Sequence[tuple]]) -> AsyncIterator[bytes]:
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        async for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.take()
+    # The footer is written when the writer closes
+    yield sink.take()
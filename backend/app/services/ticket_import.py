@@ -0,0 +1,81 @@
+"""Incremental parsing of streamed CSV / NDJSON ticket uploads."""
+
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of byte chunks into text lines (line endings included)."""
+    buffer = ""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        # The last piece is an incomplete line; keep it for the next chunk
+        buffer = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | Exception]]:
+    """
+    Parse CSV records with a header row into dicts, one record at a time.
+
+    Quoted fields may span lines: a record is complete once it contains an even
+    number of quote characters. Yields ``(line_number, row)`` where ``row`` is
+    an exception for malformed records.
+    """
+    header: list[str] | None = None
+    record = ""
+    line_number = 0
+    record_start = 1
+    async for line in lines:
+        line_number += 1
+        if not record:
+            record_start = line_number
+        record += line
+        if record.count('"') % 2:
+            continue
+
+        text, record = record, ""
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield record_start, e
+            continue
+
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_start, ValueError(f"expected {len(header)} fields, got {len(values)}")
+            continue
+        yield record_start, dict(zip(header, values))
+
+    if record.strip():
+        yield record_start, ValueError("unterminated quoted field")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | Exception]]:
+    """Parse one JSON object per line. Yields ``(line_number, row)`` like ``iter_csv_rows``."""
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, e
+            continue
+        if not isinstance(row, dict):
+            yield line_number, ValueError("expected a JSON object")
+            continue
+        yield line_number, row
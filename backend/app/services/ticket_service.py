@@ -1,17 +1,43 @@
-from typing import Sequence
+import re
+from typing import AsyncIterator
 
-from sqlalchemy import select
+from pydantic import ValidationError
+from sqlalchemy import and_, column, exists, func, insert, literal_column, or_, select, table
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
-from app.models.entities import Ticket, TicketAnalysis
+from app.db.dialects import dialect_name
+from app.models.entities import (
+    TICKET_FTS_TABLE,
+    TICKET_SEARCH_VECTOR,
+    Ticket,
+    TicketAnalysis,
+    TicketStatus,
+)
 from app.schemas.ticket import (
-    AnalyzedTicketListResponse,
-    AnalyzedTicketResponse,
     TicketCreateRequest,
-    TicketListResponse,
+    TicketImportError,
+    TicketImportResponse,
     TicketResponse,
+    TicketSearchResponse,
+    TicketSearchResult,
+)
+from app.services.pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    decode_seek_cursor,
+    encode_rank_cursor,
+    next_cursor,
+    next_seek_cursor,
+    seek_after,
 )
+from app.services.similar_tickets import SimilarTicketService
+
+# Valid rows written per COPY / INSERT during a bulk import
+_IMPORT_CHUNK_SIZE = 1000
+# Rejected rows reported back in detail (the rest are only counted)
+_MAX_IMPORT_ERRORS = 100
+# Words of a search query, for building an FTS5 MATCH expression
+_SEARCH_TERM_RE = re.compile(r"\w+")
 
 
 class TicketService:
@@ -22,104 +48,269 @@ class TicketService:
         db: AsyncSession, ticket_requests: list[TicketCreateRequest]
     ) -> list[TicketResponse]:
         """Create one or more tickets in the database."""
-        db_tickets = [
-            Ticket(title=ticket.title, description=ticket.description)
-            for ticket in ticket_requests
-        ]
-        db.add_all(db_tickets)
+        # One multi-row INSERT ... RETURNING fetches generated IDs and timestamps
+        result = await db.execute(
+            insert(Ticket)
+            .returning(
+                Ticket.id, Ticket.title, Ticket.description, Ticket.created_at, Ticket.status,
+                sort_by_parameter_order=True,
+            ),
+            [
+                {"title": ticket.title, "description": ticket.description}
+                for ticket in ticket_requests
+            ],
+        )
+        created = [TicketResponse.model_validate(row._mapping) for row in result]
         await db.commit()
-        
-        # Refresh to get generated IDs and timestamps
-        for db_ticket in db_tickets:
-            await db.refresh(db_ticket)
-        
-        return [TicketResponse.model_validate(t) for t in db_tickets]
+        await SimilarTicketService.index_new_tickets(db)
+
+        return created
 
     @staticmethod
-    async def list_tickets(
-        db: AsyncSession, page: int = 1, page_size: int = 10
-    ) -> TicketListResponse:
-        """List tickets with pagination, limited to tickets with PENDING status (ready to analyze)."""
-        from app.models.entities import TicketStatus
-        
-        offset = (page - 1) * page_size
+    async def import_tickets(
+        db: AsyncSession, rows: AsyncIterator[tuple[int, dict | Exception]]
+    ) -> TicketImportResponse:
+        """
+        Validate and insert streamed ticket rows in chunks.
 
-        # Get paginated tickets with PENDING status
-        result = await db.execute(
-            select(Ticket).where(Ticket.status == TicketStatus.PENDING.value)
-            .order_by(Ticket.created_at.desc())
-            .offset(offset)
-            .limit(page_size)
-        )
-        tickets: Sequence[Ticket] = result.scalars().all()
+        Rows are validated one at a time and written every ``_IMPORT_CHUNK_SIZE``
+        valid rows (COPY on PostgreSQL, multi-row INSERT elsewhere), so memory
+        use does not grow with the size of the upload.
+        """
+        accepted = rejected = 0
+        errors: list[TicketImportError] = []
+        chunk: list[tuple[str, str]] = []
 
-        return TicketListResponse(
-            items=[TicketResponse.model_validate(t) for t in tickets],
-            page=page,
-            page_size=page_size,
+        def reject(line: int, error: str) -> None:
+            nonlocal rejected
+            rejected += 1
+            if len(errors) < _MAX_IMPORT_ERRORS:
+                errors.append(TicketImportError(line=line, error=error))
+
+        async for line, row in rows:
+            if isinstance(row, Exception):
+                reject(line, str(row))
+                continue
+            try:
+                ticket = TicketCreateRequest.model_validate(row)
+            except ValidationError as e:
+                reject(line, "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+
+            chunk.append((ticket.title, ticket.description))
+            if len(chunk) >= _IMPORT_CHUNK_SIZE:
+                accepted += await TicketService._bulk_insert(db, chunk)
+                chunk = []
+
+        if chunk:
+            accepted += await TicketService._bulk_insert(db, chunk)
+        await SimilarTicketService.index_new_tickets(db)
+
+        return TicketImportResponse(accepted=accepted, rejected=rejected, errors=errors)
+
+    @staticmethod
+    async def _bulk_insert(db: AsyncSession, tickets: list[tuple[str, str]]) -> int:
+        """Insert (title, description) pairs and commit. Returns the number inserted."""
+        if dialect_name(db) == "postgresql":
+            # COPY is the fastest path into PostgreSQL; defaults fill status/created_at
+            connection = await db.connection()
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                Ticket.__tablename__, records=tickets, columns=["title", "description"]
+            )
+        else:
+            await db.execute(
+                insert(Ticket),
+                [{"title": title, "description": description} for title, description in tickets],
+            )
+        await db.commit()
+        return len(tickets)
+
+    @staticmethod
+    async def list_tickets(
+        db: AsyncSession, page: int = 1, page_size: int = 10, cursor: str | None = None
+    ) -> dict:
+        """List tickets with pagination, limited to tickets with PENDING status (ready to analyze)."""
+        return await TicketService.list_tickets_by_status(
+            db, TicketStatus.PENDING.value, page=page, page_size=page_size, cursor=cursor
         )
 
     @staticmethod
     async def list_tickets_by_status(
-        db: AsyncSession, status: str, page: int = 1, page_size: int = 10
-    ) -> TicketListResponse:
-        """List tickets with pagination, filtered by status."""
-        offset = (page - 1) * page_size
+        db: AsyncSession, status: str, page: int = 1, page_size: int = 10, cursor: str | None = None
+    ) -> dict:
+        """
+        List tickets with pagination, filtered by status.
 
-        # Get paginated tickets with specified status
-        result = await db.execute(
-            select(Ticket).where(Ticket.status == status)
-            .order_by(Ticket.created_at.desc())
-            .offset(offset)
+        With a ``cursor`` the page starts right after the cursor row (keyset
+        pagination on ``created_at, id``) and ``page`` is ignored.
+
+        Returns a plain dict shaped like ``TicketListResponse``: rows are read
+        as columns rather than ORM objects and never go through a Pydantic
+        model, so large pages cost little more than the query and the JSON
+        encoding.
+        """
+        query = (
+            select(Ticket.id, Ticket.title, Ticket.description, Ticket.created_at, Ticket.status)
+            .where(Ticket.status == status)
+            .order_by(Ticket.created_at.desc(), Ticket.id.desc())
             .limit(page_size)
         )
-        tickets: Sequence[Ticket] = result.scalars().all()
+        if cursor is not None:
+            query = query.where(seek_after(db, Ticket, *decode_seek_cursor(cursor)))
+        else:
+            query = query.offset((page - 1) * page_size)
 
-        return TicketListResponse(
-            items=[TicketResponse.model_validate(t) for t in tickets],
-            page=page,
-            page_size=page_size,
-        )
+        result = await db.execute(query)
+        columns, rows = list(result.keys()), result.all()
+
+        return {
+            "items": [dict(zip(columns, row)) for row in rows],
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_seek_cursor(rows, page_size),
+        }
 
     @staticmethod
     async def list_analyzed_tickets(
-        db: AsyncSession, page: int = 1, page_size: int = 10
-    ) -> AnalyzedTicketListResponse:
-        """List analyzed tickets with pagination, including analysis details."""
-        from app.models.entities import TicketStatus
-        
-        offset = (page - 1) * page_size
-
-        # Get paginated ticket analyses with their tickets (only ANALYZED status)
-        result = await db.execute(
-            select(TicketAnalysis)
-            .join(Ticket)
+        db: AsyncSession, page: int = 1, page_size: int = 10, cursor: str | None = None
+    ) -> dict:
+        """
+        List analyzed tickets with pagination, including analysis details.
+
+        Returns a plain dict shaped like ``AnalyzedTicketListResponse``, built
+        from columns like ``list_tickets_by_status``.
+        """
+        # Paginated ticket analyses joined with their tickets (only ANALYZED status)
+        query = (
+            select(
+                Ticket.id,
+                TicketAnalysis.id.label("analysis_id"),  # unique key of the row
+                Ticket.title,
+                Ticket.description,
+                TicketAnalysis.priority,
+                TicketAnalysis.category,
+                TicketAnalysis.notes,
+            )
+            .join(Ticket, Ticket.id == TicketAnalysis.ticket_id)
             .where(Ticket.status == TicketStatus.ANALYZED.value)
-            .options(joinedload(TicketAnalysis.ticket))
             .order_by(TicketAnalysis.id.desc())
-            .offset(offset)
             .limit(page_size)
         )
-        ticket_analyses: Sequence[TicketAnalysis] = result.unique().scalars().all()
-
-        # Convert to AnalyzedTicketResponse format
-        analyzed_tickets = []
-        for analysis in ticket_analyses:
-            analyzed_tickets.append(
-                AnalyzedTicketResponse(
-                    id=analysis.ticket.id,
-                    analysis_id=analysis.id,  # Use analysis ID for unique key
-                    title=analysis.ticket.title,
-                    description=analysis.ticket.description,
-                    priority=analysis.priority,
-                    category=analysis.category,
-                    notes=analysis.notes,
+        if cursor is not None:
+            # Analyses are listed by id alone, so the cursor id is the whole sort key
+            query = query.where(TicketAnalysis.id < decode_cursor(cursor))
+        else:
+            query = query.offset((page - 1) * page_size)
+
+        result = await db.execute(query)
+        columns, rows = list(result.keys()), result.all()
+
+        return {
+            "items": [dict(zip(columns, row)) for row in rows],
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor(rows, page_size, key="analysis_id"),
+        }
+
+    @staticmethod
+    def search_matches(db: AsyncSession, query: str):
+        """
+        Subquery of ``(id, rank)`` for tickets matching a free-text query.
+
+        PostgreSQL uses the GIN-indexed ``search_vector`` column with
+        ``websearch_to_tsquery``; SQLite uses the FTS5 table. Every word must
+        match, and higher ranks are better on both. Raises ValueError for a
+        query without words.
+        """
+        if not _SEARCH_TERM_RE.search(query):
+            raise ValueError("Search query must contain at least one word")
+        if dialect_name(db) == "postgresql":
+            vector = literal_column(f"tickets.{TICKET_SEARCH_VECTOR}")
+            ts_query = func.websearch_to_tsquery("english", query)
+            return (
+                select(Ticket.id.label("id"), func.ts_rank(vector, ts_query).label("rank"))
+                .where(vector.op("@@")(ts_query))
+                .subquery("matches")
+            )
+
+        # Quote each word so FTS5 operators in user input are taken literally
+        match = " ".join(f'"{term}"' for term in _SEARCH_TERM_RE.findall(query))
+        fts = table(TICKET_FTS_TABLE, column("rowid"))
+        return (
+            select(
+                fts.c.rowid.label("id"),
+                # bm25() is lower for better matches
+                (-func.bm25(literal_column(TICKET_FTS_TABLE))).label("rank"),
+            )
+            .where(literal_column(TICKET_FTS_TABLE).op("MATCH")(match))
+            .subquery("matches")
+        )
+
+    @staticmethod
+    async def search_tickets(
+        db: AsyncSession,
+        query: str,
+        page_size: int = 10,
+        cursor: str | None = None,
+        status: str | None = None,
+        category: str | None = None,
+        priority: str | None = None,
+    ) -> TicketSearchResponse:
+        """
+        Full-text search over ticket titles and descriptions, best matches first.
+
+        Results are keyset-paginated on ``(rank, id)``. ``category`` and
+        ``priority`` match tickets with any analysis carrying those values.
+        """
+        if not _SEARCH_TERM_RE.search(query):
+            return TicketSearchResponse(items=[], page_size=page_size)
+
+        matches = TicketService.search_matches(db, query)
+        statement = (
+            select(Ticket, matches.c.rank)
+            .join(matches, matches.c.id == Ticket.id)
+            .order_by(matches.c.rank.desc(), Ticket.id.desc())
+            .limit(page_size)
+        )
+        if status:
+            statement = statement.where(Ticket.status == status)
+        if category or priority:
+            analysis_filters = [TicketAnalysis.ticket_id == Ticket.id]
+            if category:
+                analysis_filters.append(TicketAnalysis.category == category)
+            if priority:
+                analysis_filters.append(TicketAnalysis.priority == priority)
+            statement = statement.where(exists().where(*analysis_filters))
+        if cursor is not None:
+            last_rank, last_id = decode_rank_cursor(cursor)
+            statement = statement.where(
+                or_(
+                    matches.c.rank < last_rank,
+                    and_(matches.c.rank == last_rank, Ticket.id < last_id),
                 )
             )
 
-        return AnalyzedTicketListResponse(
-            items=analyzed_tickets,
-            page=page,
+        result = await db.execute(statement)
+        rows = result.all()
+        items = [
+            TicketSearchResult(
+                id=ticket.id,
+                title=ticket.title,
+                description=ticket.description,
+                created_at=ticket.created_at,
+                status=ticket.status,
+                rank=rank,
+            )
+            for ticket, rank in rows
+        ]
+
+        return TicketSearchResponse(
+            items=items,
             page_size=page_size,
+            next_cursor=(
+                encode_rank_cursor(items[-1].rank, items[-1].id) if len(items) == page_size else None
+            ),
         )
-
@@ -0,0 +1,48 @@
+"""Token estimation and token-budget packing for LLM prompts."""
+
+from typing import Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Average characters per token for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap estimate of how many tokens a piece of text costs."""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to roughly ``max_tokens`` tokens."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[: max(0, max_chars - 3)] + "..."
+
+
+def pack_by_token_budget(
+    items: Sequence[T],
+    cost: Callable[[T], int],
+    budget: int,
+    max_items: int | None = None,
+) -> List[List[T]]:
+    """
+    Greedily pack items, in order, into groups whose total cost fits the budget.
+
+    An item that is larger than the budget on its own gets a group to itself.
+    """
+    groups: List[List[T]] = []
+    current: List[T] = []
+    current_cost = 0
+    for item in items:
+        item_cost = cost(item)
+        full = max_items is not None and len(current) >= max_items
+        if current and (full or current_cost + item_cost > budget):
+            groups.append(current)
+            current, current_cost = [], 0
+        current.append(item)
+        current_cost += item_cost
+    if current:
+        groups.append(current)
+    return groups
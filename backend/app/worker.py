@@ -0,0 +1,211 @@
+"""Standalone worker that processes queued analysis jobs.
+
+Run with ``python -m app.worker``. Start more processes (on any node that can
+reach the database) to scale analysis throughput independently of the API.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+
+from prometheus_client import start_http_server
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.db.session import async_engine, async_session_factory, create_all_tables
+from app.models.entities import AnalysisJob, AnalysisRun
+from app.services.analysis_service import AnalysisService
+from app.services.job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Claims analysis jobs from the queue and runs up to ``concurrency`` at once."""
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_factory,
+        worker_id: str | None = None,
+    ):
+        settings = get_settings()
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = settings.worker_poll_interval_seconds
+        self.heartbeat_interval = settings.worker_heartbeat_interval_seconds
+        self.cancel_poll_interval = settings.worker_cancel_poll_interval_seconds
+        self._tasks: set[asyncio.Task] = set()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Claim and process jobs until ``stop`` is set, then wait for running jobs."""
+        logger.info("Worker %s started with concurrency %d", self.worker_id, self.concurrency)
+        while not stop.is_set():
+            try:
+                claimed = await self.run_once()
+            except Exception:
+                logger.exception("Worker %s failed to poll the job queue", self.worker_id)
+                claimed = 0
+            if not claimed:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info("Worker %s stopped", self.worker_id)
+
+    async def run_once(self) -> int:
+        """Reclaim stale jobs and start as many jobs as there are free slots."""
+        async with self.session_factory() as db:
+            await JobQueue.reclaim_stale(db)
+
+        claimed = 0
+        while len(self._tasks) < self.concurrency:
+            async with self.session_factory() as db:
+                job = await JobQueue.claim(db, self.worker_id)
+            if job is None:
+                break
+            task = asyncio.create_task(self._process(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            claimed += 1
+        return claimed
+
+    async def drain(self) -> None:
+        """Wait for all running jobs to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _process(self, job: AnalysisJob) -> None:
+        """
+        Run one job, sending heartbeats while it is in progress.
+
+        A failed attempt is retried with exponential backoff until the job has
+        used up its attempts; each retry resumes the run. If the run is
+        cancelled meanwhile, processing is stopped and the run released. If
+        the job was reclaimed by another worker, processing is stopped and
+        neither the job nor the run is touched again.
+        """
+        settings = get_settings()
+        final_attempt = job.attempts >= settings.job_max_attempts
+        analysis = asyncio.create_task(self._analyze(job.analysis_run_id, final_attempt))
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, analysis))
+        watcher = asyncio.create_task(self._watch_cancel(job.analysis_run_id, analysis))
+        try:
+            await analysis
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling() or not analysis.cancelled():
+                raise
+            if heartbeat.done() and not heartbeat.cancelled():
+                # The job now belongs to another worker
+                return
+            logger.info("Analysis job %d for run %d cancelled", job.id, job.analysis_run_id)
+            async with self.session_factory() as db:
+                await JobQueue.cancel(db, job.id)
+                await AnalysisService.release_cancelled_run(db, job.analysis_run_id)
+        except Exception as e:
+            if heartbeat.done() and not heartbeat.cancelled():
+                return
+            logger.exception("Analysis job %d for run %d failed", job.id, job.analysis_run_id)
+            async with self.session_factory() as db:
+                if final_attempt:
+                    await JobQueue.fail(db, job, str(e))
+                else:
+                    delay = settings.job_retry_delay_seconds * 2 ** (job.attempts - 1)
+                    await JobQueue.retry(db, job, str(e), delay)
+        else:
+            if heartbeat.done() and not heartbeat.cancelled():
+                return
+            async with self.session_factory() as db:
+                await JobQueue.complete(db, job)
+        finally:
+            heartbeat.cancel()
+            watcher.cancel()
+
+    async def _analyze(self, analysis_run_id: int, final_attempt: bool) -> None:
+        async with self.session_factory() as db:
+            await AnalysisService.process_analysis_background(
+                db, analysis_run_id, final_attempt=final_attempt
+            )
+
+    async def _watch_cancel(self, analysis_run_id: int, analysis: asyncio.Task) -> None:
+        """Cancel ``analysis`` once the run has a cancel request; in-flight LLM calls are abandoned."""
+        while True:
+            await asyncio.sleep(self.cancel_poll_interval)
+            try:
+                async with self.session_factory() as db:
+                    requested = await db.scalar(
+                        select(AnalysisRun.cancel_requested_at).where(AnalysisRun.id == analysis_run_id)
+                    )
+            except Exception:
+                logger.exception("Cancel check for run %d failed", analysis_run_id)
+                continue
+            if requested is not None:
+                analysis.cancel()
+                return
+
+    async def _heartbeat(self, job_id: int, analysis: asyncio.Task) -> None:
+        """Keep the job claimed; cancel ``analysis`` and return if it was reclaimed meanwhile."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                async with self.session_factory() as db:
+                    owned = await JobQueue.heartbeat(db, job_id, self.worker_id)
+            except Exception:
+                logger.exception("Heartbeat for job %d failed", job_id)
+                continue
+            if not owned:
+                # Another worker has the run now; writing on would duplicate its results
+                logger.warning("Worker %s lost job %d, stopping it", self.worker_id, job_id)
+                analysis.cancel()
+                return
+
+
+async def _main(concurrency: int | None) -> None:
+    await create_all_tables()
+
+    # Workers do the LLM calls, so they expose their own metrics endpoint
+    metrics_port = get_settings().worker_metrics_port
+    if metrics_port:
+        try:
+            start_http_server(metrics_port, registry=metrics.registry)
+        except OSError as e:
+            # Typically another worker on this host already serves the port; process jobs anyway
+            logger.warning("Not serving worker metrics on port %d: %s", metrics_port, e)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await Worker(concurrency=concurrency).run(stop)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process queued ticket analysis jobs.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Analysis runs processed in parallel by this worker (default: WORKER_CONCURRENCY)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_main(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+End-to-end throughput benchmark of the analysis pipeline.
+
+Runs against a fresh SQLite database file with the fake LLM backend, so it
+needs no services or API key and its numbers are comparable across commits:
+
+    cd backend && python -m benchmarks.pipeline --tickets 100 1000 10000
+
+For each size it imports generated tickets, starts a run with
+``POST /api/analyze``, processes the queued job with a worker and prints one
+JSON object: tickets/s, p50/p99 per-ticket latency (from the POST to the
+ticket's analysis being written), SQL statements executed from the POST on,
+and peak RSS. Each size runs in its own process so peak RSS and in-process
+caches do not carry over.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+_SUBJECTS = (
+    "Refund for duplicate charge", "Invoice shows wrong amount", "Cannot login after password reset",
+    "App crashes on startup", "Export button throws an error", "Please add dark mode",
+    "Feature request: bulk edit", "API requests time out", "Webhook deliveries are slow",
+    "How do I invite teammates", "Question about my plan", "Dashboard is down for our team",
+)
+_DETAILS = (
+    "This started yesterday.", "It happens every time.", "Several colleagues see the same.",
+    "We are on the enterprise plan.", "This is urgent for us.", "Steps to reproduce are attached.",
+    "Nothing changed on our side.", "Is there a workaround?", "Thanks for your help.",
+)
+
+
+def generate_tickets(count: int, seed: int, noise: float = 0.0) -> list[dict]:
+    """Distinct, reproducible tickets with a realistic mix of subjects; ``noise`` of them pasted from email."""
+    rng = random.Random(seed)
+    tickets = []
+    for i in range(count):
+        description = " ".join(rng.sample(_DETAILS, 3)) + f" Reference {rng.randrange(10**8):08d}."
+        if rng.random() < noise:
+            description = _add_noise(description, rng)
+        tickets.append({"title": f"{rng.choice(_SUBJECTS)} (#{i})", "description": description})
+    return tickets
+
+
+def _add_noise(description: str, rng: random.Random) -> str:
+    """A log excerpt, signature and quoted earlier message around ``description``."""
+    log = [f"2024-05-01 02:{i // 60:02d}:{i % 60:02d} WARN request {rng.randrange(10**6)} retried" for i in range(30)]
+    quoted = [f"> {' '.join(rng.sample(_DETAILS, 3))}" for _ in range(10)]
+    return "\n".join([
+        description, "", *log, "", "Best regards,", "Alex", "Support Team",
+        "", "On Mon, May 1, 2024 at 9:00 AM Support <support@example.com> wrote:", *quoted,
+    ])
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(ticket_count: int, args: argparse.Namespace) -> dict:
+    """Analyze ``ticket_count`` tickets end to end and measure the run."""
+    # The app reads its settings when first imported
+    import httpx
+    from sqlalchemy import event, select
+
+    from app.db.session import async_engine, async_session_factory, create_all_tables
+    from app.main import app
+    from app.models.entities import AnalysisRun, TicketAnalysis
+    from app.worker import Worker
+
+    await create_all_tables()
+    queries = 0
+
+    def count_query(*_) -> None:
+        nonlocal queries
+        queries += 1
+
+    tickets = generate_tickets(ticket_count, args.seed, args.noise)
+    body = "".join(json.dumps(ticket) + "\n" for ticket in tickets)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        response = await client.post(
+            "/api/tickets/import", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+        response.raise_for_status()
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_query)
+        posted_at = datetime.now(timezone.utc)
+        started_at = time.perf_counter()
+        response = await client.post("/api/analyze", json={})
+        response.raise_for_status()
+        run_id = response.json()["id"]
+
+    worker = Worker(concurrency=1)
+    await worker.run_once()
+    await worker.drain()
+    elapsed = time.perf_counter() - started_at
+    event.remove(async_engine.sync_engine, "before_cursor_execute", count_query)
+
+    async with async_session_factory() as db:
+        run = await db.get(AnalysisRun, run_id)
+        written = (await db.execute(
+            select(TicketAnalysis.created_at).where(TicketAnalysis.analysis_run_id == run_id)
+        )).scalars().all()
+    await async_engine.dispose()
+
+    latencies = [
+        ((at if at.tzinfo else at.replace(tzinfo=timezone.utc)) - posted_at).total_seconds()
+        for at in written
+    ]
+    stats = run.stats or {}
+    return {
+        "commit": _git_commit(),
+        "tickets": ticket_count,
+        "analyzed": run.analyzed_count,
+        "failed": run.failed_count,
+        "elapsed_seconds": round(elapsed, 3),
+        "tickets_per_second": round(ticket_count / elapsed, 2),
+        "latency_p50_seconds": round(_percentile(latencies, 0.50), 3),
+        "latency_p99_seconds": round(_percentile(latencies, 0.99), 3),
+        "db_queries": queries,
+        "db_queries_per_ticket": round(queries / ticket_count, 2),
+        "llm_calls": stats.get("llm_calls", 0),
+        # From the start of classification, as reported by the run
+        "classified_p50_seconds": stats.get("classified_p50_seconds"),
+        "likely_high_p50_seconds": stats.get("likely_high_p50_seconds"),
+        "description_tokens": stats.get("description_tokens"),
+        "compaction_tokens_saved": stats.get("compaction_tokens_saved"),
+        # Linux reports kilobytes, macOS bytes
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform != "darwin" else 1024**2),
+            1,
+        ),
+        "fake_llm": {
+            "latency_seconds": args.latency,
+            "latency_sigma": args.latency_sigma,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+        },
+    }
+
+
+def _configure_environment(args: argparse.Namespace, database_path: Path) -> None:
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{database_path}",
+        # Next to the database, so nothing is written into the source tree
+        "SIMILAR_INDEX_PATH": str(database_path.parent / "similar_index"),
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_SECONDS": str(args.latency),
+        "FAKE_LLM_LATENCY_SIGMA": str(args.latency_sigma),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "FAKE_LLM_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+        "FAKE_LLM_SEED": str(args.seed),
+        # Every run starts cold unless the cache is what is being measured
+        "CLASSIFICATION_CACHE_ENABLED": str(args.cache).lower(),
+        "TICKET_COMPACTION_ENABLED": str(not args.no_compaction).lower(),
+        "LLM_REQUESTS_PER_MINUTE": "0",
+        "LLM_TOKENS_PER_MINUTE": "0",
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline end to end on SQLite.")
+    parser.add_argument("--tickets", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Run sizes (default: 100 1000 10000)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Median fake LLM call latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls failing with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="Keep the classification cache enabled")
+    parser.add_argument("--noise", type=float, default=0.0,
+                        help="Fraction of tickets with pasted logs, signatures and quoted replies")
+    parser.add_argument("--no-compaction", action="store_true", help="Send ticket text to the LLM as is")
+    parser.add_argument("--output", type=Path, help="Also append the results to this JSON lines file")
+    args = parser.parse_args()
+
+    if len(args.tickets) > 1:
+        # One process per size, so peak RSS and in-process caches do not carry over
+        for count in args.tickets:
+            argv = _replace_sizes(sys.argv[1:], count)
+            subprocess.run([sys.executable, "-m", "benchmarks.pipeline", *argv], check=True)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        _configure_environment(args, Path(directory) / "benchmark.db")
+        result = asyncio.run(run_benchmark(args.tickets[0], args))
+
+    line = json.dumps(result)
+    print(line, flush=True)
+    if args.output:
+        with args.output.open("a") as output:
+            output.write(line + "\n")
+
+
+def _replace_sizes(argv: list[str], count: int) -> list[str]:
+    """``argv`` with the ``--tickets`` values replaced by a single size."""
+    result, skipping = [], False
+    for arg in argv:
+        if arg == "--tickets":
+            skipping = True
+            continue
+        if skipping and not arg.startswith("--"):
+            continue
+        skipping = False
+        result.append(arg)
+    return [*result, "--tickets", str(count)]
+
+
+if __name__ == "__main__":
+    main()
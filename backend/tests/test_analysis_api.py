@@ -40,6 +40,35 @@ async def test_analyze_tickets_specific_ids(client: AsyncClient, sample_tickets)
         assert data["summary"] == "Analyzing 1 ticket(s)"
 
 
+@pytest.mark.asyncio
+async def test_analyze_tickets_filters_and_overlapping_runs(client: AsyncClient, test_db, sample_tickets):
+    """Test that filters are applied in the database and a ticket is claimed by one run only."""
+    from sqlalchemy import select
+    from app.models.entities import AnalysisRunTicket
+
+    first_id, second_id = sample_tickets[0].id, sample_tickets[1].id
+    response = await client.post("/api/analyze", json={"query": "ticket 2", "limit": 5})
+    assert response.json()["summary"] == "Analyzing 1 ticket(s)"
+
+    # The remaining pending ticket is the oldest; a second overlapping request finds nothing left
+    response = await client.post("/api/analyze", json={"createdBefore": "2999-01-01T00:00:00Z", "limit": 5})
+    assert response.json()["summary"] == "Analyzing 1 ticket(s)"
+    response = await client.post("/api/analyze", json={})
+    assert response.status_code == 400
+
+    result = await test_db.execute(select(AnalysisRunTicket.ticket_id, AnalysisRunTicket.analysis_run_id))
+    runs_by_ticket = dict(result.all())
+    assert sorted(runs_by_ticket) == [first_id, second_id]
+    assert runs_by_ticket[first_id] != runs_by_ticket[second_id]
+
+    response = await client.post("/api/analyze", json={"createdAfter": "2999-01-01T00:00:00Z"})
+    assert response.status_code == 400
+    response = await client.post("/api/analyze", json={"query": "!!"})
+    assert response.status_code == 400
+    response = await client.post("/api/analyze", json={"limit": 0})
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_analyze_tickets_no_tickets_available(client: AsyncClient):
     """Test analyzing when no pending tickets are available."""
@@ -113,6 +142,12 @@ async def test_list_analysis_runs_pagination(client: AsyncClient, sample_analysi
     assert data["page_size"] == 1
     assert data["total"] >= 1
 
+    # A full page hands out a cursor; following it past the only run ends the listing
+    response = await client.get(f"/api/analyze/runs?page_size=1&cursor={data['next_cursor']}")
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+    assert response.json()["next_cursor"] is None
+
 
 @pytest.mark.asyncio
 async def test_list_analysis_runs_invalid_page(client: AsyncClient):
@@ -152,3 +187,182 @@ async def test_list_analysis_runs_multiple_runs(client: AsyncClient, test_db, sa
     data = response.json()
     assert data["total"] >= 2
 
+
+
+@pytest.mark.asyncio
+async def test_analysis_status_from_counters(client: AsyncClient, sample_tickets, sample_analysis_run):
+    """Test that run status is served from the counters, with ticket ids from the memberships on request."""
+    response = await client.get(f"/api/analyze/{sample_analysis_run.id}/status")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["ticket_ids"] is None
+    assert data["ticket_count"] == 2
+    assert data["analyzed_count"] == 2
+
+    response = await client.get(f"/api/analyze/{sample_analysis_run.id}/status?include_ticket_ids=true")
+    assert response.json()["ticket_ids"] == sorted(t.id for t in sample_tickets[:2])
+
+
+@pytest.mark.asyncio
+async def test_analysis_status_not_found(client: AsyncClient):
+    """Test status of a non-existent analysis run."""
+    response = await client.get("/api/analyze/99999/status")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_active_runs_track_membership(client: AsyncClient, test_db, sample_tickets):
+    """Test that overlapping runs only report their own tickets and counters follow transitions."""
+    from app.models.entities import TicketStatus
+    from app.services.analysis_service import AnalysisService
+
+    with patch("app.services.analysis_service.AnalysisService.process_analysis_background"):
+        first = await client.post("/api/analyze", json={"ticketIds": [sample_tickets[0].id]})
+        second = await client.post("/api/analyze", json={"ticketIds": [sample_tickets[1].id]})
+
+    response = await client.get("/api/analyze/active?include_ticket_ids=true")
+    assert response.status_code == 200
+    active = {run["analysis_run_id"]: run for run in response.json()}
+    assert active[first.json()["id"]]["ticket_ids"] == [sample_tickets[0].id]
+    assert active[second.json()["id"]]["ticket_ids"] == [sample_tickets[1].id]
+    assert active[first.json()["id"]]["status"] == "processing"
+
+    # Finishing the first run's ticket moves its counters and drops it from active
+    moved = await AnalysisService.transition_tickets(
+        test_db, first.json()["id"], [sample_tickets[0].id], TicketStatus.ANALYZED.value
+    )
+    await test_db.commit()
+    assert moved == 1
+
+    response = await client.get("/api/analyze/active")
+    assert [run["analysis_run_id"] for run in response.json()] == [second.json()["id"]]
+
+    response = await client.get(f"/api/analyze/{first.json()['id']}/status")
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["processing_count"] == 0
+    assert data["analyzed_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_analysis_writes_results_before_summary(
+    client: AsyncClient, test_db, sample_tickets, monkeypatch
+):
+    """Test that classifications are durable before the reduce step runs."""
+    from sqlalchemy import func, select
+    from app.core.config import get_settings
+    from app.models.entities import Ticket, TicketAnalysis
+    from app.services.analysis_service import AnalysisService
+    from conftest import StubLLM
+
+    written_at_summary = []
+
+    async def count_written():
+        result = await test_db.execute(select(func.count(TicketAnalysis.id)))
+        written_at_summary.append(result.scalar_one())
+
+    stub = StubLLM(before_summary=count_written)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("app.services.llm_service.ChatOpenAI", lambda **kwargs: stub)
+    monkeypatch.setattr(get_settings(), "result_flush_batch_size", 1)
+
+    run_id = (await client.post("/api/analyze", json={})).json()["id"]
+    await AnalysisService.process_analysis_background(test_db, run_id)
+
+    assert written_at_summary == [2]
+    status = (await client.get(f"/api/analyze/{run_id}/status")).json()
+    assert status["status"] == "completed"
+    assert status["analyzed_count"] == 2
+    assert status["processing_count"] == 0
+
+    result = await test_db.execute(select(Ticket.status).where(Ticket.id.in_([t.id for t in sample_tickets[:2]])))
+    assert set(result.scalars().all()) == {"analyzed"}
+
+
+@pytest.fixture
+def progress_sessions(test_db, monkeypatch):
+    """Point the progress bus at the test database."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from app.services.progress import progress_bus
+
+    monkeypatch.setattr(
+        progress_bus, "session_factory", async_sessionmaker(test_db.bind, expire_on_commit=False)
+    )
+    return progress_bus
+
+
+@pytest.mark.asyncio
+async def test_events_stream_ends_with_summary_for_finished_run(
+    client: AsyncClient, sample_analysis_run, progress_sessions
+):
+    """Test that a finished run streams a single final event."""
+    import json
+
+    response = await client.get(f"/api/analyze/{sample_analysis_run.id}/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    event, data = response.text.strip().split("\n")
+    assert event == "event: finished"
+    payload = json.loads(data.removeprefix("data: "))
+    assert payload["status"] == "completed"
+    assert payload["summary"] == "Test analysis run"
+
+    response = await client.get("/api/analyze/999/events")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_progress_is_pushed_as_results_are_written(
+    client: AsyncClient, test_db, sample_tickets, monkeypatch, progress_sessions
+):
+    """Test that subscribers get one event per written batch and a final summary."""
+    from app.core.config import get_settings
+    from app.services.analysis_service import AnalysisService
+    from conftest import StubLLM
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("app.services.llm_service.ChatOpenAI", lambda **kwargs: StubLLM())
+    monkeypatch.setattr(get_settings(), "llm_batch_classification", False)
+    monkeypatch.setattr(get_settings(), "result_flush_batch_size", 1)
+
+    run_id = (await client.post("/api/analyze", json={})).json()["id"]
+    async with progress_sessions.subscribe(run_id) as queue:
+        await AnalysisService.process_analysis_background(test_db, run_id)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+
+    written = [e for e in events if e.ticket_ids]
+    assert sorted(i for e in written for i in e.ticket_ids) == sorted(t.id for t in sample_tickets[:2])
+    assert events[-1].finished
+    assert events[-1].analyzed_count == 2
+    assert events[-1].summary == "Mostly billing questions."
+
+
+@pytest.mark.asyncio
+async def test_events_stream_finishes_without_a_notification(
+    client: AsyncClient, test_db, sample_tickets, monkeypatch, progress_sessions
+):
+    """Test that a stream whose final notification was lost still ends once the run is finished."""
+    from datetime import datetime, timezone
+    from app.models.entities import AnalysisRun
+
+    monkeypatch.setattr("app.services.progress._KEEPALIVE_SECONDS", 0.05)
+    run_id = (await client.post("/api/analyze", json={})).json()["id"]
+
+    async def connected() -> bool:
+        return False
+
+    stream = progress_sessions.stream(run_id, connected)
+    assert (await anext(stream)).startswith("event: progress")
+    assert await anext(stream) == ": keepalive\n\n"
+
+    # The run finishes but nothing is published
+    run = await test_db.get(AnalysisRun, run_id)
+    run.finished_at = datetime.now(timezone.utc)
+    run.summary = "Done"
+    await test_db.commit()
+
+    remaining = [chunk async for chunk in stream]
+    assert remaining[-1].startswith("event: finished")
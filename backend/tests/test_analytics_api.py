@@ -0,0 +1,62 @@
+"""Tests for analytics rollups and the breakdown endpoint."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.entities import AnalysisRun, AnalysisRunTicket, TicketStatus
+from app.services.analysis_service import AnalysisResultWriter
+from app.services.analytics_service import AnalyticsService
+
+
+@pytest.mark.asyncio
+async def test_breakdown_reads_rollups_written_with_results(
+    client: AsyncClient, test_db: AsyncSession, sample_tickets
+):
+    """Test that writing results updates rollups in the same commit."""
+    pending = sample_tickets[:2]
+    run = AnalysisRun(ticket_count=2, processing_count=2)
+    test_db.add(run)
+    await test_db.flush()
+    test_db.add_all([
+        AnalysisRunTicket(analysis_run_id=run.id, ticket_id=t.id, status=TicketStatus.PROCESSING.value)
+        for t in pending
+    ])
+    await test_db.commit()
+
+    writer = AnalysisResultWriter(test_db, run.id)
+    await writer.add([
+        {"id": pending[0].id, "category": "billing", "priority": "high"},
+        {"id": pending[1].id, "category": "billing", "priority": "low"},
+    ])
+    await writer.flush()
+
+    for bucket in ("hour", "day"):
+        response = await client.get(f"/api/analytics/breakdown?bucket={bucket}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["by_category"] == {"billing": 2}
+        assert data["by_priority"] == {"high": 1, "low": 1}
+        assert len(data["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_backfill_rebuilds_rollups(client: AsyncClient, test_db: AsyncSession, sample_analysis_run):
+    """Test that the backfill counts existing analyses exactly once, even when rerun."""
+    assert await AnalyticsService.backfill(test_db) == 2
+    assert await AnalyticsService.backfill(test_db) == 2
+
+    response = await client.get("/api/analytics/breakdown?bucket=day")
+    data = response.json()
+    assert data["total"] == 2
+    assert data["by_category"] == {"bug": 1, "feature_request": 1}
+
+
+@pytest.mark.asyncio
+async def test_breakdown_rejects_empty_range(client: AsyncClient):
+    """Test that 'from' must come before 'to'."""
+    response = await client.get(
+        "/api/analytics/breakdown?from=2026-02-01T00:00:00Z&to=2026-01-01T00:00:00Z"
+    )
+    assert response.status_code == 400
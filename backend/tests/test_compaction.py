@@ -0,0 +1,82 @@
+"""Tests for compaction of ticket text before it is put into prompts."""
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.compaction import compact_description
+from app.services.llm_service import LLMService
+from app.services.tokens import estimate_tokens
+from conftest import StubLLM
+
+NOISY_DESCRIPTION = "\n".join(
+    [
+        "The export job crashes every night since the update.",
+        "",
+        *[f"2024-05-01 02:00:{i:02d} WARN retrying export chunk {i} of 40" for i in range(40)],
+        "java.lang.IllegalStateException: export aborted",
+        *[f"\tat com.example.export.Step{i}.run(Step{i}.java:{i + 10})" for i in range(30)],
+        "",
+        "Thanks,",
+        "Jane Doe",
+        "Operations Lead | Example Corp",
+        "",
+        "On Mon, May 1, 2024 at 9:00 AM Support <support@example.com> wrote:",
+        "> Could you send us the logs of the failing run?",
+        "> " + "Earlier thread text. " * 50,
+    ]
+)
+
+
+def test_noise_is_removed_and_budget_kept():
+    """Test that replies, signatures and repeated log lines are dropped, and long text keeps head and tail."""
+    compacted = compact_description(NOISY_DESCRIPTION, token_budget=600)
+
+    assert compacted.startswith("The export job crashes every night")
+    assert "java.lang.IllegalStateException: export aborted" in compacted
+    assert "Step0.run" in compacted and "Step29.run" in compacted
+    assert "frames omitted" in compacted and "similar lines omitted" in compacted
+    for noise in ("Step15.run", "chunk 20 of 40", "Jane Doe", "wrote:", "Earlier thread text"):
+        assert noise not in compacted
+    assert estimate_tokens(compacted) < estimate_tokens(NOISY_DESCRIPTION) / 4
+
+    text = "beginning " + "filler " * 1000 + "the final error"
+    cut = compact_description(text, token_budget=100)
+    assert cut.startswith("beginning") and cut.endswith("the final error")
+    assert "tokens omitted" in cut
+    assert estimate_tokens(cut) <= 110
+
+    # Only what looks like a signature is cut after a sign-off or a "--" line
+    for text, kept in [
+        ("The site is down.\n\nThanks,\nJane\n\nP.S. the site is down again", "P.S. the site is down again"),
+        ("Export fails.\n\nCheers\nJane\nturns out it only fails for admins", "only fails for admins"),
+        ("Steps:\n--\nopen settings and click export\nthen reload the page", "then reload the page"),
+    ]:
+        assert kept in compact_description(text, token_budget=600)
+    signed = compact_description("Export fails.\n-- \nJane Doe\njane.doe@example.com\n+1 555 0100", 600)
+    assert signed == "Export fails."
+
+    # Plain tickets pass through untouched
+    assert compact_description("I cannot log in.\nPlease help.", token_budget=600) == "I cannot log in.\nPlease help."
+
+
+@pytest.mark.asyncio
+async def test_prompts_use_compacted_text(monkeypatch):
+    """Test that classify and summary prompts see compacted descriptions and the savings are reported."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(get_settings(), "classification_cache_enabled", False)
+    tickets = [
+        {"id": 1, "title": "Nightly export crashes", "description": NOISY_DESCRIPTION},
+        {"id": 2, "title": "Dark mode", "description": "Please add a dark theme"},
+    ]
+
+    service = LLMService()
+    service.llm = StubLLM()
+    processed, _ = await service.analyze_tickets(tickets)
+
+    assert len(processed) == 2
+    assert service.llm.prompts
+    for prompt in service.llm.prompts:
+        assert "Earlier thread text" not in prompt
+        assert "Step15.run" not in prompt
+    assert service.stats["compaction_tokens_saved"] > 0
+    assert service.stats["compacted_description_tokens"] < service.stats["description_tokens"]
@@ -0,0 +1,80 @@
+"""Tests for the adaptive LLM concurrency limiter."""
+
+import asyncio
+
+import pytest
+
+from app.services.concurrency import AdaptiveConcurrencyLimiter
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+@pytest.mark.asyncio
+async def test_limiter_grows_while_latency_is_healthy():
+    """Test that fast successful calls increase the limit additively."""
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=10, latency_target=1.0)
+
+    for _ in range(20):
+        async with limiter.slot():
+            pass
+
+    assert limiter.limit > 2
+    assert limiter.limit <= 10
+    assert limiter.stats()["llm_calls"] == 20
+
+
+@pytest.mark.asyncio
+async def test_limiter_backs_off_on_rate_limit_once_per_round():
+    """Test that concurrent 429s halve the limit once, not once per failure."""
+    limiter = AdaptiveConcurrencyLimiter(initial=8, minimum=1, maximum=10)
+
+    async def failing_call():
+        async with limiter.slot():
+            await asyncio.sleep(0.01)
+            raise RateLimited()
+
+    results = await asyncio.gather(*(failing_call() for _ in range(8)), return_exceptions=True)
+
+    assert all(isinstance(r, RateLimited) for r in results)
+    assert limiter.limit == 4
+    assert limiter.stats()["llm_overloads"] == 8
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_requests():
+    """Test that no more than the current limit of calls run at once."""
+    limiter = AdaptiveConcurrencyLimiter(initial=3, maximum=3)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(20)))
+
+    assert peak == 3
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_do_not_adapt_the_limit():
+    """Test that calls cancelled by a run cancel or shutdown count neither as errors nor as successes."""
+    limiter = AdaptiveConcurrencyLimiter(initial=4, maximum=10)
+
+    async def call():
+        async with limiter.slot():
+            await asyncio.sleep(10)
+
+    tasks = [asyncio.create_task(call()) for _ in range(4)]
+    await asyncio.sleep(0.01)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    stats = limiter.stats()
+    assert (limiter.limit, limiter.in_flight) == (4, 0)
+    assert (stats["llm_calls"], stats["llm_errors"], stats["llm_overloads"]) == (0, 0, 0)
@@ -0,0 +1,55 @@
+"""Tests for the offline fake LLM backend."""
+
+import openai
+import pytest
+
+from app.core.config import get_settings
+from app.prompts.ticket_analysis import CLASSIFY_PROMPT_TEMPLATE
+from app.services.concurrency import is_overload_error
+from app.services.fake_llm import FakeChatModel
+from app.services.llm_service import LLMService, TicketClassification
+
+TICKETS = [
+    {"id": i, "title": title, "description": description}
+    for i, (title, description) in enumerate([
+        ("Refund please", "I was charged twice this month."),
+        ("Login loop", "Password reset sends me back to the login page."),
+        ("Site is down", "Urgent: nobody on our team can load the dashboard."),
+        ("Question", "Where can I find my usage history?"),
+    ])
+]
+
+
+@pytest.mark.asyncio
+async def test_fake_backend_is_deterministic(monkeypatch):
+    """Test that the fake backend needs no API key and gives the same answers every run."""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(get_settings(), "llm_backend", "fake")
+    monkeypatch.setattr(get_settings(), "fake_llm_latency_seconds", 0.0)
+
+    first, summary = await LLMService().analyze_tickets(TICKETS)
+    second, _ = await LLMService().analyze_tickets(TICKETS)
+
+    classifications = [(t["category"], t["priority"]) for t in first]
+    assert classifications == [(t["category"], t["priority"]) for t in second]
+    assert classifications[0][0] == "billing"
+    assert classifications[1][0] == "account"
+    assert classifications[2][1] == "high"
+    assert summary.startswith("Summary of 4 entries")
+
+    # Single-ticket calls agree with batched calls
+    monkeypatch.setattr(get_settings(), "llm_batch_classification", False)
+    single, _ = await LLMService().analyze_tickets(TICKETS)
+    assert [(t["category"], t["priority"]) for t in single] == classifications
+
+
+@pytest.mark.asyncio
+async def test_fake_backend_injects_rate_limits():
+    """Test that injected 429s surface as OpenAI rate limit errors once retries run out."""
+    model = FakeChatModel(latency_seconds=0.0, rate_limit_rate=1.0, max_retries=0)
+    chain = CLASSIFY_PROMPT_TEMPLATE | model.with_structured_output(TicketClassification)
+
+    with pytest.raises(openai.RateLimitError) as error:
+        await chain.ainvoke({"title": "Refund", "description": "Charged twice"})
+    assert error.value.status_code == 429
+    assert is_overload_error(error.value)
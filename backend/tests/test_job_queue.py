@@ -0,0 +1,230 @@
+"""Tests for the durable analysis job queue and worker."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.entities import AnalysisJob, AnalysisRun, JobStatus
+from app.services.job_queue import JobQueue, utcnow
+from app.worker import Worker
+
+
+@pytest.mark.asyncio
+async def test_analyze_enqueues_durable_job(client: AsyncClient, test_db: AsyncSession, sample_tickets):
+    """Test that starting an analysis stores a queued job for the run."""
+    response = await client.post("/api/analyze", json={})
+    assert response.status_code == 201
+
+    result = await test_db.execute(select(AnalysisJob))
+    jobs = result.scalars().all()
+    assert len(jobs) == 1
+    assert jobs[0].analysis_run_id == response.json()["id"]
+    assert jobs[0].status == JobStatus.QUEUED.value
+
+
+@pytest.mark.asyncio
+async def test_claim_is_exclusive(client: AsyncClient, test_db: AsyncSession, sample_tickets):
+    """Test that a job can only be claimed once."""
+    await client.post("/api/analyze", json={})
+
+    job = await JobQueue.claim(test_db, "worker-a")
+    assert job is not None
+    assert job.status == JobStatus.RUNNING.value
+    assert job.attempts == 1
+
+    assert await JobQueue.claim(test_db, "worker-b") is None
+
+
+@pytest.mark.asyncio
+async def test_stale_jobs_are_reclaimed(client: AsyncClient, test_db: AsyncSession, sample_tickets):
+    """Test that jobs whose worker stopped heartbeating go back to the queue."""
+    await client.post("/api/analyze", json={})
+    job = await JobQueue.claim(test_db, "worker-a")
+
+    assert await JobQueue.reclaim_stale(test_db, stale_after=timedelta(hours=1)) == 0
+
+    job.heartbeat_at = utcnow() - timedelta(hours=2)
+    await test_db.commit()
+    assert await JobQueue.reclaim_stale(test_db, stale_after=timedelta(hours=1)) == 1
+
+    reclaimed = await JobQueue.claim(test_db, "worker-b")
+    assert reclaimed.id == job.id
+    assert reclaimed.worker_id == "worker-b"
+    assert reclaimed.attempts == 2
+
+    # The first worker's claim no longer holds, so it cannot settle the job
+    stale_claim = AnalysisJob(id=job.id, worker_id="worker-a", attempts=1)
+    assert not await JobQueue.complete(test_db, stale_claim)
+    assert not await JobQueue.retry(test_db, stale_claim, "boom", delay=0)
+    assert await JobQueue.complete(test_db, reclaimed)
+
+
+@pytest.mark.asyncio
+async def test_stale_job_on_last_attempt_finishes_its_run(
+    client: AsyncClient, test_db: AsyncSession, sample_tickets, monkeypatch
+):
+    """Test that a job whose worker died on its final attempt fails the run's unfinished tickets."""
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "job_max_attempts", 1)
+    run_id = (await client.post("/api/analyze", json={})).json()["id"]
+    job = await JobQueue.claim(test_db, "worker-a")
+    job.heartbeat_at = utcnow() - timedelta(hours=2)
+    await test_db.commit()
+
+    assert await JobQueue.reclaim_stale(test_db, stale_after=timedelta(hours=1)) == 0
+
+    await test_db.refresh(job)
+    assert job.status == JobStatus.FAILED.value
+    status = (await client.get(f"/api/analyze/{run_id}/status")).json()
+    assert (status["status"], status["processing_count"], status["failed_count"]) == ("failed", 0, 2)
+    run = await test_db.get(AnalysisRun, run_id, populate_existing=True)
+    assert run.finished_at is not None
+    assert run.summary == "Analysis failed: Worker stopped responding"
+    assert len((await client.get("/api/tickets?status=failed")).json()["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_queued_jobs(client: AsyncClient, test_db: AsyncSession, sample_tickets):
+    """Test that a worker runs the analysis for each claimed job and settles it."""
+    run_id = (await client.post("/api/analyze", json={})).json()["id"]
+    worker = Worker(
+        concurrency=2,
+        session_factory=async_sessionmaker(test_db.bind, expire_on_commit=False),
+        worker_id="test-worker",
+    )
+
+    with patch(
+        "app.services.analysis_service.AnalysisService.process_analysis_background",
+        new_callable=AsyncMock,
+    ) as mock_process:
+        assert await worker.run_once() == 1
+        await worker.drain()
+
+    assert mock_process.await_args.args[1] == run_id
+    job = (await test_db.execute(select(AnalysisJob))).scalar_one()
+    await test_db.refresh(job)
+    assert job.status == JobStatus.SUCCEEDED.value
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_run_releases_tickets(client: AsyncClient, test_db: AsyncSession, sample_tickets):
+    """Test that cancelling a run no worker has claimed returns its tickets to pending at once."""
+    run_id = (await client.post("/api/analyze", json={})).json()["id"]
+
+    response = await client.post(f"/api/analyze/{run_id}/cancel")
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["status"], body["pending_count"], body["processing_count"]) == ("cancelled", 2, 0)
+
+    job = (await test_db.execute(select(AnalysisJob))).scalar_one()
+    await test_db.refresh(job)
+    assert job.status == JobStatus.CANCELLED.value
+    assert await JobQueue.claim(test_db, "worker-a") is None
+    tickets = (await client.get("/api/tickets?status=pending")).json()["items"]
+    assert len(tickets) == 2
+
+    assert (await client.post(f"/api/analyze/{run_id}/cancel")).status_code == 409
+    assert (await client.post("/api/analyze/999/cancel")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_worker_stops_cancelled_run(
+    client: AsyncClient, test_db: AsyncSession, sample_tickets, monkeypatch
+):
+    """Test that a running job stops within the poll interval once its run is cancelled."""
+    from app.core.config import get_settings
+    from conftest import StubLLM
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("app.services.llm_service.ChatOpenAI", lambda **kwargs: StubLLM(delay=30))
+    monkeypatch.setattr(get_settings(), "classification_cache_enabled", False)
+    # All test sessions share one connection, so the first poll must come after the cancel commits
+    monkeypatch.setattr(get_settings(), "worker_cancel_poll_interval_seconds", 0.5)
+    run_id = (await client.post("/api/analyze", json={})).json()["id"]
+    worker = Worker(
+        concurrency=1,
+        session_factory=async_sessionmaker(test_db.bind, expire_on_commit=False),
+        worker_id="test-worker",
+    )
+
+    assert await worker.run_once() == 1
+    await asyncio.sleep(0.1)
+    assert (await client.post(f"/api/analyze/{run_id}/cancel")).json()["status"] == "cancelling"
+    await asyncio.wait_for(worker.drain(), timeout=1)
+
+    status = (await client.get(f"/api/analyze/{run_id}/status")).json()
+    assert (status["status"], status["pending_count"], status["processing_count"]) == ("cancelled", 2, 0)
+    job = (await test_db.execute(select(AnalysisJob))).scalar_one()
+    await test_db.refresh(job)
+    assert job.status == JobStatus.CANCELLED.value
+
+
+@pytest.mark.asyncio
+async def test_worker_stops_a_job_it_lost(
+    client: AsyncClient, test_db: AsyncSession, sample_tickets, monkeypatch
+):
+    """Test that a worker whose job was reclaimed stops without writing or settling the job."""
+    from app.core.config import get_settings
+    from app.models.entities import TicketAnalysis
+    from conftest import StubLLM
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("app.services.llm_service.ChatOpenAI", lambda **kwargs: StubLLM(delay=30))
+    monkeypatch.setattr(get_settings(), "classification_cache_enabled", False)
+    monkeypatch.setattr(get_settings(), "worker_heartbeat_interval_seconds", 0.2)
+    await client.post("/api/analyze", json={})
+    worker = Worker(
+        concurrency=1,
+        session_factory=async_sessionmaker(test_db.bind, expire_on_commit=False),
+        worker_id="test-worker",
+    )
+
+    assert await worker.run_once() == 1
+    # Another worker reclaims the job after missed heartbeats
+    job = (await test_db.execute(select(AnalysisJob))).scalar_one()
+    job.worker_id = "other-worker"
+    await test_db.commit()
+    await asyncio.wait_for(worker.drain(), timeout=1)
+
+    await test_db.refresh(job)
+    assert (job.status, job.worker_id) == (JobStatus.RUNNING.value, "other-worker")
+    assert (await test_db.execute(select(TicketAnalysis))).scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_without_reclassifying(
+    client: AsyncClient, test_db: AsyncSession, sample_tickets, monkeypatch
+):
+    """Test that a retried job skips tickets an earlier attempt wrote and still summarizes them."""
+    from app.core.config import get_settings
+    from app.services.analysis_service import AnalysisResultWriter, AnalysisService
+    from conftest import StubLLM
+
+    stub = StubLLM()
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("app.services.llm_service.ChatOpenAI", lambda **kwargs: stub)
+    monkeypatch.setattr(get_settings(), "classification_cache_enabled", False)
+    run_id = (await client.post("/api/analyze", json={})).json()["id"]
+    first, second = sample_tickets[:2]
+
+    # An earlier attempt wrote one result before its worker died
+    writer = AnalysisResultWriter(test_db, run_id)
+    await writer.add([{"id": first.id, "category": "bug", "priority": "high", "notes": ""}])
+    await writer.flush()
+
+    await AnalysisService.process_analysis_background(test_db, run_id, final_attempt=False)
+
+    *classify_prompts, summary_prompt = stub.prompts
+    assert len(classify_prompts) == 1
+    assert second.title in classify_prompts[0] and first.title not in classify_prompts[0]
+    assert first.title in summary_prompt and "Category: bug" in summary_prompt
+
+    status = (await client.get(f"/api/analyze/{run_id}/status")).json()
+    assert (status["status"], status["analyzed_count"]) == ("completed", 2)
+    assert status["stats"]["resumed_tickets"] == 1
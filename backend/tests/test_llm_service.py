@@ -0,0 +1,193 @@
+"""Tests for the LLM service pipeline with a stubbed chat model."""
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.services.classification_cache import ClassificationCache, LRUCache, cache_key
+from app.services.llm_service import BatchSummary, LLMService, TicketClassification
+from conftest import StubLLM
+
+
+@pytest.fixture
+def llm_service(monkeypatch) -> LLMService:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    return LLMService()
+
+
+@pytest.mark.asyncio
+async def test_analyze_tickets_classifies_and_summarizes(llm_service: LLMService):
+    """Test that every ticket is classified and a summary is produced."""
+    llm_service.llm = StubLLM()
+    tickets = [{"title": f"Refund {i}", "description": f"Charged twice {i}"} for i in range(3)]
+
+    processed, summary = await llm_service.analyze_tickets(tickets)
+
+    assert [t["category"] for t in processed] == ["billing"] * 3
+    assert summary == "Mostly billing questions."
+    assert llm_service.stats["classify_calls"] == 3
+    assert llm_service.stats["tickets_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_batched_classification_packs_tickets(llm_service: LLMService):
+    """Test that many small tickets share a handful of classification calls."""
+    llm_service.llm = StubLLM()
+    tickets = [{"title": f"Ticket {i}", "description": "Short"} for i in range(60)]
+
+    processed, _ = await llm_service.analyze_tickets(tickets)
+
+    assert len(processed) == 60
+    assert all(t["priority"] == "medium" for t in processed)
+    assert llm_service.stats["classify_requests"] <= 3
+    assert llm_service.stats["batch_fallbacks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batched_classification_falls_back_for_missing_items(llm_service: LLMService):
+    """Test that only tickets missing from a batch response get single calls."""
+    llm_service.llm = StubLLM(drop_from_batch=2)
+    tickets = [{"title": f"Ticket {i}", "description": "Short"} for i in range(5)]
+
+    processed, _ = await llm_service.analyze_tickets(tickets)
+
+    assert len(processed) == 5
+    assert llm_service.stats["batch_fallbacks"] == 2
+    assert llm_service.llm.calls.count(TicketClassification) == 2
+
+
+@pytest.mark.asyncio
+async def test_summary_reduces_hierarchically_within_budget(llm_service: LLMService, monkeypatch):
+    """Test that large runs are summarized in token-bounded chunks and merged."""
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "summary_chunk_token_budget", 200)
+    monkeypatch.setattr(get_settings(), "summary_combine_token_budget", 100)
+    llm_service.llm = StubLLM()
+    tickets = [{"title": f"Ticket {i}", "description": "x" * 200} for i in range(40)]
+
+    _, summary = await llm_service.analyze_tickets(tickets)
+
+    assert summary == "Mostly billing questions."
+    assert llm_service.stats["summary_levels"] >= 2
+    summary_prompts = [
+        prompt for schema, prompt in zip(llm_service.llm.calls, llm_service.llm.prompts)
+        if schema is BatchSummary
+    ]
+    assert len(summary_prompts) == llm_service.stats["summary_calls"] > 1
+    assert "Totals: 40 tickets" in summary_prompts[-1]
+
+
+@pytest.mark.asyncio
+async def test_cache_skips_model_for_known_tickets(monkeypatch, test_db: AsyncSession):
+    """Test that cached and duplicate tickets are not sent to the model twice."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    # One key per statement, so writes and lookups go through several chunks
+    monkeypatch.setattr("app.services.classification_cache._INSERT_CHUNK", 1)
+    cache = ClassificationCache(
+        session_factory=async_sessionmaker(test_db.bind, expire_on_commit=False),
+        lru=LRUCache(100),
+    )
+    tickets = [
+        {"title": "Invoice", "description": "Wrong VAT"},
+        {"title": "invoice ", "description": "wrong   VAT"},  # same after normalization
+        {"title": "Login", "description": "Cannot sign in"},
+    ]
+
+    first = LLMService(cache=cache)
+    first.llm = StubLLM()
+    await first.analyze_tickets(tickets)
+    assert first.stats["classify_calls"] == 2
+    assert first.stats["cache_hits"] == 0
+
+    # A fresh LRU forces the second run to read through to the database
+    cache.lru = LRUCache(100)
+    second = LLMService(cache=cache)
+    second.llm = StubLLM()
+    processed, _ = await second.analyze_tickets(tickets)
+
+    assert second.stats["cache_hits"] == 3
+    assert second.stats["classify_calls"] == 0
+    assert second.llm.calls == [BatchSummary]
+    assert processed[0]["category"] == "billing"
+
+
+def test_cache_key_depends_on_prompt_version_and_model():
+    """Test that changing the prompt version or model changes the key."""
+    base = cache_key("Title", "Body", "gpt-4o-mini", prompt_version="v1")
+
+    assert cache_key("  title", "body\n", "gpt-4o-mini", prompt_version="v1") == base
+    assert cache_key("Title", "Body", "gpt-4o-mini", prompt_version="v2") != base
+    assert cache_key("Title", "Body", "gpt-4o", prompt_version="v1") != base
+
+
+@pytest.mark.asyncio
+async def test_failing_tickets_are_retried_and_dead_lettered(llm_service: LLMService, monkeypatch):
+    """Test that a persistently failing ticket is dead-lettered without failing the others."""
+    import httpx
+    import openai
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "llm_batch_classification", False)
+    monkeypatch.setattr(get_settings(), "llm_retry_base_delay_seconds", 0.001)
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    stub = StubLLM()
+    respond = stub.with_structured_output
+    rate_limited: list[str] = []
+
+    def with_structured_output(schema):
+        inner = respond(schema)
+
+        async def flaky(prompt_value):
+            prompt = prompt_value.to_string()
+            if "Broken" in prompt and schema is TicketClassification:
+                raise openai.InternalServerError("boom", response=httpx.Response(500, request=request), body=None)
+            if "Throttled" in prompt and not rate_limited:
+                rate_limited.append(prompt)
+                response = httpx.Response(429, headers={"retry-after-ms": "20"}, request=request)
+                raise openai.RateLimitError("slow down", response=response, body=None)
+            return await inner.ainvoke(prompt_value)
+
+        return RunnableLambda(lambda _: None, afunc=flaky)
+
+    stub.with_structured_output = with_structured_output
+    llm_service.llm = stub
+    tickets = [
+        {"id": 1, "title": "Broken", "description": "Always fails"},
+        {"id": 2, "title": "Throttled", "description": "Fails once"},
+        {"id": 3, "title": "Fine", "description": "Works"},
+    ]
+
+    processed, summary = await llm_service.analyze_tickets(tickets)
+
+    assert sorted(t["id"] for t in processed) == [2, 3]
+    assert summary == "Mostly billing questions."
+    assert "Broken" not in stub.prompts[-1]
+    assert [letter["ticket_id"] for letter in llm_service.dead_letters] == [1]
+    assert llm_service.dead_letters[0]["error"].startswith("InternalServerError")
+    # Every retry of the broken ticket, and one of the throttled one
+    assert llm_service.stats["call_retries"] == get_settings().llm_retry_max_attempts
+    assert llm_service.stats["dead_lettered"] == 1
+
+
+def test_backoff_honours_retry_after():
+    """Test that backoff is jittered within its window but never shorter than Retry-After."""
+    import random
+
+    import httpx
+    import openai
+    from app.services.retry import backoff_delay, is_retryable_error, retry_after_seconds
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    error = openai.RateLimitError(
+        "slow down", response=httpx.Response(429, headers={"retry-after": "7"}, request=request), body=None
+    )
+    assert is_retryable_error(error)
+    assert retry_after_seconds(error) == 7.0
+    assert not is_retryable_error(ValueError("malformed output"))
+
+    rng = random.Random(0)
+    delays = [backoff_delay(3, base=1.0, cap=30.0, rng=rng) for _ in range(100)]
+    assert all(0 <= delay <= 4.0 for delay in delays) and len(set(delays)) > 1
+    assert backoff_delay(10, base=1.0, cap=30.0, retry_after=45.0, rng=rng) == 45.0
+    assert backoff_delay(1, base=1.0, cap=30.0, retry_after=0.0, rng=rng) <= 1.0
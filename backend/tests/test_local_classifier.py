@@ -0,0 +1,106 @@
+"""Tests for the local pre-classifier."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.entities import AnalysisRun, Ticket, TicketAnalysis
+from app.services.compaction import compact_description
+from app.services.llm_service import LLMService
+from app.services.local_classifier import LocalClassifierService
+from conftest import StubLLM
+
+# StubLLM answers billing/medium for everything, so these are the tickets it agrees on
+TRAINING = [
+    ("Refund request", "I was charged twice for my subscription", "billing", "medium"),
+    ("Invoice is wrong", "The invoice amount does not match my plan", "billing", "medium"),
+    ("App crashes", "The app crashes with an error when I open settings", "bug", "high"),
+    ("Export broken", "Export throws an exception every time", "bug", "high"),
+    ("Add dark mode", "Feature request: please add a dark theme", "feature_request", "low"),
+    ("Bulk edit", "Would like a feature to edit many tickets at once", "feature_request", "low"),
+]
+
+
+async def _store_analyses(db: AsyncSession, copies: int, classified_by: str = "llm") -> None:
+    run = AnalysisRun(summary="Training data")
+    db.add(run)
+    await db.flush()
+    for i in range(copies):
+        for title, description, category, priority in TRAINING:
+            ticket = Ticket(title=f"{title} {i}", description=description)
+            db.add(ticket)
+            await db.flush()
+            db.add(TicketAnalysis(
+                analysis_run_id=run.id,
+                ticket_id=ticket.id,
+                category=category,
+                priority=priority,
+                classified_by=classified_by,
+            ))
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_train_and_load_classifier(test_db: AsyncSession, monkeypatch):
+    """Test that a classifier trained on LLM analyses is stored and predicts their labels."""
+    compacted = []
+
+    def compact(description: str, token_budget: int) -> str:
+        compacted.append(description)
+        return compact_description(description, token_budget)
+
+    monkeypatch.setattr("app.services.local_classifier.compact_description", compact)
+    with pytest.raises(ValueError):
+        await LocalClassifierService.train(test_db, min_samples=10)
+
+    await _store_analyses(test_db, copies=10)
+    # The classifier's own output is never used for training
+    await _store_analyses(test_db, copies=10, classified_by="local")
+    model = await LocalClassifierService.train(test_db, min_samples=10)
+
+    assert model.samples == 60
+    # Trained on the same compacted descriptions the pipeline classifies
+    assert len(compacted) == 60
+    assert model.metrics["category_accuracy"] == 1.0
+    classifier = await LocalClassifierService.load_latest(test_db)
+    predictions = classifier.predict(["Refund please\nI was charged twice", "Crash\nThe app crashes with an error"])
+    assert [(p.category, p.priority) for p in predictions] == [("billing", "medium"), ("bug", "high")]
+    assert all(p.confidence > 0.5 for p in predictions)
+
+
+@pytest.mark.asyncio
+async def test_confident_tickets_skip_the_llm(test_db: AsyncSession, monkeypatch):
+    """Test that confident tickets are classified locally and audited ones go to the LLM too."""
+    await _store_analyses(test_db, copies=10)
+    await LocalClassifierService.train(test_db, min_samples=10)
+    classifier = await LocalClassifierService.load_latest(test_db)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(get_settings(), "local_classifier_threshold", 0.5)
+    tickets = [
+        {"title": "Refund request", "description": "I was charged twice for my subscription"},
+        {"title": "App crashes", "description": "The app crashes with an error when I open settings"},
+        {"title": "Something else", "description": "Unrelated words entirely"},
+    ]
+
+    service = LLMService(local_classifier=classifier)
+    service.llm = StubLLM()
+    processed, _ = await service.analyze_tickets(tickets)
+
+    assert processed[1]["category"] == "bug"
+    assert processed[1]["classified_by"] == "local"
+    assert service.stats["local_hits"] >= 2
+    assert service.stats["classify_calls"] == 3 - service.stats["local_hits"]
+
+    # With every confident ticket audited, the LLM sees all of them and agreement is measured
+    monkeypatch.setattr(get_settings(), "local_classifier_audit_rate", 1.0)
+    service = LLMService(local_classifier=classifier)
+    service.llm = StubLLM()
+    processed, _ = await service.analyze_tickets(tickets)
+
+    assert service.stats["local_hits"] == 0
+    assert service.stats["classify_calls"] == 3
+    assert service.stats["local_audited"] >= 2
+    # StubLLM says billing/medium: it agrees on the refund ticket only
+    assert service.stats["local_agreement"] == round(1 / service.stats["local_audited"], 4)
+    assert all(t["category"] == "billing" for t in processed)
@@ -0,0 +1,85 @@
+"""Tests for Prometheus instrumentation."""
+
+import pytest
+from httpx import AsyncClient
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.db.session import get_engine, instrument_pool
+from app.services.llm_service import LLMService, TokenUsageRecorder
+from conftest import StubLLM
+
+
+def sample(name: str, **labels) -> float:
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_are_timed_per_node(monkeypatch):
+    """Test that every LLM call is observed under the node that made it."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    service = LLMService()
+    service.llm = StubLLM(drop_from_batch=1)
+    before = {
+        node: sample("llm_call_duration_seconds_count", node=node)
+        for node in ("process_ticket_batch", "generate_batch_summary")
+    }
+    retries_before = sample("llm_retries_total")
+
+    await service.analyze_tickets([{"title": f"T{i}", "description": "Short"} for i in range(3)])
+
+    # One batch call plus one fallback for the dropped ticket, then one summary call
+    assert sample("llm_call_duration_seconds_count", node="process_ticket_batch") - before["process_ticket_batch"] == 2
+    assert sample("llm_call_duration_seconds_count", node="generate_batch_summary") - before["generate_batch_summary"] == 1
+    assert sample("llm_retries_total") - retries_before == 1
+
+
+def test_token_usage_is_counted():
+    """Test that provider-reported usage feeds the token counters."""
+    before = sample("llm_tokens_total", node="generate_batch_summary", direction="input")
+    message = AIMessage(content="", usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+
+    TokenUsageRecorder("generate_batch_summary").on_llm_end(
+        LLMResult(generations=[[ChatGeneration(message=message)]])
+    )
+
+    assert sample("llm_tokens_total", node="generate_batch_summary", direction="input") - before == 120
+    assert sample("llm_tokens_total", node="generate_batch_summary", direction="output") >= 30
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_and_queue(client: AsyncClient, sample_tickets):
+    """Test the exposition endpoint, per-route latency and queue depth."""
+    before = sample("http_request_duration_seconds_count", method="GET", route="/api/analyze/{analysis_run_id}/status", status="404")
+
+    await client.get("/api/analyze/12345/status")
+    await client.post("/api/analyze", json={})
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "llm_call_duration_seconds" in response.text
+    assert sample("http_request_duration_seconds_count", method="GET", route="/api/analyze/{analysis_run_id}/status", status="404") - before == 1
+    assert sample("analysis_queue_depth") == 1
+
+
+@pytest.mark.asyncio
+async def test_replica_pool_is_configured_and_labelled(monkeypatch):
+    """Test that engines get the configured pool and report it under their own label."""
+    monkeypatch.setattr(get_settings(), "db_pool_size", 3)
+    monkeypatch.setattr(get_settings(), "db_max_overflow", 2)
+
+    engine = get_engine("postgresql+asyncpg://reader@replica/support_tickets", "replica")
+    instrument_pool(engine, "replica")
+    try:
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 2
+        assert sample("db_pool_size", pool="replica") == 3
+        assert sample("db_pool_checked_out", pool="replica") == 0
+
+        # Disposing swaps in a new pool that keeps the label
+        await engine.dispose()
+        assert engine.pool.pool_name == "replica"
+    finally:
+        await engine.dispose()
@@ -0,0 +1,83 @@
+"""Tests for the shared LLM rate limiter."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.entities import LLMRateLimitBucket
+from app.services.llm_service import LLMService
+from app.services.rate_limit import DatabaseRateLimiter, LocalRateLimiter, TokenBuckets
+from conftest import StubLLM
+
+
+def test_buckets_pace_calls_at_the_configured_rate():
+    """Test that a full bucket absorbs a burst and later calls are spaced evenly."""
+    buckets = TokenBuckets(requests_per_minute=60, tokens_per_minute=0, burst_seconds=2)
+    requests, tokens = buckets.full()
+
+    waits = []
+    for _ in range(5):
+        requests, tokens, wait = buckets.reserve(requests, tokens, elapsed=0, cost=100)
+        waits.append(wait)
+
+    # Two calls fit the burst, then each further call waits one more second
+    assert waits == [0, 0, 1, 2, 3]
+
+
+def test_token_bucket_limits_large_calls():
+    """Test that the token budget, not the request budget, throttles big prompts."""
+    buckets = TokenBuckets(requests_per_minute=600, tokens_per_minute=6000, burst_seconds=1)
+    requests, tokens = buckets.full()
+
+    requests, tokens, wait = buckets.reserve(requests, tokens, elapsed=0, cost=100)
+    assert wait == 0
+    requests, tokens, wait = buckets.reserve(requests, tokens, elapsed=0, cost=300)
+    assert wait == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_database_limiter_shares_quota_between_instances(test_db: AsyncSession):
+    """Test that limiters in different processes draw from the same row."""
+    factory = async_sessionmaker(test_db.bind, expire_on_commit=False)
+    buckets = TokenBuckets(requests_per_minute=60, tokens_per_minute=0, burst_seconds=1)
+    first = DatabaseRateLimiter(buckets, factory)
+    second = DatabaseRateLimiter(buckets, factory)
+
+    assert await first._reserve(1) == 0
+    # The single-request burst is used up, so the other "process" has to wait
+    assert await second._reserve(1) > 0
+
+
+@pytest.mark.asyncio
+async def test_database_limiters_starting_together_share_one_row(test_db: AsyncSession):
+    """Test that limiters racing to create the quota row both get a reservation instead of an error."""
+    factory = async_sessionmaker(test_db.bind, expire_on_commit=False)
+    buckets = TokenBuckets(requests_per_minute=60, tokens_per_minute=0, burst_seconds=1)
+
+    waits = await asyncio.gather(*(DatabaseRateLimiter(buckets, factory)._reserve(1) for _ in range(2)))
+
+    # SQLite has no row locks to order the two reservations, so only the row itself is checked
+    assert len(waits) == 2
+    rows = (await test_db.execute(select(LLMRateLimitBucket))).scalars().all()
+    assert [row.name for row in rows] == ["llm"]
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_go_through_the_rate_limiter(monkeypatch):
+    """Test that every model call reserves quota with a token estimate."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    reserved = []
+
+    class RecordingLimiter(LocalRateLimiter):
+        async def _reserve(self, cost: int) -> float:
+            reserved.append(cost)
+            return 0.0
+
+    service = LLMService(rate_limiter=RecordingLimiter(TokenBuckets(60, 0, 1)))
+    service.llm = StubLLM()
+    await service.analyze_tickets([{"title": f"T{i}", "description": "Short"} for i in range(3)])
+
+    assert len(reserved) == len(service.llm.calls)
+    assert all(cost > 0 for cost in reserved)
@@ -0,0 +1,91 @@
+"""Tests for priority-first and fair scheduling of LLM calls."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.llm_service import LLMService
+from app.services.scheduling import LIKELY_HIGH_SCORE, FairScheduler, Flow, urgency_score
+from conftest import StubLLM
+
+
+@pytest.mark.asyncio
+async def test_small_run_is_not_starved_by_a_backlog():
+    """Test that a run queued behind a large backlog is interleaved with it, not served after it."""
+    scheduler = FairScheduler(capacity=1)
+    backlog, interactive = Flow(), Flow()
+    served: list[str] = []
+
+    async def call(flow: Flow, name: str) -> None:
+        async with scheduler.turn(flow, cost=100):
+            served.append(name)
+            await asyncio.sleep(0)
+
+    backlog_calls = [asyncio.create_task(call(backlog, "backlog")) for _ in range(10)]
+    await asyncio.sleep(0)
+    await asyncio.gather(*backlog_calls, call(interactive, "interactive"), call(interactive, "interactive"))
+
+    assert len(served) == 12
+    # Alternating with the backlog from the moment it arrives, rather than after all ten calls
+    assert max(i for i, name in enumerate(served) if name == "interactive") <= 4
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_suspended_turn_frees_its_slot():
+    """Test that a call sleeping off a quota wait lets other runs' calls through, then resumes."""
+    scheduler = FairScheduler(capacity=1)
+    quota_bound, other = Flow(), Flow()
+    served: list[str] = []
+    quota_refilled = asyncio.Event()
+
+    async def wait_for_quota() -> None:
+        async with scheduler.turn(quota_bound, cost=100) as turn:
+            async with turn.suspended():
+                await quota_refilled.wait()
+            served.append("quota_bound")
+
+    async def call(name: str) -> None:
+        async with scheduler.turn(other, cost=100):
+            served.append(name)
+
+    waiting = asyncio.create_task(wait_for_quota())
+    await asyncio.sleep(0)
+    await asyncio.wait_for(call("other"), timeout=1)
+    quota_refilled.set()
+    await waiting
+    assert served == ["other", "quota_bound"]
+    assert scheduler.in_flight == 0
+
+    # Cancelled while suspended, the call gives back nothing it no longer holds
+    quota_refilled.clear()
+    waiting = asyncio.create_task(wait_for_quota())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert (scheduler.in_flight, quota_bound.in_flight) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_urgent_tickets_are_classified_first(monkeypatch):
+    """Test that likely HIGH-priority tickets go to the LLM first and their wait is reported."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(get_settings(), "llm_batch_classification", False)
+    monkeypatch.setattr(get_settings(), "llm_initial_concurrency", 1)
+    monkeypatch.setattr(get_settings(), "llm_max_concurrency", 1)
+    tickets = [
+        {"id": 1, "title": "Dark mode", "description": "Please add a dark theme"},
+        {"id": 2, "title": "Invoice copy", "description": "Where can I download invoices?"},
+        {"id": 3, "title": "Sync wiped everything", "description": "We lost all our data after the update"},
+    ]
+    assert urgency_score(tickets[2]["title"], tickets[2]["description"]) >= LIKELY_HIGH_SCORE
+
+    service = LLMService(scheduler=FairScheduler(capacity=1))
+    service.llm = StubLLM()
+    await service.analyze_tickets(tickets)
+
+    assert "lost all our data" in service.llm.prompts[0]
+    assert service.stats["likely_high_tickets"] == 1
+    assert service.stats["likely_high_p50_seconds"] <= service.stats["classified_p50_seconds"]
@@ -0,0 +1,58 @@
+"""Tests for the streaming ticket export."""
+
+import csv
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.models.entities import TicketAnalysis
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_and_csv(client: AsyncClient, test_db, sample_analysis_run, sample_tickets):
+    """Test that every ticket is exported once with its latest analysis, in both text formats."""
+    # A newer analysis of the first ticket replaces the sample one in the export
+    test_db.add(TicketAnalysis(
+        analysis_run_id=sample_analysis_run.id,
+        ticket_id=sample_tickets[0].id,
+        category="billing",
+        priority="low",
+        notes="Re-analyzed",
+    ))
+    await test_db.commit()
+
+    response = await client.get("/api/tickets/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["ticket_id"] for row in rows] == sorted(t.id for t in sample_tickets)
+    first = rows[0]
+    assert (first["category"], first["priority"], first["notes"]) == ("billing", "low", "Re-analyzed")
+    assert first["status"] == "analyzed"
+    assert rows[-1]["analysis_id"] is None
+
+    response = await client.get("/api/tickets/export?format=csv&status=analyzed")
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert [record["category"] for record in records] == ["billing", "feature_request", ""]
+
+    # Nothing is pending: the CSV is the header alone
+    response = await client.get("/api/tickets/export?format=csv&status=pending")
+    assert response.text.strip() == "ticket_id,title,description,status,created_at,analysis_id," \
+        "analysis_run_id,category,priority,notes,classified_by,analyzed_at"
+
+
+@pytest.mark.asyncio
+async def test_export_parquet(client: AsyncClient, sample_analysis_run, sample_tickets):
+    """Test that the Parquet export is a valid file with one row per ticket."""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    response = await client.get("/api/tickets/export?format=parquet")
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == len(sample_tickets)
+    assert table.column("category").to_pylist()[:2] == ["bug", "feature_request"]
+
+    response = await client.get("/api/tickets/export?format=xml")
+    assert response.status_code == 422
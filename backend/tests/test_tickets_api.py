@@ -1,7 +1,17 @@
 """Tests for ticket API endpoints."""
 
+import fcntl
+from datetime import datetime
+
+import numpy as np
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.entities import Ticket
+from app.services.similar_tickets import SimilarTicketIndex
+from app.services.text_features import hashed_vectors
 
 
 @pytest.mark.asyncio
@@ -132,6 +142,80 @@ async def test_list_tickets_pagination(client: AsyncClient):
     assert data["page_size"] == 10
 
 
+@pytest.mark.asyncio
+async def test_list_tickets_cursor_pagination(client: AsyncClient):
+    """Test walking all tickets with next_cursor, including same-timestamp ties."""
+    tickets_data = [
+        {"title": f"Ticket {i}", "description": f"Description {i}"}
+        for i in range(15)
+    ]
+    await client.post("/api/tickets", json=tickets_data)
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/tickets?page_size=4" + (f"&cursor={cursor}" if cursor else "")
+        response = await client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(t["id"] for t in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 15
+    assert len(set(seen)) == 15
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_cursor_survives_deleting_its_row(client: AsyncClient, test_db: AsyncSession):
+    """Test that the next page still follows when the cursor's own row was deleted meanwhile."""
+    await client.post("/api/tickets", json=[{"title": f"Ticket {i}", "description": "D"} for i in range(3)])
+    # Timestamps set from Python carry microseconds, unlike the database default
+    test_db.add(Ticket(title="Older", description="D", created_at=datetime(2020, 1, 1, 12, 0, 0, 123456)))
+    test_db.add(Ticket(title="Oldest", description="D", created_at=datetime(2020, 1, 1, 12, 0, 0)))
+    await test_db.commit()
+
+    first = (await client.get("/api/tickets?page_size=2")).json()
+    await test_db.execute(delete(Ticket).where(Ticket.id == first["items"][-1]["id"]))
+    await test_db.commit()
+
+    rest, cursor = [], first["next_cursor"]
+    while cursor:
+        page = (await client.get(f"/api/tickets?page_size=2&cursor={cursor}")).json()
+        rest.extend(t["title"] for t in page["items"])
+        cursor = page["next_cursor"]
+    assert rest == ["Ticket 0", "Older", "Oldest"]
+
+
+@pytest.mark.asyncio
+async def test_list_tickets_invalid_cursor(client: AsyncClient):
+    """Test that a malformed cursor is rejected."""
+    response = await client.get("/api/tickets?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_analyzed_tickets(client: AsyncClient, sample_analysis_run):
+    """Test that analyzed tickets are listed with their analysis and paged by analysis id."""
+    response = await client.get("/api/tickets/analyzed?page_size=1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    first = response.json()
+    assert set(first["items"][0]) == {
+        "id", "analysis_id", "title", "description", "priority", "category", "notes",
+    }
+    assert first["items"][0]["category"] == "feature_request"
+    assert first["next_cursor"] is not None
+
+    response = await client.get(f"/api/tickets/analyzed?page_size=1&cursor={first['next_cursor']}")
+    second = response.json()
+    assert second["items"][0]["category"] == "bug"
+    assert second["items"][0]["notes"] == "Test notes 1"
+    assert second["items"][0]["analysis_id"] < first["items"][0]["analysis_id"]
+
+
 @pytest.mark.asyncio
 async def test_list_tickets_with_status_filter(client: AsyncClient, sample_tickets):
     """Test listing tickets filtered by status."""
@@ -170,3 +254,191 @@ async def test_list_tickets_invalid_page_size(client: AsyncClient):
     response = await client.get("/api/tickets?page_size=1001")  # Max is 1000
     assert response.status_code == 422
 
+
+
+@pytest.mark.asyncio
+async def test_import_tickets_csv(client: AsyncClient):
+    """Test streaming CSV import, including multi-line fields and rejected rows."""
+    body = (
+        "title,description\n"
+        '"Login Timeout","Users in EU region report timeouts."\n'
+        '"Multi-line","First line\nsecond line, with a comma"\n'
+        '"","Missing title"\n'
+        '"Too","many","fields"\n'
+    )
+    response = await client.post(
+        "/api/tickets/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 2
+    assert data["rejected"] == 2
+    assert [e["line"] for e in data["errors"]] == [5, 6]
+
+    response = await client.get("/api/tickets?page_size=10")
+    descriptions = {t["description"] for t in response.json()["items"]}
+    assert "First line\nsecond line, with a comma" in descriptions
+
+
+@pytest.mark.asyncio
+async def test_import_tickets_ndjson(client: AsyncClient):
+    """Test streaming NDJSON import with an invalid line."""
+    lines = [
+        '{"title": "Refund", "description": "Charged twice"}',
+        "not json",
+        '{"title": "Invoice", "description": "Wrong VAT"}',
+    ]
+    response = await client.post(
+        "/api/tickets/import?format=ndjson", content="\n".join(lines).encode()
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 2
+    assert data["rejected"] == 1
+    assert data["errors"][0]["line"] == 2
+
+
+@pytest.mark.asyncio
+async def test_import_tickets_unsupported_content_type(client: AsyncClient):
+    """Test that unknown body formats are refused."""
+    response = await client.post(
+        "/api/tickets/import", content=b"<xml/>", headers={"Content-Type": "application/xml"}
+    )
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_search_tickets_ranked_and_paginated(client: AsyncClient):
+    """Test full-text search ranking, filters and cursor pagination."""
+    await client.post("/api/tickets", json=[
+        {"title": "Login timeout", "description": "EU users hit a login timeout after SSO"},
+        {"title": "Slow dashboard", "description": "Dashboard times out for EU login users"},
+        {"title": "Refund request", "description": "Charged twice in March"},
+        {"title": "Login page typo", "description": "Timeout message misspelled"},
+    ])
+
+    response = await client.get("/api/tickets/search?q=login timeout")
+    assert response.status_code == 200
+    data = response.json()
+    titles = [t["title"] for t in data["items"]]
+    assert titles[0] == "Login timeout"
+    assert "Refund request" not in titles
+    assert all(a["rank"] >= b["rank"] for a, b in zip(data["items"], data["items"][1:]))
+
+    # Walk the same results one at a time with the cursor
+    paged, cursor = [], None
+    while True:
+        url = "/api/tickets/search?q=login timeout&page_size=1" + (f"&cursor={cursor}" if cursor else "")
+        page = (await client.get(url)).json()
+        paged.extend(t["id"] for t in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paged == [t["id"] for t in data["items"]]
+
+    response = await client.get("/api/tickets/search?q=login&status=analyzed")
+    assert response.json()["items"] == []
+
+    # Unknown filter values are rejected before they reach the database's enums
+    for query in ("status=closed", "category=hardware", "priority=urgent"):
+        assert (await client.get(f"/api/tickets/search?q=login&{query}")).status_code == 422
+
+    # FTS operators in user input are treated as plain words
+    response = await client.get('/api/tickets/search?q=login" OR (refund')
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_similar_tickets(client: AsyncClient, sample_tickets, sample_analysis_run):
+    """Test that similar tickets come back nearest first with their latest classification."""
+    created = (await client.post("/api/tickets", json=[
+        {"title": "Checkout outage", "description": "Checkout page returns 500 errors for all customers"},
+        {"title": "Checkout down again", "description": "Customers get 500 errors on the checkout page"},
+        {"title": "Dark mode", "description": "Would love a dark theme for the dashboard"},
+    ])).json()
+    response = await client.get(f"/api/tickets/{created[0]['id']}/similar?limit=3")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ticket_id"] == created[0]["id"]
+    ids = [t["id"] for t in data["items"]]
+    assert created[0]["id"] not in ids
+    assert ids[0] == created[1]["id"]
+    assert data["items"][0]["similarity"] > data["items"][1]["similarity"]
+    assert len(ids) == 3
+
+    # Tickets written outside the API were indexed by the sync after the POST
+    similar = (await client.get(f"/api/tickets/{sample_tickets[1].id}/similar")).json()
+    match = next(t for t in similar["items"] if t["id"] == sample_tickets[0].id)
+    assert (match["category"], match["priority"]) == ("bug", "high")
+
+    assert (await client.get("/api/tickets/99999/similar")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_similar_index_rebuilds_for_another_database(test_db: AsyncSession, tmp_path):
+    """Test that an index built against another database with the same ids is rebuilt, not reused."""
+    index = SimilarTicketIndex(tmp_path, dimensions=64)
+    old = [Ticket(title=f"Printer {i}", description="The office printer is on fire") for i in range(3)]
+    test_db.add_all(old)
+    await test_db.commit()
+    ids = [ticket.id for ticket in old]
+    assert await index.sync(test_db) == 3
+    assert await index.sync(test_db) == 0
+
+    # The database is recreated, with as many tickets under the same ids
+    await test_db.execute(delete(Ticket))
+    test_db.add_all([
+        Ticket(id=ticket_id, title=f"Refund {i}", description="Please refund my last order")
+        for i, ticket_id in enumerate(ids)
+    ])
+    await test_db.commit()
+
+    assert await index.sync(test_db) == 3
+    [matches] = index.search(hashed_vectors(["Refund 0\nPlease refund my last order"], 64), limit=1)
+    assert matches[0] == (ids[0], pytest.approx(1.0, abs=1e-4))
+
+
+@pytest.mark.asyncio
+async def test_similar_index_sync_without_waiting(test_db: AsyncSession, tmp_path):
+    """Test that a non-waiting sync skips a running one, which then indexes the new tickets too."""
+    index = SimilarTicketIndex(tmp_path, dimensions=64)
+    test_db.add(Ticket(title="Printer", description="The office printer is on fire"))
+    await test_db.commit()
+
+    await index._lock.acquire()
+    try:
+        assert await index.sync(test_db, wait=False) == 0
+    finally:
+        index._lock.release()
+    assert index._pending and len(index) == 0
+    assert await index.sync(test_db) == 1
+
+    # Another process holding the file lock is not waited for either
+    test_db.add(Ticket(title="Refund", description="Please refund my last order"))
+    await test_db.commit()
+    with open(tmp_path / "lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        other = SimilarTicketIndex(tmp_path, dimensions=64)
+        assert await other.sync(test_db, wait=False) == 0
+    assert await index.sync(test_db, wait=False) == 1
+
+
+def test_similar_index_prefilters_large_indexes(tmp_path):
+    """Test that the SimHash prefilter of a large index still finds the nearest vectors."""
+    index = SimilarTicketIndex(tmp_path, dimensions=64)
+    index.path.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((3000, 64)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    for start in range(0, 3000, 1000):
+        index._append(list(range(start + 1, start + 1001)), vectors[start:start + 1000])
+
+    queries = vectors[[10, 2500]] + 0.05 * rng.standard_normal((2, 64)).astype(np.float32)
+    results = index.search(queries, limit=5, exclude_ids={11})
+
+    assert len(index) == 3000
+    assert results[0][0][0] != 11
+    assert results[1][0][0] == 2501
+    assert all(len(matches) == 5 for matches in results)
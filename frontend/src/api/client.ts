@@ -5,6 +5,7 @@ import type {
   AnalyzeRequest, 
   AnalysisResponse,
   AnalysisStatusResponse,
+  AnalysisProgressEvent,
   AnalyzedTicketListResponse,
   AnalysisRunListResponse
 } from '../types/api';
@@ -109,8 +110,35 @@ export async function getAnalysisStatus(analysisRunId: number): Promise<Analysis
   return response.json();
 }
 
+/**
+ * Subscribe to pushed progress of an analysis run (Server-Sent Events).
+ * `onError` is called once if the stream breaks; returns a function that closes the stream.
+ */
+export function subscribeToAnalysisEvents(
+  analysisRunId: number,
+  onEvent: (event: AnalysisProgressEvent) => void,
+  onError: () => void,
+): () => void {
+  const source = new EventSource(`${API_BASE_URL}/api/analyze/${analysisRunId}/events`);
+  const handle = (e: Event) => onEvent(JSON.parse((e as MessageEvent).data));
+
+  source.addEventListener('progress', handle);
+  source.addEventListener('finished', (e) => {
+    // The server ends the stream after this event; close before it reports an error
+    source.close();
+    handle(e);
+  });
+  source.onerror = () => {
+    source.close();
+    onError();
+  };
+
+  return () => source.close();
+}
+
 export async function getActiveAnalysisRuns(): Promise<AnalysisStatusResponse[]> {
-  const response = await fetch(`${API_BASE_URL}/api/analyze/active`);
+  // Ticket ids map the processing tickets back to their runs
+  const response = await fetch(`${API_BASE_URL}/api/analyze/active?include_ticket_ids=true`);
 
   if (!response.ok) {
     const errorText = await response.text();
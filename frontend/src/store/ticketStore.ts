@@ -1,5 +1,5 @@
 import { create } from 'zustand';
-import { createTickets, fetchTickets, analyzeTickets, getAnalysisStatus, getActiveAnalysisRuns } from '../api/client';
+import { createTickets, fetchTickets, analyzeTickets, getAnalysisStatus, getActiveAnalysisRuns, subscribeToAnalysisEvents } from '../api/client';
 import { useAnalyzedTicketStore } from './analyzedTicketStore';
 import type { TicketStore, ProcessingTicket } from '../types/store';
 import type { TicketResponse } from '../types/api';
@@ -256,54 +256,74 @@ export const useTicketStore = create<TicketStore>((set, get) => ({
   startPollingStatus: (analysisRunId: number): void => {
     const { activeAnalysisRuns } = get();
     
-    // Don't start polling if already polling this analysis run
+    // Don't start watching if already watching this analysis run
     if (activeAnalysisRuns[analysisRunId]) {
       return;
     }
-    
-    // Poll every 4 seconds
-    const pollStatus = async () => {
-      try {
-        const status = await getAnalysisStatus(analysisRunId);
-        
-        if (status.status === 'completed') {
-          // Analysis completed - stop polling for this run, remove its tickets, refresh grids
-          get().stopPollingStatus(analysisRunId);
-          get().removeProcessingTickets(analysisRunId);
-          await get().loadTickets();
-          // Refresh analyzed tickets
-          await useAnalyzedTicketStore.getState().loadTickets();
-          // Dispatch event to refresh analysis runs grid
-          window.dispatchEvent(new CustomEvent('analysisCompleted', { detail: { analysisRunId } }));
-        } else if (status.status === 'failed') {
-          // Analysis failed - stop polling for this run, remove its tickets, show error
-          get().stopPollingStatus(analysisRunId);
-          get().removeProcessingTickets(analysisRunId);
-          await get().loadTickets(); // Refresh to show failed tickets back in ready list
-          set({ 
-            error: 'Analysis failed. Please try again.'
-          });
-        }
-        // If status is 'pending' or 'processing', continue polling
-      } catch (error) {
-        console.error('Error polling analysis status:', error);
-        // Continue polling even on error (might be temporary network issue)
+
+    const handleStatus = async (status: string) => {
+      if (status === 'completed') {
+        // Analysis completed - stop watching this run, remove its tickets, refresh grids
+        get().stopPollingStatus(analysisRunId);
+        get().removeProcessingTickets(analysisRunId);
+        await get().loadTickets();
+        // Refresh analyzed tickets
+        await useAnalyzedTicketStore.getState().loadTickets();
+        // Dispatch event to refresh analysis runs grid
+        window.dispatchEvent(new CustomEvent('analysisCompleted', { detail: { analysisRunId } }));
+      } else if (status === 'failed') {
+        // Analysis failed - stop watching this run, remove its tickets, show error
+        get().stopPollingStatus(analysisRunId);
+        get().removeProcessingTickets(analysisRunId);
+        await get().loadTickets(); // Refresh to show failed tickets back in ready list
+        set({ 
+          error: 'Analysis failed. Please try again.'
+        });
       }
+      // If status is 'pending' or 'processing', keep watching
     };
-    
-    // Poll immediately, then every 4 seconds
-    pollStatus();
-    const interval = setInterval(pollStatus, 4000);
-    
-    // Track this polling interval
-    set({ activeAnalysisRuns: { ...activeAnalysisRuns, [analysisRunId]: interval } });
+
+    // Fallback when the event stream is unavailable: poll every 4 seconds
+    const startPolling = () => {
+      const pollStatus = async () => {
+        try {
+          const status = await getAnalysisStatus(analysisRunId);
+          await handleStatus(status.status);
+        } catch (error) {
+          console.error('Error polling analysis status:', error);
+          // Continue polling even on error (might be temporary network issue)
+        }
+      };
+      pollStatus();
+      const interval = setInterval(pollStatus, 4000);
+      set({ activeAnalysisRuns: { ...get().activeAnalysisRuns, [analysisRunId]: () => clearInterval(interval) } });
+    };
+
+    // Progress is pushed by the server; only the final event changes the grids
+    const closeStream = subscribeToAnalysisEvents(
+      analysisRunId,
+      (event) => {
+        if (event.finished) {
+          handleStatus(event.status === 'completed' ? 'completed' : 'failed');
+        }
+      },
+      () => {
+        // Only fall back if this run is still being watched
+        if (get().activeAnalysisRuns[analysisRunId]) {
+          startPolling();
+        }
+      },
+    );
+
+    // Track how to stop watching this run
+    set({ activeAnalysisRuns: { ...activeAnalysisRuns, [analysisRunId]: closeStream } });
   },
 
   stopPollingStatus: (analysisRunId: number): void => {
     const { activeAnalysisRuns } = get();
-    const interval = activeAnalysisRuns[analysisRunId];
-    if (interval) {
-      clearInterval(interval);
+    const stop = activeAnalysisRuns[analysisRunId];
+    if (stop) {
+      stop();
       const { [analysisRunId]: _, ...rest } = activeAnalysisRuns;
       set({ activeAnalysisRuns: rest });
     }
@@ -311,7 +331,7 @@ export const useTicketStore = create<TicketStore>((set, get) => ({
 
   stopAllPolling: (): void => {
     const { activeAnalysisRuns } = get();
-    Object.values(activeAnalysisRuns).forEach((interval) => clearInterval(interval));
+    Object.values(activeAnalysisRuns).forEach((stop) => stop());
     set({ activeAnalysisRuns: {} });
   },
 
@@ -332,8 +352,9 @@ export const useTicketStore = create<TicketStore>((set, get) => ({
       
       // For each active run, find the tickets and add to processing
       for (const run of activeRuns) {
-        if (run.ticket_ids && run.ticket_ids.length > 0) {
-          const ticketsForRun = allProcessingTickets.filter(t => run.ticket_ids.includes(t.id));
+        const ticketIds = run.ticket_ids ?? [];
+        if (ticketIds.length > 0) {
+          const ticketsForRun = allProcessingTickets.filter(t => ticketIds.includes(t.id));
           
           ticketsForRun.forEach(ticket => {
             processingTickets.push({
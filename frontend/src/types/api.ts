@@ -41,7 +41,20 @@ export interface AnalysisResponse {
 export interface AnalysisStatusResponse {
   analysis_run_id: number;
   status: string; // "pending" | "processing" | "completed" | "failed"
-  ticket_ids: number[];
+  ticket_ids: number[] | null; // only with include_ticket_ids=true
+}
+
+export interface AnalysisProgressEvent {
+  analysis_run_id: number;
+  status: string; // "pending" | "processing" | "completed" | "failed"
+  ticket_count: number;
+  pending_count: number;
+  processing_count: number;
+  analyzed_count: number;
+  failed_count: number;
+  ticket_ids: number[]; // tickets written since the previous event
+  finished: boolean;
+  summary: string | null; // set on the final event
 }
 
 export interface AnalyzedTicketResponse {
@@ -15,7 +15,7 @@ export interface TicketStore {
   hasMore: boolean;
   selectedTicketIds: number[];
   processingTickets: ProcessingTicket[];
-  activeAnalysisRuns: Record<number, NodeJS.Timeout>; // Record of analysisRunId to polling interval
+  activeAnalysisRuns: Record<number, () => void>; // Record of analysisRunId to a function that stops watching it
 
   // Actions
   createTicket: (title: string, description: string) => Promise<TicketResponse>;